@@ -1,4 +1,6 @@
 __version__ = "2.13.3"
 __description__ = "One-stop solution for HTTP(S) testing."
 
-__all__ = ["__version__", "__description__"]
+from apimeter.cache import memoize
+
+__all__ = ["__version__", "__description__", "memoize"]
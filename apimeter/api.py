@@ -1,19 +1,61 @@
+import contextvars
+import itertools
+import multiprocessing
 import os
+import threading
 import unittest
 # from memory_profiler import profile
 
 from apimeter import (
     __version__,
+    client,
     exceptions,
+    executor,
     loader,
     logger,
     parser,
     report,
     runner,
+    runtime,
+    scheduler,
     utils,
 )
 from apimeter.utils import ga_client
 
+# HttpRunner instance initialized in each worker process of the process pool
+_worker_runner = None
+
+
+def _init_worker(runner_kwargs, project_working_directory):
+    """initialize worker process of process pool, called once per process."""
+    global _worker_runner
+    # run context lives as long as worker process, which ends with the run
+    runtime.current_run_context.set(
+        runtime.RunContext(record_policy=runner_kwargs["record"])
+    )
+    loader.init_pwd(project_working_directory)
+    _worker_runner = HttpRunner(**runner_kwargs)
+    _worker_runner.project_working_directory = project_working_directory
+
+
+def _run_testcase_in_worker(indexed_testcase):
+    """run one parsed testcase in worker process.
+
+    Args:
+        indexed_testcase (tuple): (index, parsed testcase), index is the generated
+            order of testcase.
+
+    Returns:
+        tuple: (index, testcase summary), summary is picklable and will be aggregated
+            in main process.
+
+    """
+    index, testcase = indexed_testcase
+    test_suite = _worker_runner._add_testcases([testcase])
+    tests_results = _worker_runner._run_suite(test_suite)
+    loaded_testcase, result = tests_results[0]
+    return index, _worker_runner._summarize_testcase(loaded_testcase, result)
+
 
 class HttpRunner(object):
     """Developer Interface: Main Interface
@@ -31,7 +73,19 @@ class HttpRunner(object):
     """
 
     def __init__(
-        self, failfast=False, save_tests=False, log_level="WARNING", log_file=None, skip_success=False
+        self,
+        failfast=False,
+        save_tests=False,
+        log_level="WARNING",
+        log_file=None,
+        skip_success=False,
+        workers=1,
+        step_workers=1,
+        use_unittest=False,
+        shard=None,
+        use_cache=False,
+        record="full",
+        result_store=None,
     ):
         """initialize HttpRunner.
 
@@ -40,9 +94,59 @@ class HttpRunner(object):
             save_tests (bool): save loaded/parsed tests to JSON file.
             log_level (str): logging level.
             log_file (str): log file path.
+            skip_success (bool): remove success teststeps records from summary.
+            workers (int): run testcases in specified number of worker processes,
+                default is 1, which runs all testcases sequentially in current process.
+            step_workers (int): run independent teststeps of each testcase concurrently
+                in specified number of threads, default is 1, which runs teststeps sequentially.
+            use_unittest (bool): run testcases with unittest for compatibility,
+                default is False, which runs testcases with native executor.
+            shard (str): run only the i-th of n shards of generated testcases,
+                format like "1/4", default is None, which runs all testcases.
+            use_cache (bool): cache loaded tests in .apimeter_cache of project working
+                directory, and reuse them when test files are unchanged.
+            record (str): record policy of request and response details, full records
+                all teststeps, failures records failed teststeps only, and stats keeps
+                stat of teststeps only. Details of responses are materialized when
+                teststep is finished, thus memory is not grown in long runs.
+            result_store (str): SQLite file path which teststep records are spilled to
+                while running, records in summary are read from it lazily, default is
+                None, which keeps records in memory.
 
         """
         logger.setup_logger(log_level, log_file)
+        if workers < 1 or step_workers < 1:
+            raise exceptions.ParamsError(
+                "workers should be positive integer, given: {}, {}".format(
+                    workers, step_workers
+                )
+            )
+        if record not in runtime.RECORD_POLICIES:
+            raise exceptions.ParamsError(
+                "record should be one of {}, given: {}".format(
+                    "/".join(runtime.RECORD_POLICIES), record
+                )
+            )
+        self.shard = self._parse_shard(shard)
+        self.use_cache = use_cache
+
+        self._runner_kwargs = {
+            "failfast": failfast,
+            "save_tests": False,
+            "log_level": log_level,
+            "log_file": log_file,
+            "skip_success": skip_success,
+            "step_workers": step_workers,
+            "use_unittest": use_unittest,
+            "record": record,
+        }
+        self.workers = workers
+        self.step_workers = step_workers
+        self.use_unittest = use_unittest
+        self.failfast = failfast
+        self.record = record
+        self.result_store = result_store
+        self.record_store = None
 
         self.exception_stage = "initialize HttpRunner()"
         kwargs = {"failfast": failfast, "resultclass": report.HtmlTestResult}
@@ -53,8 +157,36 @@ class HttpRunner(object):
         self._summary = None
         self.project_working_directory = None
 
+    @staticmethod
+    def _parse_shard(shard):
+        """parse shard in format "i/n" to tuple (i, n), i is 1-based.
+
+        Raises:
+            exceptions.ParamsError: shard format is invalid.
+
+        """
+        if shard is None:
+            return None
+
+        try:
+            shard_index, shard_count = [int(item) for item in str(shard).split("/")]
+        except ValueError:
+            raise exceptions.ParamsError(
+                "shard should be in format i/n, given: {}".format(shard)
+            )
+
+        if not 1 <= shard_index <= shard_count:
+            raise exceptions.ParamsError(
+                "shard index should be in range 1..{}, given: {}".format(
+                    shard_count, shard
+                )
+            )
+
+        return shard_index, shard_count
+
     def _add_tests(self, testcases):
-        """initialize testcase with Runner() and add to test suite.
+        """initialize testcase with Runner() and add to test suite,
+        this is kept as unittest compatibility adapter.
 
         Args:
             testcases (list): testcases list.
@@ -64,7 +196,7 @@ class HttpRunner(object):
 
         """
 
-        def _add_test(test_runner, test_dict):
+        def _add_test(test_runner, test_dict, config_variables=None):
             """add test to testcase."""
 
             def test(self):
@@ -75,24 +207,7 @@ class HttpRunner(object):
                 finally:
                     self.meta_datas = test_runner.meta_datas
 
-            if "config" in test_dict:
-                # run nested testcase
-                test.__doc__ = test_dict["config"].get("name")
-                variables = test_dict["config"].get("variables", {})
-            else:
-                # run api test
-                test.__doc__ = test_dict.get("name")
-                variables = test_dict.get("variables", {})
-
-            if isinstance(test.__doc__, parser.LazyString):
-                try:
-                    parsed_variables = parser.parse_variables_mapping(variables)
-                    test.__doc__ = parser.parse_lazy_data(
-                        test.__doc__, parsed_variables
-                    )
-                except exceptions.VariableNotFound:
-                    test.__doc__ = str(test.__doc__)
-
+            test.__doc__ = executor.get_teststep_name(test_dict, config_variables)
             return test
 
         test_suite = unittest.TestSuite()
@@ -102,21 +217,27 @@ class HttpRunner(object):
             TestSequense = type("TestSequense", (unittest.TestCase,), {})
 
             tests = testcase.get("teststeps", [])
-            for index, test_dict in enumerate(tests):
-                times = test_dict.get("times", 1)
-                try:
-                    times = int(times)
-                except ValueError:
-                    raise exceptions.ParamsError(
-                        "times should be digit, given: {}".format(times)
+            step_scheduler = None
+            if self.step_workers > 1 and len(tests) > 1:
+                step_scheduler = scheduler.StepScheduler(
+                    test_runner, self.step_workers, self.failfast
+                )
+
+            for index, times_index, test_dict in executor.expand_teststeps(tests):
+                # suppose one testcase should not have more than 9999 steps,
+                # and one step should not run more than 999 times.
+                test_method_name = "test_{:04}_{:03}".format(index, times_index)
+                if step_scheduler:
+                    test_method = _add_test(
+                        step_scheduler.add_step(test_dict),
+                        test_dict,
+                        config.get("variables"),
                     )
-
-                for times_index in range(times):
-                    # suppose one testcase should not have more than 9999 steps,
-                    # and one step should not run more than 999 times.
-                    test_method_name = "test_{:04}_{:03}".format(index, times_index)
-                    test_method = _add_test(test_runner, test_dict)
-                    setattr(TestSequense, test_method_name, test_method)
+                else:
+                    test_method = _add_test(
+                        test_runner, test_dict, config.get("variables")
+                    )
+                setattr(TestSequense, test_method_name, test_method)
 
             loaded_testcase = self.test_loader.loadTestsFromTestCase(TestSequense)
             setattr(loaded_testcase, "config", config)
@@ -125,13 +246,36 @@ class HttpRunner(object):
             test_suite.addTest(loaded_testcase)
 
         return test_suite
-    
+
+    def _add_testcases(self, testcases):
+        """add testcases with native executor, or with unittest if use_unittest is set."""
+        if self.use_unittest:
+            return self._add_tests(testcases)
+
+        return self._add_executors(testcases)
+
+    def _add_executors(self, testcases):
+        """initialize testcase with native executor.
+
+        Args:
+            testcases (iterable): testcases list or generator.
+
+        Returns:
+            generator: executor.TestcaseExecutor() is initialized lazily for each testcase,
+                thus testcases generated by parameters are not held in memory at once.
+
+        """
+        return (
+            executor.TestcaseExecutor(testcase, self.failfast, self.step_workers)
+            for testcase in testcases
+        )
+
     # @profile
     def _run_suite(self, test_suite):
         """run tests in test_suite
 
         Args:
-            test_suite: unittest.TestSuite()
+            test_suite: unittest.TestSuite(), or iterable of executor.TestcaseExecutor()
 
         Returns:
             list: tests_results
@@ -143,28 +287,149 @@ class HttpRunner(object):
             testcase_name = testcase.config.get("name")
             logger.log_info("Start to run testcase: {}".format(testcase_name))
 
-            result = self.unittest_runner.run(testcase)
+            if isinstance(testcase, executor.TestcaseExecutor):
+                result = testcase.run()
+            else:
+                result = self.unittest_runner.run(testcase)
             if result.wasSuccessful():
                 # 测试用例执行成功，剔除执行成功的用例步骤数据，减少报告体积大小
                 if self.skip_success:
-                    result.records = list(filter(lambda record: record["status"] != "success", result.records))
+                    if isinstance(result.records, report.StoredRecords):
+                        result.records.remove("success")
+                    else:
+                        result.records = list(filter(lambda record: record["status"] != "success", result.records))
                 tests_results.append((testcase, result))
             else:
                 tests_results.insert(0, (testcase, result))
 
         return tests_results
 
+    def _run_suite_in_workers(self, testcases):
+        """run testcases in process pool, each testcase is run in one worker process.
+
+        Args:
+            testcases (iterable): parsed testcases list or generator.
+
+        Returns:
+            list: testcases summaries, failed testcases are put in front as _run_suite.
+
+        """
+        indexed_summaries = []
+        record_store = runtime.get_run_context().record_store
+        if isinstance(testcases, list):
+            processes = min(self.workers, len(testcases))
+        else:
+            processes = self.workers
+        pool = multiprocessing.Pool(
+            processes=processes,
+            initializer=_init_worker,
+            initargs=(self._runner_kwargs, self.project_working_directory),
+        )
+
+        # pool consumes tasks in its own thread, testcases pending in pool are limited
+        # to avoid consuming the whole generator of parameterized testcases at once.
+        pending_slots = threading.Semaphore(processes * 4)
+        stopped = threading.Event()
+        generate_errors = []
+        # testcases are generated in pool thread with run context of current run
+        context = contextvars.copy_context()
+
+        def iter_indexed_testcases():
+            indexed_testcases = enumerate(testcases)
+            while True:
+                pending_slots.acquire()
+                if stopped.is_set():
+                    return
+
+                try:
+                    indexed_testcase = context.run(next, indexed_testcases)
+                except StopIteration:
+                    return
+                except Exception as ex:
+                    # exception in pool thread breaks pool, it is raised in main thread
+                    generate_errors.append(ex)
+                    return
+
+                yield indexed_testcase
+
+        try:
+            # results are returned once finished, and sorted by index at last
+            for index, testcase_summary in pool.imap_unordered(
+                _run_testcase_in_worker, iter_indexed_testcases()
+            ):
+                pending_slots.release()
+                if record_store:
+                    testcase_summary["records"] = record_store.new_records(
+                        testcase_summary["records"]
+                    )
+                indexed_summaries.append((index, testcase_summary))
+
+                if self.failfast and not testcase_summary["success"]:
+                    logger.log_warning("failfast: stop running testcases in workers.")
+                    break
+        finally:
+            stopped.set()
+            # wake up pool thread waiting for slot
+            pending_slots.release()
+            pool.terminate()
+            pool.join()
+
+        if generate_errors:
+            raise generate_errors[0]
+
+        testcases_summaries = []
+        for _, testcase_summary in sorted(indexed_summaries, key=lambda item: item[0]):
+            if testcase_summary["success"]:
+                testcases_summaries.append(testcase_summary)
+            else:
+                testcases_summaries.insert(0, testcase_summary)
+
+        return testcases_summaries
+
+    def _summarize_testcase(self, testcase, result):
+        """get testcase summary from test result
+
+        Args:
+            testcase: unittest.TestSuite() with config and runner attributes.
+            result: HtmlTestResult() instance of testcase.
+
+        Returns:
+            dict: testcase summary
+
+        """
+        testcase_summary = report.get_summary(result)
+        testcase_summary["name"] = testcase.config.get("name")
+        testcase_summary["in_out"] = utils.get_testcase_io(testcase)
+        return testcase_summary
+
     def _aggregate(self, tests_results):
         """aggregate results
 
         Args:
             tests_results (list): list of (testcase, result)
 
+        """
+        testcases_summaries = [
+            self._summarize_testcase(testcase, result)
+            for testcase, result in tests_results
+        ]
+        return self._aggregate_summaries(testcases_summaries)
+
+    def _aggregate_summaries(self, testcases_summaries):
+        """aggregate testcases summaries
+
+        Args:
+            testcases_summaries (list): list of testcase summary
+
         """
         summary = {
             "success": True,
             "stat": {
-                "testcases": {"total": len(tests_results), "success": 0, "fail": 0},
+                "testcases": {
+                    "total": len(testcases_summaries),
+                    "success": 0,
+                    "fail": 0,
+                },
                 "teststeps": {},
             },
             "time": {},
@@ -172,18 +437,13 @@ class HttpRunner(object):
             "details": [],
         }
 
-        for tests_result in tests_results:
-            testcase, result = tests_result
-            testcase_summary = report.get_summary(result)
-
+        for testcase_summary in testcases_summaries:
             if testcase_summary["success"]:
                 summary["stat"]["testcases"]["success"] += 1
             else:
                 summary["stat"]["testcases"]["fail"] += 1
 
             summary["success"] &= testcase_summary["success"]
-            testcase_summary["name"] = testcase.config.get("name")
-            testcase_summary["in_out"] = utils.get_testcase_io(testcase)
 
             report.aggregate_stat(
                 summary["stat"]["teststeps"], testcase_summary["stat"]
@@ -194,8 +454,31 @@ class HttpRunner(object):
 
         return summary
 
+    def _make_run_context(self, project_working_directory=None):
+        """make run context with record options of HttpRunner."""
+        run_context = runtime.RunContext(project_working_directory, self.record)
+        if self.result_store:
+            # records of former run are released
+            if self.record_store:
+                self.record_store.close()
+            self.record_store = report.RecordStore(self.result_store)
+            run_context.record_store = self.record_store
+
+        return run_context
+
     def run_tests(self, tests_mapping):
-        """run testcase/testsuite data"""
+        """run testcase/testsuite data in a new run context, thus states of the run,
+        e.g. parse failures and function results, are not shared with other runs.
+        """
+        project_mapping = tests_mapping.get("project_mapping", {})
+        project_working_directory = (
+            project_mapping.get("PWD")
+            or runtime.get_run_context().project_working_directory
+        )
+        with self._make_run_context(project_working_directory).activate():
+            return self._run_tests(tests_mapping)
+
+    def _run_tests(self, tests_mapping):
         ga_client.track_event("RunAPITests", "hrun")
         project_mapping = tests_mapping.get("project_mapping", {})
         self.project_working_directory = project_mapping.get("PWD", os.getcwd())
@@ -203,32 +486,46 @@ class HttpRunner(object):
         if self.save_tests:
             utils.dump_logs(tests_mapping, project_mapping, "loaded")
 
-        # parse tests
+        # parse tests, testcases are generated lazily while running
         self.exception_stage = "parse tests"
-        parsed_testcases = parser.parse_tests(tests_mapping)
-        parse_failed_testfiles = parser.get_parse_failed_testfiles()
-        if parse_failed_testfiles:
-            logger.log_warning("parse failures occurred ...")
-            utils.dump_logs(parse_failed_testfiles, project_mapping, "parse_failed")
+        parsed_testcases = parser.iter_parse_tests(tests_mapping, self.shard)
+        if self.save_tests:
+            parsed_testcases = list(parsed_testcases)
 
-        if len(parsed_testcases) == 0:
+        try:
+            first_testcase = next(iter(parsed_testcases))
+        except StopIteration:
+            self._dump_parse_failures(project_mapping)
             logger.log_error("failed to parse all cases, abort.")
             raise exceptions.ParseTestsFailure
 
         if self.save_tests:
             utils.dump_logs(parsed_testcases, project_mapping, "parsed")
+        else:
+            parsed_testcases = itertools.chain([first_testcase], parsed_testcases)
+
+        if self.workers > 1:
+            # run testcases in process pool
+            self.exception_stage = "run testcases in workers"
+            testcases_summaries = self._run_suite_in_workers(parsed_testcases)
 
-        # add tests to test suite
-        self.exception_stage = "add tests to test suite"
-        test_suite = self._add_tests(parsed_testcases)
+            # aggregate results
+            self.exception_stage = "aggregate results"
+            self._summary = self._aggregate_summaries(testcases_summaries)
+        else:
+            # add tests to test suite
+            self.exception_stage = "add tests to test suite"
+            test_suite = self._add_testcases(parsed_testcases)
+
+            # run test suite
+            self.exception_stage = "run test suite"
+            results = self._run_suite(test_suite)
 
-        # run test suite
-        self.exception_stage = "run test suite"
-        results = self._run_suite(test_suite)
+            # aggregate results
+            self.exception_stage = "aggregate results"
+            self._summary = self._aggregate(results)
 
-        # aggregate results
-        self.exception_stage = "aggregate results"
-        self._summary = self._aggregate(results)
+        self._dump_parse_failures(project_mapping)
 
         # generate html report
         self.exception_stage = "generate html report"
@@ -240,8 +537,19 @@ class HttpRunner(object):
             vars_out = self.get_vars_out()
             utils.dump_logs(vars_out, project_mapping, "io")
 
+        function_cache = runtime.get_run_context().function_cache
+        logger.log_debug("function cache: {}".format(function_cache.get_stat()))
+        logger.log_debug(
+            "connection pool: {}".format(client.get_connection_pool_stat())
+        )
         return self._summary
 
+    def _dump_parse_failures(self, project_mapping):
+        parse_failed_testfiles = parser.get_parse_failed_testfiles()
+        if parse_failed_testfiles:
+            logger.log_warning("parse failures occurred ...")
+            utils.dump_logs(parse_failed_testfiles, project_mapping, "parse_failed")
+
     def get_vars_out(self):
         """get variables and output
         Returns:
@@ -268,6 +576,10 @@ class HttpRunner(object):
 
         return [summary["in_out"] for summary in self._summary["details"]]
 
+    def _load_cases(self, path, dot_env_path=None):
+        """load testcase/testsuite file or folder in current run context."""
+        return loader.load_cases(path, dot_env_path, self.use_cache)
+
     def run_path(self, path, dot_env_path=None, mapping=None):
         """run testcase/testsuite file or folder.
 
@@ -280,14 +592,17 @@ class HttpRunner(object):
             dict: result summary
 
         """
-        # load tests
-        self.exception_stage = "load tests"
-        tests_mapping = loader.load_cases(path, dot_env_path)
+        # tests are loaded and run in the same run context,
+        # thus api/testcase definitions loaded are released when the run ends.
+        with self._make_run_context().activate():
+            # load tests
+            self.exception_stage = "load tests"
+            tests_mapping = self._load_cases(path, dot_env_path)
 
-        if mapping:
-            tests_mapping["project_mapping"]["variables"] = mapping
+            if mapping:
+                tests_mapping["project_mapping"]["variables"] = mapping
 
-        return self.run_tests(tests_mapping)
+            return self._run_tests(tests_mapping)
 
     def run(self, path_or_tests, dot_env_path=None, mapping=None):
         """main interface.
@@ -310,8 +625,9 @@ class HttpRunner(object):
             project_working_directory = path_or_tests.get("project_mapping", {}).get(
                 "PWD", os.getcwd()
             )
-            loader.init_pwd(project_working_directory)
-            return self.run_tests(path_or_tests)
+            with self._make_run_context().activate():
+                loader.init_pwd(project_working_directory)
+                return self._run_tests(path_or_tests)
         else:
             raise exceptions.ParamsError(
                 "Invalid testcase path or testcases: {}".format(path_or_tests)
@@ -2,6 +2,7 @@
 Built-in functions used in YAML/JSON testcases.
 """
 
+import contextvars
 import datetime
 import random
 import string
@@ -31,6 +32,16 @@ def get_current_date(fmt="%Y-%m-%d"):
     return datetime.datetime.now().strftime(fmt)
 
 
+# seconds to sleep which are deferred by asyncio execution engine,
+# set to a list when running in AsyncRunner, thus sleep will not block event loop.
+deferred_sleeps = contextvars.ContextVar("deferred_sleeps", default=None)
+
+
 def sleep(n_secs):
     """sleep n seconds"""
+    pending_sleeps = deferred_sleeps.get()
+    if pending_sleeps is not None:
+        pending_sleeps.append(n_secs)
+        return
+
     time.sleep(n_secs)
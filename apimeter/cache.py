@@ -0,0 +1,172 @@
+"""
+function result cache
+
+Results of functions in config variables are cached and shared by teststeps,
+e.g. ${gen_random_string(5)} is evaluated only once in one testcase.
+
+Pure functions in debugtalk.py can be marked with memoize decorator, then their
+results are cached by arguments in the scope of run or testcase.
+
+FunctionCache is kept in context of each run, see runtime.RunContext, thus it is
+released when the run ends. Entries are evicted in LRU order when size limit is
+reached, and expired after ttl seconds if specified.
+"""
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+
+from apimeter import exceptions
+
+# default size limit of function cache
+DEFAULT_MAXSIZE = 1024
+
+# sentinel of function result not cached
+NOT_CACHED = object()
+
+# types of arguments used in cache key directly, others are used in repr format
+SIMPLE_ARG_TYPES = (str, bytes, int, float, bool, type(None))
+
+
+def make_cache_key(func_name, args, kwargs):
+    """make cache key of function call, arguments of simple types are used directly
+    together with their types, as 1, 1.0 and True are equal keys of dict, otherwise
+    arguments are used in repr format.
+    """
+    if all(type(arg) in SIMPLE_ARG_TYPES for arg in args) and all(
+        type(value) in SIMPLE_ARG_TYPES for value in kwargs.values()
+    ):
+        return (
+            func_name,
+            tuple((type(arg), arg) for arg in args),
+            tuple(sorted((key, type(value), value) for key, value in kwargs.items())),
+        )
+
+    return (func_name, repr(args), repr(kwargs))
+
+
+class FunctionCache(object):
+    """thread-safe LRU cache of function results, with optional ttl.
+
+    Examples:
+        >>> function_cache = FunctionCache(maxsize=2)
+        >>> function_cache.set("key", "value")
+        >>> function_cache.get("key")
+        "value"
+
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=None):
+        """
+        Args:
+            maxsize (int): max entries count, least recently used entry will be
+                evicted when exceeded.
+            ttl (float): seconds to live of each entry, default is None, never expire.
+
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """get cached value of key, default is returned if not found or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expire_at = entry
+            if expire_at is not None and expire_at < time.time():
+                del self._entries[key]
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """cache value of key, least recently used entry is evicted if full."""
+        expire_at = time.time() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expire_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_stat(self):
+        """get cache statistics.
+
+        Returns:
+            dict: {"hits": 1, "misses": 2, "size": 2, "maxsize": 1024}
+
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+class CacheScope(object):
+    """caches of memoized functions in one scope, e.g. one run or one testcase."""
+
+    def __init__(self):
+        self._caches = {}
+        self._lock = threading.Lock()
+
+    def get_cache(self, func, maxsize=DEFAULT_MAXSIZE, ttl=None):
+        """get cache of memoized function, created on first call."""
+        with self._lock:
+            if func not in self._caches:
+                self._caches[func] = FunctionCache(maxsize, ttl)
+
+            return self._caches[func]
+
+
+# memoize scope of current testcase, set by Runner.run_test
+current_testcase_scope = contextvars.ContextVar("testcase_scope", default=None)
+
+MEMOIZE_SCOPES = ("run", "testcase")
+
+
+def memoize(scope="run", maxsize=DEFAULT_MAXSIZE, ttl=None):
+    """mark debugtalk.py function as pure, which will be called only once for the same
+    arguments in specified scope when referenced in testcases.
+
+    Args:
+        scope (str): run or testcase, results are shared in the whole run,
+            or in one testcase.
+        maxsize (int): max cached results count of the function in each scope.
+        ttl (float): seconds to live of each cached result, default is never expire.
+
+    Examples:
+        >>> import apimeter
+        >>> @apimeter.memoize(scope="testcase", maxsize=128)
+        ... def gen_signature(app_key, timestamp):
+        ...     ...
+
+    """
+    if scope not in MEMOIZE_SCOPES:
+        raise exceptions.ParamsError(
+            "memoize scope should be in {}, given: {}".format(MEMOIZE_SCOPES, scope)
+        )
+
+    def decorator(func):
+        func.__memoize__ = {"scope": scope, "maxsize": maxsize, "ttl": ttl}
+        return func
+
+    return decorator
@@ -2,29 +2,26 @@ import argparse
 import os
 import sys
 
-import sentry_sdk
-
-from apimeter import __description__, __version__, exceptions
-from apimeter.api import HttpRunner
+# NOTICE: only light modules are imported at startup, modules like requests, jinja2,
+# jsonschema and sentry_sdk are imported in the commands which need them.
+from apimeter import __description__, __version__
 from apimeter.compat import is_py2
-from apimeter.loader import load_cases
 from apimeter.logger import color_print, log_error
-from apimeter.report import gen_html_report
-from apimeter.utils import (
-    create_scaffold,
-    get_python2_retire_msg,
-    prettify_json_file,
-    init_sentry_sdk,
-)
-
-init_sentry_sdk()
 
 
 def main():
     """API test: parse command line options and run commands."""
     if is_py2:
+        from apimeter.utils import get_python2_retire_msg
+
         color_print(get_python2_retire_msg(), "YELLOW")
 
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        # apimeter serve: start runner daemon
+        from apimeter.server import main_serve
+
+        sys.exit(main_serve(sys.argv[2:]))
+
     parser = argparse.ArgumentParser(description=__description__)
     parser.add_argument(
         "-V", "--version", dest="version", action="store_true", help="show version"
@@ -71,6 +68,48 @@ def main():
         default=False,
         help="Stop the test run on the first error or failure.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Run testcases in specified number of worker processes, default is 1.",
+    )
+    parser.add_argument(
+        "--step-workers",
+        type=int,
+        default=1,
+        help="Run independent teststeps of each testcase concurrently in specified "
+        "number of threads, default is 1.",
+    )
+    parser.add_argument(
+        "--use-unittest",
+        action="store_true",
+        default=False,
+        help="Run testcases with unittest for compatibility.",
+    )
+    parser.add_argument(
+        "--shard",
+        default=None,
+        help="Run only the i-th of n shards of generated testcases, e.g. 1/4.",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        default=False,
+        help="Cache loaded tests in .apimeter_cache, reuse them if files unchanged.",
+    )
+    parser.add_argument(
+        "--record",
+        choices=["full", "failures", "stats"],
+        default="full",
+        help="Record request/response details of all teststeps, failed teststeps "
+        "only, or stats only, default is full.",
+    )
+    parser.add_argument(
+        "--result-store",
+        help="Spill teststep records to specified SQLite file while running, "
+        "thus memory is bounded in large runs.",
+    )
     parser.add_argument("--startproject", help="Specify new project name.")
     parser.add_argument(
         "--validate",
@@ -91,6 +130,9 @@ def main():
         sys.exit(0)
 
     if args.validate:
+        from apimeter import exceptions
+        from apimeter.loader import load_cases
+
         for validate_path in args.validate:
             try:
                 color_print("validate test file: {}".format(validate_path), "GREEN")
@@ -103,20 +145,46 @@ def main():
         sys.exit(0)
 
     if args.prettify:
+        from apimeter.utils import prettify_json_file
+
         prettify_json_file(args.prettify)
         sys.exit(0)
 
     project_name = args.startproject
     if project_name:
+        from apimeter.utils import create_scaffold
+
         create_scaffold(project_name)
         sys.exit(0)
 
+    sys.exit(run_tests(args))
+
+
+def run_tests(args):
+    """run testfile paths with HttpRunner and generate html reports.
+
+    Returns:
+        int: exit code, 0 if all tests passed.
+
+    """
+    from apimeter.api import HttpRunner
+    from apimeter.report import gen_html_report
+    from apimeter.utils import capture_exception, init_sentry_sdk
+
+    init_sentry_sdk()
     runner = HttpRunner(
         failfast=args.failfast,
         save_tests=args.save_tests,
         log_level=args.log_level,
         log_file=args.log_file,
-        skip_success=args.skip_success
+        skip_success=args.skip_success,
+        workers=args.workers,
+        step_workers=args.step_workers,
+        use_unittest=args.use_unittest,
+        shard=args.shard,
+        use_cache=args.cache,
+        record=args.record,
+        result_store=args.result_store,
     )
 
     err_code = 0
@@ -140,10 +208,10 @@ def main():
             "YELLOW",
         )
         color_print(str(ex), "RED")
-        sentry_sdk.capture_exception(ex)
+        capture_exception(ex)
         err_code = 1
 
-    sys.exit(err_code)
+    return err_code
 
 
 if __name__ == "__main__":
@@ -1,22 +1,45 @@
 # encoding: utf-8
 
+import contextvars
+import functools
 import time
 import os
+import socket
+import ssl
+import threading
+from collections import OrderedDict
+
 import requests
 import urllib3
-from requests import Request, Response
-from requests.adapters import HTTPAdapter
+from requests import PreparedRequest, Request, Response
+from requests.adapters import DEFAULT_CA_BUNDLE_PATH, HTTPAdapter
+from requests.compat import cookielib, urlparse
+from requests.cookies import RequestsCookieJar, cookiejar_from_dict, merge_cookies
 from requests.exceptions import (
     InvalidSchema,
     InvalidURL,
     MissingSchema,
     RequestException,
 )
+from requests.sessions import merge_hooks, merge_setting
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_environ_proxies, get_netrc_auth, select_proxy
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util import connection as urllib3_connection
 from urllib3.util.retry import Retry
+from urllib3.util.ssl_ import create_urllib3_context
 
-from apimeter import logger, response
+from apimeter import logger, response, runtime
 from apimeter.utils import lower_dict_keys, omit_long_data
 
+try:
+    from urllib3.exceptions import NameResolutionError
+except ImportError:
+    # urllib3 < 2.0 raises NewConnectionError for dns failure
+    NameResolutionError = None
+
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 
@@ -89,6 +112,48 @@ def get_req_resp_record(resp_obj):
     return req_resp_dict
 
 
+def record_meta_datas(meta_datas, status, record_policy=None):
+    """materialize request and response records of teststep by record policy.
+
+    Sessions with lean record policy keep references of responses in meta data,
+    records are generated only when teststep failed or policy is full.
+
+    Args:
+        meta_datas (dict/list): meta data of teststep, maybe in nested format.
+        status (str): teststep status, success/failure/error/skipped.
+        record_policy (str): full/failures/stats, default is set by run context.
+
+    Returns:
+        dict/list: meta data to be kept in test result.
+
+    """
+    record_policy = record_policy or runtime.get_run_context().record_policy
+    if isinstance(meta_datas, list):
+        return [
+            record_meta_datas(meta_data, status, record_policy)
+            for meta_data in meta_datas
+        ]
+
+    if not isinstance(meta_datas, dict):
+        return meta_datas
+
+    responses = meta_datas.pop("responses", None)
+    if record_policy == "stats" or (
+        record_policy == "failures" and status == "success"
+    ):
+        # keep stat only, request and response details are released
+        return {
+            "name": meta_datas.get("name", ""),
+            "data": [],
+            "stat": meta_datas.get("stat", {}),
+        }
+
+    if responses is not None:
+        meta_datas["data"] = [get_req_resp_record(resp_obj) for resp_obj in responses]
+
+    return meta_datas
+
+
 class ApiResponse(Response):
     def raise_for_status(self):
         if hasattr(self, "error") and self.error:
@@ -96,6 +161,512 @@ class ApiResponse(Response):
         Response.raise_for_status(self)
 
 
+# max count of prepared URLs kept in cache
+PREPARED_URL_CACHE_SIZE = 1024
+# types of params keys and values which prepared URL is cached for
+CACHED_PARAM_TYPES = (str, bytes, int, float, bool, type(None))
+# params which prepared URL is not cached for
+NOT_CACHED = object()
+
+
+def get_env_flag(name, default="false"):
+    """get boolean flag from environment, true/on/yes/1 are regarded as True."""
+    return os.getenv(name, default).lower() in ("true", "on", "yes", "1")
+
+
+def is_pool_disabled():
+    """connection pool is disabled by environment APIMETER_DISABLE_POOL."""
+    return get_env_flag("APIMETER_DISABLE_POOL")
+
+
+@functools.lru_cache(maxsize=PREPARED_URL_CACHE_SIZE)
+def _prepare_url(url, params_key):
+    if isinstance(params_key, tuple):
+        params = [(key, value) for _, key, _, value in params_key]
+    else:
+        params = params_key
+
+    prepared_request = PreparedRequest()
+    prepared_request.prepare_url(url, params)
+    return prepared_request.url
+
+
+def _get_params_key(params):
+    """get cache key of request params, types of keys and values are included in
+    key, as 1, 1.0 and True are equal but encoded differently in query string.
+
+    Returns:
+        None/str/bytes/tuple: cache key, or NOT_CACHED if params is not cacheable.
+
+    """
+    if params is None or isinstance(params, (str, bytes)):
+        return params
+
+    if not isinstance(params, dict):
+        return NOT_CACHED
+
+    params_key = tuple(
+        (type(key), key, type(value), value) for key, value in params.items()
+    )
+    for key_type, _, value_type, _ in params_key:
+        if key_type not in CACHED_PARAM_TYPES or value_type not in CACHED_PARAM_TYPES:
+            # e.g. {"ids": [1, 2]}, items in list may be equal but of different types
+            return NOT_CACHED
+
+    return params_key
+
+
+@functools.lru_cache(maxsize=PREPARED_URL_CACHE_SIZE)
+def _prepare_headers(headers):
+    prepared_request = PreparedRequest()
+    prepared_request.prepare_headers(OrderedDict(headers))
+    return prepared_request.headers
+
+
+def merge_session_setting(request_setting, session_setting, dict_class=OrderedDict):
+    """fast path of requests.sessions.merge_setting for dict settings, which is
+    called for each request to merge headers, params and so on with session.
+    """
+    mapping_types = (dict, CaseInsensitiveDict)
+    if not (
+        isinstance(request_setting, mapping_types)
+        and isinstance(session_setting, mapping_types)
+    ):
+        return merge_setting(request_setting, session_setting, dict_class)
+
+    merged_setting = dict_class(session_setting)
+    merged_setting.update(request_setting)
+
+    # remove keys that are set to None
+    for key in [key for key, value in merged_setting.items() if value is None]:
+        del merged_setting[key]
+
+    return merged_setting
+
+
+class CachedPreparedRequest(PreparedRequest):
+    """PreparedRequest with URL and headers prepared from cache, as they are usually
+    the same for repeated runs of teststep, e.g. times and parameters.
+    """
+
+    def prepare_headers(self, headers):
+        if not headers:
+            super(CachedPreparedRequest, self).prepare_headers(headers)
+            return
+
+        try:
+            prepared_headers = _prepare_headers(tuple(headers.items()))
+        except TypeError:
+            # unhashable header value, invalid header is raised by requests
+            super(CachedPreparedRequest, self).prepare_headers(headers)
+        else:
+            # headers will be updated by body, auth and cookies
+            self.headers = prepared_headers.copy()
+
+    def prepare_url(self, url, params):
+        params_key = _get_params_key(params)
+        if params_key is NOT_CACHED:
+            super(CachedPreparedRequest, self).prepare_url(url, params)
+        else:
+            self.url = _prepare_url(url, params_key)
+
+
+class RequestTiming(object):
+    """timing phases of one request, include 30X redirection and retries.
+
+    Phases are measured with monotonic clock in connection of urllib3, dns, connect
+    and tls are only measured for new connections, thus they are 0 if connection
+    is reused from pool.
+    """
+
+    PHASES = ("dns_ms", "connect_ms", "tls_ms", "ttfb_ms", "download_ms")
+
+    def __init__(self):
+        self.phases = dict.fromkeys(self.PHASES, 0.0)
+        self.retries = 0
+        # time when the latest response headers are received
+        self.response_received_at = None
+
+    def add(self, phase, seconds):
+        self.phases[phase] += seconds * 1000
+
+    def get_stat(self):
+        stat = {phase: round(value, 2) for phase, value in self.phases.items()}
+        stat["retries"] = self.retries
+        return stat
+
+
+# timing of request being sent in current thread
+current_request_timing = contextvars.ContextVar("request_timing", default=None)
+
+
+class TimedConnectionMixin(object):
+    """record dns, connect, tls and ttfb phases to current request timing."""
+
+    _connect_seconds = 0
+    _new_conn_seconds = 0
+    _request_started_at = None
+
+    def _new_conn(self):
+        timing = current_request_timing.get()
+        if timing is None:
+            return super(TimedConnectionMixin, self)._new_conn()
+
+        started_at = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(
+                self._dns_host,
+                self.port,
+                urllib3_connection.allowed_gai_family(),
+                socket.SOCK_STREAM,
+            )
+        except UnicodeError:
+            # invalid host label, urllib3 raises LocationParseError before dns lookup
+            return super(TimedConnectionMixin, self)._new_conn()
+        except OSError as ex:
+            timing.add("dns_ms", time.perf_counter() - started_at)
+            self._raise_new_conn_error(ex)
+
+        resolved_at = time.perf_counter()
+        timing.add("dns_ms", resolved_at - started_at)
+
+        # try each resolved address in turn like urllib3, the last error is raised
+        error = OSError("getaddrinfo returns an empty list")
+        for address in addresses:
+            try:
+                sock = urllib3_connection.create_connection(
+                    (address[4][0], self.port),
+                    self.timeout,
+                    source_address=self.source_address,
+                    socket_options=self.socket_options,
+                )
+            except OSError as ex:
+                error = ex
+                continue
+
+            connected_at = time.perf_counter()
+            timing.add("connect_ms", connected_at - resolved_at)
+            self._new_conn_seconds = connected_at - started_at
+            return sock
+
+        timing.add("connect_ms", time.perf_counter() - resolved_at)
+        self._raise_new_conn_error(error)
+
+    def _raise_new_conn_error(self, error):
+        """raise the same urllib3 error with HTTPConnection._new_conn."""
+        if isinstance(error, socket.gaierror) and NameResolutionError is not None:
+            raise NameResolutionError(self.host, self, error) from error
+
+        if isinstance(error, socket.timeout):
+            raise ConnectTimeoutError(
+                self,
+                "Connection to {} timed out. (connect timeout={})".format(
+                    self.host, self.timeout
+                ),
+            ) from error
+
+        raise NewConnectionError(
+            self, "Failed to establish a new connection: {}".format(error)
+        ) from error
+
+    def connect(self):
+        self._new_conn_seconds = 0
+        started_at = time.perf_counter()
+        try:
+            super(TimedConnectionMixin, self).connect()
+        finally:
+            self._connect_seconds += time.perf_counter() - started_at
+
+        timing = current_request_timing.get()
+        if timing is not None and isinstance(self, HTTPSConnection):
+            timing.add(
+                "tls_ms",
+                time.perf_counter() - started_at - self._new_conn_seconds,
+            )
+
+    def request(self, *args, **kwargs):
+        # connection may be established lazily when sending request
+        self._connect_seconds = 0
+        self._request_started_at = time.perf_counter()
+        return super(TimedConnectionMixin, self).request(*args, **kwargs)
+
+    def getresponse(self, *args, **kwargs):
+        resp = super(TimedConnectionMixin, self).getresponse(*args, **kwargs)
+        timing = current_request_timing.get()
+        if timing is not None and self._request_started_at is not None:
+            # time to first byte, from sending request to receiving response headers
+            timing.add(
+                "ttfb_ms",
+                time.perf_counter() - self._request_started_at - self._connect_seconds,
+            )
+            self._request_started_at = None
+
+        return resp
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+TIMED_POOL_CLASSES = {
+    "http": TimedHTTPConnectionPool,
+    "https": TimedHTTPSConnectionPool,
+}
+
+
+class TimedRetry(Retry):
+    """count retry attempts in current request timing."""
+
+    def increment(self, *args, **kwargs):
+        new_retry = super(TimedRetry, self).increment(*args, **kwargs)
+        timing = current_request_timing.get()
+        if timing is not None:
+            timing.retries += 1
+
+        return new_retry
+
+
+def _mark_response_received(resp, *args, **kwargs):
+    """response hook called before response body is downloaded."""
+    timing = current_request_timing.get()
+    if timing is not None:
+        timing.response_received_at = time.perf_counter()
+
+
+def make_retry_strategy():
+    # 配置重试策略，解决连接池中僵尸连接导致的 Connection reset 问题
+    # 当 SSL 握手失败或连接被重置时，自动重试而不是直接失败
+    return TimedRetry(
+        total=3,              # 总共重试3次
+        connect=3,            # 连接失败（包括SSL握手失败）重试3次
+        read=2,               # 读取超时重试2次
+        status_forcelist=[500, 502, 503, 504],  # 这些HTTP状态码也重试
+        allowed_methods=["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "TRACE", "POST"],
+        backoff_factor=0.5,   # 重试延迟：0.5s, 1s, 2s
+        raise_on_status=False,
+    )
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTP adapter with connections recording timing phases of requests."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(TimedHTTPAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super(TimedHTTPAdapter, self).proxy_manager_for(
+            proxy, **proxy_kwargs
+        )
+        if isinstance(manager, urllib3.ProxyManager):
+            # SOCKS proxy manager has its own connection classes
+            manager.pool_classes_by_scheme = TIMED_POOL_CLASSES
+
+        return manager
+
+
+# connections are pooled by SSLContext with this hook since requests 2.32,
+# otherwise SharedHTTPAdapter falls back to overriding get_connection
+HAS_POOL_KEY_HOOK = hasattr(HTTPAdapter, "build_connection_pool_key_attributes")
+
+if not HAS_POOL_KEY_HOOK:
+    logger.log_debug(
+        "requests {} has no connection pool key hook, "
+        "SSLContext is cached by get_connection".format(requests.__version__)
+    )
+
+
+class SharedHTTPAdapter(TimedHTTPAdapter):
+    """HTTP adapter shared by all HttpSession instances of one process, thus
+    keep-alive connections are reused across testcases, while cookies are still
+    kept in each session.
+
+    SSLContext is created once for each verify/cert, CA bundle and client cert
+    are loaded into it, instead of being loaded for each new connection.
+    """
+
+    def __init__(self, **kwargs):
+        self._ssl_contexts = {}
+        self._ssl_contexts_lock = threading.Lock()
+        # verify/cert of sending request in current thread, for requests < 2.32
+        self._tls_settings = threading.local()
+        super(SharedHTTPAdapter, self).__init__(**kwargs)
+
+    def __setstate__(self, state):
+        self._ssl_contexts = {}
+        self._ssl_contexts_lock = threading.Lock()
+        self._tls_settings = threading.local()
+        super(SharedHTTPAdapter, self).__setstate__(state)
+
+    def get_ssl_context(self, verify, cert=None):
+        """get cached SSLContext with CA bundle and client cert loaded.
+
+        Returns:
+            ssl.SSLContext: None if CA bundle or cert file not exists, then
+                connection is verified by requests as usual and error is raised.
+
+        """
+        if isinstance(cert, list):
+            cert = tuple(cert)
+
+        key = (verify, cert)
+        with self._ssl_contexts_lock:
+            if key not in self._ssl_contexts:
+                self._ssl_contexts[key] = self._create_ssl_context(verify, cert)
+
+            return self._ssl_contexts[key]
+
+    @staticmethod
+    def _create_ssl_context(verify, cert):
+        if isinstance(cert, tuple):
+            cert_file, key_file = cert
+        else:
+            cert_file, key_file = cert, None
+
+        cert_loc = DEFAULT_CA_BUNDLE_PATH if verify is True else verify
+        files = [cert_loc if verify else None, cert_file, key_file]
+        if not all(os.path.exists(path) for path in files if path):
+            logger.log_debug(
+                "SSLContext caching is disabled, CA bundle or cert file not found: "
+                "verify={}, cert={}".format(verify, cert)
+            )
+            return None
+
+        context = create_urllib3_context(
+            cert_reqs=ssl.CERT_REQUIRED if verify else ssl.CERT_NONE
+        )
+        if verify:
+            if os.path.isdir(cert_loc):
+                context.load_verify_locations(capath=cert_loc)
+            else:
+                context.load_verify_locations(cafile=cert_loc)
+
+        if cert_file:
+            context.load_cert_chain(cert_file, key_file)
+
+        return context
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        # available since requests 2.32, connections are pooled by SSLContext
+        host_params, pool_kwargs = super(
+            SharedHTTPAdapter, self
+        ).build_connection_pool_key_attributes(request, verify, cert)
+        if host_params["scheme"] == "https":
+            ssl_context = self.get_ssl_context(verify, cert)
+            if ssl_context is not None:
+                pool_kwargs["ssl_context"] = ssl_context
+
+        return host_params, pool_kwargs
+
+    def send(
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        if not HAS_POOL_KEY_HOOK:
+            self._tls_settings.value = (verify, cert)
+
+        try:
+            return super(SharedHTTPAdapter, self).send(
+                request,
+                stream=stream,
+                timeout=timeout,
+                verify=verify,
+                cert=cert,
+                proxies=proxies,
+            )
+        finally:
+            self._tls_settings.value = None
+
+    def get_connection(self, url, proxies=None):
+        # requests < 2.32 gets connection without verify/cert, which are kept in send
+        tls_settings = getattr(self._tls_settings, "value", None)
+        parsed = urlparse(url)
+        if tls_settings is None or parsed.scheme != "https" or select_proxy(
+            url, proxies
+        ):
+            return super(SharedHTTPAdapter, self).get_connection(url, proxies)
+
+        ssl_context = self.get_ssl_context(*tls_settings)
+        if ssl_context is None:
+            return super(SharedHTTPAdapter, self).get_connection(url, proxies)
+
+        return self.poolmanager.connection_from_host(
+            parsed.hostname,
+            port=parsed.port,
+            scheme="https",
+            pool_kwargs={"ssl_context": ssl_context},
+        )
+
+    def cert_verify(self, conn, url, verify, cert):
+        super(SharedHTTPAdapter, self).cert_verify(conn, url, verify, cert)
+        if getattr(conn, "conn_kw", {}).get("ssl_context") is not None:
+            # CA bundle and client cert have been loaded into cached SSLContext
+            conn.ca_certs = None
+            conn.ca_cert_dir = None
+            conn.cert_file = None
+            conn.key_file = None
+
+    def get_stat(self):
+        """get stat of connection pools, connections are reused if requests are more
+        than connections.
+
+        Returns:
+            dict: pools, connections, requests, reused and ssl_contexts count.
+
+        """
+        pools = [
+            self.poolmanager.pools.get(key) for key in self.poolmanager.pools.keys()
+        ]
+        pools = [pool for pool in pools if pool is not None]
+        connections = sum(pool.num_connections for pool in pools)
+        requests_count = sum(pool.num_requests for pool in pools)
+        return {
+            "pools": len(pools),
+            "connections": connections,
+            "requests": requests_count,
+            "reused": max(requests_count - connections, 0),
+            "ssl_contexts": len(self._ssl_contexts),
+        }
+
+
+# process id => shared adapter, adapter is not shared with forked processes
+_shared_adapter = {}
+_shared_adapter_lock = threading.Lock()
+
+
+def get_shared_adapter():
+    """get HTTP adapter shared by HttpSession instances of current process."""
+    pid = os.getpid()
+    with _shared_adapter_lock:
+        if pid not in _shared_adapter:
+            _shared_adapter.clear()
+            _shared_adapter[pid] = SharedHTTPAdapter(
+                max_retries=make_retry_strategy(),
+                pool_connections=20,
+                pool_maxsize=20,
+                pool_block=False,
+            )
+
+        return _shared_adapter[pid]
+
+
+def get_connection_pool_stat():
+    """get stat of shared connection pools in current process, empty if not used."""
+    adapter = _shared_adapter.get(os.getpid())
+    return adapter.get_stat() if adapter else {}
+
+
 class HttpSession(requests.Session):
     """
     Class for performing HTTP requests and holding (session-) cookies between requests (in order
@@ -106,39 +677,55 @@ class HttpSession(requests.Session):
     :py:class:`requests.Session` class and mostly this class works exactly the same.
     """
 
-    def __init__(self):
+    def __init__(self, trust_env=None, record_policy=None):
+        """
+        Args:
+            trust_env (bool): trust environment settings for proxies, CA bundle and
+                netrc auth, default is set by environment APIMETER_TRUST_ENV (true).
+            record_policy (str): full/failures/stats, full records request and
+                response details of each request, others keep references of
+                responses until teststep is recorded. Default is set by run context.
+
+        """
         super(HttpSession, self).__init__()
         self.init_meta_data()
+        self.record_policy = record_policy or runtime.get_run_context().record_policy
 
-        # 配置重试策略，解决连接池中僵尸连接导致的 Connection reset 问题
-        # 当 SSL 握手失败或连接被重置时，自动重试而不是直接失败
-        retry_strategy = Retry(
-            total=3,              # 总共重试3次
-            connect=3,            # 连接失败（包括SSL握手失败）重试3次
-            read=2,               # 读取超时重试2次
-            status_forcelist=[500, 502, 503, 504],  # 这些HTTP状态码也重试
-            allowed_methods=["HEAD", "GET", "PUT", "DELETE", "OPTIONS", "TRACE", "POST"],
-            backoff_factor=0.5,   # 重试延迟：0.5s, 1s, 2s
-            raise_on_status=False,
-        )
+        # 会话级配置只解析一次，避免每个请求都读取环境变量
+        self.default_timeout = int(os.getenv("APIMETER_DEFAULT_TIMEOUT", "120"))
+        self.close_connection = get_env_flag("APIMETER_CLOSE_CONNECTION")
+        if trust_env is None:
+            trust_env = get_env_flag("APIMETER_TRUST_ENV", "true")
+        self.trust_env = trust_env
+        # (scheme, netloc, no_proxy) => (proxies, CA bundle, netrc auth) of environment
+        self._environ_settings = {}
 
         # 是否禁用连接池（通过环境变量控制）
         # 禁用连接池可以避免复用僵尸连接，但会略微降低性能
-        disable_pool = os.getenv("APIMETER_DISABLE_POOL", "false").lower() in ("true", "on", "yes", "1")
-        pool_size = 1 if disable_pool else 20
-
-        # 配置 HTTP 适配器，保留连接池以提升性能，但配置重试机制以提升稳定性
-        adapter = HTTPAdapter(
-            max_retries=retry_strategy,
-            pool_connections=pool_size,   # 连接池大小
-            pool_maxsize=pool_size,       # 最大连接数
-            pool_block=False,             # 连接池满时不阻塞
-        )
+        if is_pool_disabled():
+            adapter = TimedHTTPAdapter(
+                max_retries=make_retry_strategy(),
+                pool_connections=1,
+                pool_maxsize=1,
+                pool_block=False,
+            )
+        else:
+            # 进程内共享连接池和 SSLContext，cookies 仍由各 session 独立保存
+            adapter = get_shared_adapter()
 
         # 为 http 和 https 协议挂载适配器
         self.mount('http://', adapter)
         self.mount('https://', adapter)
 
+        # 记录响应头返回时间，用于统计响应体下载耗时
+        self.hooks["response"].append(_mark_response_received)
+
+    def close(self):
+        """close session, shared adapter is kept for other sessions."""
+        for adapter in self.adapters.values():
+            if not isinstance(adapter, SharedHTTPAdapter):
+                adapter.close()
+
     def init_meta_data(self):
         """initialize meta_data, it will store detail data of request and response"""
         self.meta_data = {
@@ -165,9 +752,23 @@ class HttpSession(requests.Session):
         """
         update request and response info from Response() object.
         """
+        if "responses" in self.meta_data:
+            self.meta_data["responses"][-1] = resp_obj
+            return
+
         self.meta_data["data"].pop()
         self.meta_data["data"].append(get_req_resp_record(resp_obj))
 
+    def record_responses(self, response_list):
+        """record request and response histories, include 30X redirection."""
+        if self.record_policy == "full":
+            self.meta_data["data"] = [
+                get_req_resp_record(resp_obj) for resp_obj in response_list
+            ]
+        else:
+            # 仅保留响应对象引用，步骤失败或报告需要时再生成记录
+            self.meta_data["responses"] = response_list
+
     def request(self, method, url, name=None, **kwargs):
         """
         Constructs and sends a :py:class:`requests.Request`.
@@ -216,11 +817,9 @@ class HttpSession(requests.Session):
         self.meta_data["data"][0]["request"]["method"] = method
         self.meta_data["data"][0]["request"]["url"] = url
         # 设置超时时间
-        default_timeout = int(os.getenv("APIMETER_DEFAULT_TIMEOUT", "120"))
-        kwargs.setdefault("timeout", default_timeout)
+        kwargs.setdefault("timeout", self.default_timeout)
         # 设置 Connection 方式
-        close_connection = os.getenv("APIMETER_CLOSE_CONNECTION", "false").lower() in ("true", "on", "yes", "1")
-        if close_connection:
+        if self.close_connection:
             headers = kwargs.get("headers", {})
             if headers is None:
                 headers = {}
@@ -232,9 +831,18 @@ class HttpSession(requests.Session):
 
         self.meta_data["data"][0]["request"].update(kwargs)
 
-        start_timestamp = time.time()
-        response = self._send_request_safe_mode(method, url, **kwargs)
-        response_time_ms = round((time.time() - start_timestamp) * 1000, 2)
+        timing = RequestTiming()
+        token = current_request_timing.set(timing)
+        try:
+            start_timestamp = time.perf_counter()
+            response = self._send_request_safe_mode(method, url, **kwargs)
+            finished_at = time.perf_counter()
+        finally:
+            current_request_timing.reset(token)
+
+        response_time_ms = round((finished_at - start_timestamp) * 1000, 2)
+        if timing.response_received_at is not None:
+            timing.add("download_ms", finished_at - timing.response_received_at)
 
         # get the length of the content, but if the argument stream is set to True, we take
         # the size from the content-length header, in order to not trigger fetching of the body
@@ -246,15 +854,13 @@ class HttpSession(requests.Session):
         # record the consumed time
         self.meta_data["stat"] = {
             "response_time_ms": response_time_ms,
-            "elapsed_ms": response.elapsed.microseconds / 1000.0,
+            "elapsed_ms": round(response.elapsed.total_seconds() * 1000, 2),
             "content_size": content_size,
         }
+        self.meta_data["stat"].update(timing.get_stat())
 
         # record request and response histories, include 30X redirection
-        response_list = response.history + [response]
-        self.meta_data["data"] = [
-            get_req_resp_record(resp_obj) for resp_obj in response_list
-        ]
+        self.record_responses(response.history + [response])
 
         try:
             response.raise_for_status()
@@ -269,6 +875,80 @@ class HttpSession(requests.Session):
 
         return response
 
+    def _get_environ_settings(self, url, no_proxy=None):
+        """get environment settings of url host, which are resolved only once.
+
+        Returns:
+            tuple: (proxies, CA bundle, netrc auth)
+
+        """
+        parsed_url = urlparse(url)
+        key = (parsed_url.scheme, parsed_url.netloc, no_proxy)
+        if key not in self._environ_settings:
+            self._environ_settings[key] = (
+                get_environ_proxies(url, no_proxy=no_proxy),
+                os.environ.get("REQUESTS_CA_BUNDLE")
+                or os.environ.get("CURL_CA_BUNDLE"),
+                get_netrc_auth(url),
+            )
+
+        return self._environ_settings[key]
+
+    def prepare_request(self, request):
+        """the same as requests.Session.prepare_request, except that netrc auth is
+        resolved once for each host, and URL is prepared from cache.
+        """
+        cookies = request.cookies or {}
+        if not isinstance(cookies, cookielib.CookieJar):
+            cookies = cookiejar_from_dict(cookies)
+
+        # merge with session cookies
+        merged_cookies = merge_cookies(
+            merge_cookies(RequestsCookieJar(), self.cookies), cookies
+        )
+
+        auth = request.auth
+        if self.trust_env and not auth and not self.auth:
+            auth = self._get_environ_settings(request.url)[2]
+
+        prepared_request = CachedPreparedRequest()
+        prepared_request.prepare(
+            method=request.method.upper(),
+            url=request.url,
+            files=request.files,
+            data=request.data,
+            json=request.json,
+            headers=merge_session_setting(
+                request.headers, self.headers, dict_class=CaseInsensitiveDict
+            ),
+            params=merge_session_setting(request.params, self.params),
+            auth=merge_setting(auth, self.auth),
+            cookies=merged_cookies,
+            hooks=merge_hooks(request.hooks, self.hooks),
+        )
+        return prepared_request
+
+    def merge_environment_settings(self, url, proxies, stream, verify, cert):
+        """the same as requests.Session.merge_environment_settings, except that
+        environment proxies and CA bundle are resolved once for each host.
+        """
+        if self.trust_env:
+            no_proxy = proxies.get("no_proxy") if proxies is not None else None
+            env_proxies, env_verify, _ = self._get_environ_settings(url, no_proxy)
+            proxies = dict(proxies or {})
+            for key, value in env_proxies.items():
+                proxies.setdefault(key, value)
+
+            if verify is True or verify is None:
+                verify = env_verify or verify
+
+        return {
+            "proxies": merge_session_setting(proxies, self.proxies),
+            "stream": merge_setting(stream, self.stream),
+            "verify": merge_setting(verify, self.verify),
+            "cert": merge_setting(cert, self.cert),
+        }
+
     def _send_request_safe_mode(self, method, url, **kwargs):
         """
         Send a HTTP request, and catch any exception that might occur due to connection problems.
@@ -22,7 +22,7 @@ class SessionContext(object):
         self.test_variables_mapping = {}
         self.init_test_variables()
 
-    def init_test_variables(self, variables_mapping=None):
+    def init_test_variables(self, variables_mapping=None, variables_order=None):
         """init test variables, called when each test(api) starts.
             variables_mapping will be evaluated first.
 
@@ -34,12 +34,17 @@ class SessionContext(object):
                     "data": '{"name": "user", "password": "123456"}',
                     "TOKEN": "debugtalk",
                 }
+            variables_order (list): evaluation order of variables_mapping sorted
+                when parsing teststep, variables are sorted again if not specified.
 
         """
         variables_mapping = variables_mapping or {}
-        variables_mapping = utils.ensure_mapping_format(variables_mapping)
+        # copy variables to avoid influence on teststep shared by concurrent runs
+        variables_mapping = dict(utils.ensure_mapping_format(variables_mapping))
         variables_mapping.update(self.session_variables_mapping)
-        parsed_variables_mapping = parser.parse_variables_mapping(variables_mapping)
+        parsed_variables_mapping = parser.parse_variables_mapping(
+            variables_mapping, variables_order
+        )
 
         self.test_variables_mapping = {}
         # priority: extracted variable > teststep variable
@@ -0,0 +1,215 @@
+"""
+native testcase executor
+
+TestcaseExecutor iterates teststeps of parsed testcase directly, and produces
+TestcaseResult which has the same interface with report.HtmlTestResult used by
+report.get_summary, thus no unittest class is generated for each testcase.
+"""
+
+import time
+import traceback
+from unittest.case import SkipTest
+
+from apimeter import (
+    client,
+    exceptions,
+    logger,
+    parser,
+    report,
+    runner,
+    scheduler,
+    utils,
+)
+
+
+def get_teststep_name(test_dict, config_variables=None):
+    """get teststep name, variables and functions in name will be evaluated if possible.
+
+    Args:
+        test_dict (dict): parsed teststep or nested testcase.
+        config_variables (dict): testcase config variables, which will override
+            teststep variables as in running.
+
+    Returns:
+        str: teststep name
+
+    """
+    if "config" in test_dict:
+        # nested testcase
+        name = test_dict["config"].get("name")
+        variables = test_dict["config"].get("variables", {})
+    else:
+        # api test
+        name = test_dict.get("name")
+        variables = test_dict.get("variables", {})
+
+    if isinstance(name, parser.LazyString):
+        if config_variables:
+            variables = dict(utils.ensure_mapping_format(variables))
+            variables.update(config_variables)
+
+        try:
+            parsed_variables = parser.parse_variables_mapping(variables)
+            name = parser.parse_lazy_data(name, parsed_variables)
+        except exceptions.VariableNotFound:
+            name = str(name)
+
+    return name
+
+
+def expand_teststeps(teststeps):
+    """expand teststeps with times.
+
+    Args:
+        teststeps (list): parsed teststeps.
+
+    Returns:
+        list: list of (index, times_index, test_dict)
+
+    Raises:
+        exceptions.ParamsError: times is not digit.
+
+    """
+    expanded_teststeps = []
+    for index, test_dict in enumerate(teststeps):
+        times = test_dict.get("times", 1)
+        try:
+            times = int(times)
+        except ValueError:
+            raise exceptions.ParamsError(
+                "times should be digit, given: {}".format(times)
+            )
+
+        for times_index in range(times):
+            expanded_teststeps.append((index, times_index, test_dict))
+
+    return expanded_teststeps
+
+
+class TestcaseResult(object):
+    """result of testcase run by TestcaseExecutor, it has the same attributes with
+    report.HtmlTestResult used by report.get_summary.
+    """
+
+    def __init__(self):
+        self.records = report.make_records()
+        self.testsRun = 0
+        self.failures = []
+        self.errors = []
+        self.skipped = []
+        self.expectedFailures = []
+        self.unexpectedSuccesses = []
+        self.start_at = None
+
+    def wasSuccessful(self):
+        return not (self.failures or self.errors or self.unexpectedSuccesses)
+
+    def add_record(self, name, status, attachment="", meta_datas=None):
+        """add teststep record, status maybe success/failure/error/skipped."""
+        self.testsRun += 1
+        if status == "failure":
+            self.failures.append((name, attachment))
+        elif status == "error":
+            self.errors.append((name, attachment))
+        elif status == "skipped":
+            self.skipped.append((name, attachment))
+
+        self.records.append(
+            {
+                "name": name,
+                "status": status,
+                "attachment": attachment,
+                "meta_datas": meta_datas,
+            }
+        )
+
+    @property
+    def duration(self):
+        return time.time() - self.start_at
+
+
+class TestcaseExecutor(object):
+    """run parsed testcase without unittest.
+
+    Examples:
+        >>> testcase_executor = TestcaseExecutor(parsed_testcase)
+        >>> result = testcase_executor.run()
+        >>> report.get_summary(result)
+
+    """
+
+    def __init__(self, testcase, failfast=False, step_workers=1):
+        """
+        Args:
+            testcase (dict): parsed testcase with config and teststeps.
+            failfast (bool): stop running teststeps on the first error or failure.
+            step_workers (int): run independent teststeps concurrently in threads.
+
+        """
+        self.config = testcase.get("config", {})
+        self.teststeps = testcase.get("teststeps", [])
+        self.failfast = failfast
+        self.step_workers = step_workers
+        self.expanded_teststeps = expand_teststeps(self.teststeps)
+        # runner will be initialized when testcase starts running,
+        # thus testcase setup hooks are called right before teststeps.
+        self.runner = None
+
+    def run(self):
+        """run all teststeps in testcase.
+
+        Returns:
+            TestcaseResult: testcase result
+
+        """
+        result = TestcaseResult()
+        result.start_at = time.time()
+        self.runner = runner.Runner(self.config)
+
+        step_scheduler = None
+        if self.step_workers > 1 and len(self.teststeps) > 1:
+            step_scheduler = scheduler.StepScheduler(
+                self.runner, self.step_workers, self.failfast
+            )
+            step_runners = [
+                step_scheduler.add_step(test_dict)
+                for _, _, test_dict in self.expanded_teststeps
+            ]
+        else:
+            step_runners = [self.runner] * len(self.expanded_teststeps)
+
+        for step_runner, (_, _, test_dict) in zip(step_runners, self.expanded_teststeps):
+            status = self._run_step(step_runner, test_dict, result)
+            if self.failfast and status in ["failure", "error"]:
+                break
+
+        return result
+
+    def _run_step(self, step_runner, test_dict, result):
+        """run single teststep and add record to result.
+
+        Returns:
+            str: teststep status
+
+        """
+        test_name = get_teststep_name(test_dict, self.config.get("variables"))
+        logger.color_print(test_name, "yellow")
+
+        attachment = ""
+        try:
+            step_runner.run_test(test_dict)
+        except SkipTest as ex:
+            status = "skipped"
+            attachment = str(ex)
+        except (exceptions.MyBaseFailure, AssertionError):
+            status = "failure"
+            attachment = traceback.format_exc()
+        except Exception:
+            status = "error"
+            attachment = traceback.format_exc()
+        else:
+            status = "success"
+
+        meta_datas = client.record_meta_datas(step_runner.meta_datas, status)
+        result.add_record(test_name, status, attachment, meta_datas)
+        return status
@@ -0,0 +1,421 @@
+""" asyncio execution engine extension.
+
+If you want to use this extension, you should install the following dependencies first.
+
+- httpx, installed with `pip install apimeter[aio]`
+
+AsyncRunner has the same interface with Runner, except that run_test is a coroutine.
+Requests are sent by httpx.AsyncClient, and responses are converted to requests.Response,
+thus meta data recording, extraction and validation are the same with Runner.
+
+Then you can run parsed testcases concurrently in one event loop as below:
+
+    import asyncio
+    from apimeter import parser
+    from apimeter.ext.aio import AsyncRunner
+
+    async def run(testcases):
+        runners = [AsyncRunner(testcase["config"]) for testcase in testcases]
+        try:
+            return await asyncio.gather(
+                *[
+                    test_runner.run_test(testcase)
+                    for test_runner, testcase in zip(runners, testcases)
+                ],
+                return_exceptions=True,
+            )
+        finally:
+            for test_runner in runners:
+                await test_runner.http_client_session.aclose()
+
+    testcases = parser.parse_tests(tests_mapping)
+    asyncio.run(run(testcases))
+
+Builtin function sleep will not block event loop in AsyncRunner, seconds are awaited
+with asyncio.sleep before sending request and after handling response.
+
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+try:
+    import httpx
+except ImportError:
+    msg = """
+aio extension dependencies uninstalled, install first and try again.
+install with pip:
+$ pip install httpx
+or install apimeter with aio extra:
+$ pip install apimeter[aio]
+"""
+    print(msg)
+    sys.exit(0)
+
+import requests
+from requests.cookies import cookiejar_from_dict
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from apimeter import cache, logger, runtime
+from apimeter.builtin.functions import deferred_sleeps
+from apimeter.client import (
+    ApiResponse,
+    HttpSession,
+    RequestTiming,
+    get_env_flag,
+)
+from apimeter.runner import Runner
+
+
+def _to_prepared_request(httpx_request):
+    """convert httpx.Request to requests.PreparedRequest"""
+    prepared_request = requests.PreparedRequest()
+    prepared_request.method = httpx_request.method
+    prepared_request.url = str(httpx_request.url)
+    prepared_request.headers = CaseInsensitiveDict(httpx_request.headers)
+    try:
+        prepared_request.body = httpx_request.content or None
+    except httpx.RequestNotRead:
+        # streaming request body, e.g. upload file
+        prepared_request.body = None
+
+    return prepared_request
+
+
+def to_requests_response(httpx_response):
+    """convert httpx.Response to requests.Response, include 30X redirection history."""
+    resp = requests.Response()
+    resp.status_code = httpx_response.status_code
+    resp.reason = httpx_response.reason_phrase
+    resp.url = str(httpx_response.url)
+    resp.headers = CaseInsensitiveDict(httpx_response.headers)
+    resp.encoding = get_encoding_from_headers(resp.headers)
+    resp._content = httpx_response.content
+    resp.elapsed = httpx_response.elapsed
+    resp.cookies = cookiejar_from_dict(dict(httpx_response.cookies))
+    resp.request = _to_prepared_request(httpx_response.request)
+    resp.history = [
+        to_requests_response(history_response)
+        for history_response in httpx_response.history
+    ]
+    return resp
+
+
+def _prepare_httpx_kwargs(kwargs):
+    """convert requests kwargs to httpx kwargs"""
+    httpx_kwargs = {}
+    for key in ["params", "headers", "cookies", "files", "auth", "json"]:
+        if kwargs.get(key) is not None:
+            httpx_kwargs[key] = kwargs[key]
+
+    data = kwargs.get("data")
+    if isinstance(data, (str, bytes)):
+        httpx_kwargs["content"] = data
+    elif data is not None:
+        httpx_kwargs["data"] = data
+
+    timeout = kwargs.get("timeout")
+    if isinstance(timeout, (list, tuple)):
+        # (connect timeout, read timeout)
+        httpx_kwargs["timeout"] = httpx.Timeout(timeout[1], connect=timeout[0])
+    elif timeout is not None:
+        httpx_kwargs["timeout"] = timeout
+
+    httpx_kwargs["follow_redirects"] = kwargs.get("allow_redirects", True)
+    return httpx_kwargs
+
+
+# httpcore trace events of timing phases, dns lookup is included in connect_tcp
+TRACE_PHASES = {
+    "connection.connect_tcp": "connect_ms",
+    "connection.start_tls": "tls_ms",
+}
+
+
+class TraceTiming(object):
+    """record timing phases of one request with trace extension of httpx, the same
+    keys with HttpSession. dns_ms is always 0, because httpcore resolves host when
+    connecting, and connections retried by transport are counted as retries.
+    """
+
+    def __init__(self):
+        self.timing = RequestTiming()
+        self._started_at = {}
+        self._connect_failed = False
+
+    async def __call__(self, event_name, info):
+        now = time.perf_counter()
+        event, _, state = event_name.rpartition(".")
+        if event.endswith(".send_request_headers") and state == "started":
+            self._started_at["ttfb_ms"] = now
+        elif event.endswith(".receive_response_headers") and state == "complete":
+            # time to first byte, from sending request to receiving response headers
+            started_at = self._started_at.pop("ttfb_ms", now)
+            self.timing.add("ttfb_ms", now - started_at)
+            self.timing.response_received_at = now
+        elif event in TRACE_PHASES:
+            phase = TRACE_PHASES[event]
+            if state == "started":
+                if phase == "connect_ms" and self._connect_failed:
+                    self.timing.retries += 1
+                self._started_at[phase] = now
+            elif state in ("complete", "failed"):
+                self.timing.add(phase, now - self._started_at.pop(phase, now))
+                self._connect_failed = phase == "connect_ms" and state == "failed"
+
+
+async def close_transports(transports):
+    """close transports shared by AsyncHttpSession instances, after all sessions
+    are closed.
+    """
+    for transport in transports.values():
+        await transport.aclose()
+    transports.clear()
+
+
+class AsyncHttpSession(object):
+    """async version of HttpSession, backed by httpx.AsyncClient.
+
+    Cookies are kept between requests in one session. Connection pools can be shared
+    by sessions with transports, which is a dict and will be filled with
+    httpx.AsyncHTTPTransport for each verify/cert, and closed by close_transports.
+    """
+
+    init_meta_data = HttpSession.init_meta_data
+    update_last_req_resp_record = HttpSession.update_last_req_resp_record
+    record_responses = HttpSession.record_responses
+
+    def __init__(self, transports=None, record_policy=None):
+        # transports passed in are shared with other sessions, not closed by aclose
+        self._owns_transports = transports is None
+        self.transports = {} if transports is None else transports
+        self._clients = {}
+        self.init_meta_data()
+        self.record_policy = record_policy or runtime.get_run_context().record_policy
+
+        # session settings are resolved once, instead of for each request
+        self.default_timeout = int(os.getenv("APIMETER_DEFAULT_TIMEOUT", "120"))
+        self.close_connection = get_env_flag("APIMETER_CLOSE_CONNECTION")
+
+    def _get_client(self, verify, cert):
+        client_key = (verify, cert)
+        if client_key not in self._clients:
+            if client_key not in self.transports:
+                self.transports[client_key] = httpx.AsyncHTTPTransport(
+                    verify=verify, cert=cert, retries=3
+                )
+            self._clients[client_key] = httpx.AsyncClient(
+                transport=self.transports[client_key]
+            )
+
+        return self._clients[client_key]
+
+    async def request(self, method, url, name=None, **kwargs):
+        """send request with httpx.AsyncClient, the same interface with HttpSession.request
+
+        Returns:
+            requests.Response: converted from httpx.Response
+
+        """
+        self.init_meta_data()
+
+        # record test name
+        self.meta_data["name"] = name
+
+        # record original request info
+        self.meta_data["data"][0]["request"]["method"] = method
+        self.meta_data["data"][0]["request"]["url"] = url
+        kwargs.setdefault("timeout", self.default_timeout)
+        if self.close_connection:
+            headers = kwargs.get("headers") or {}
+            headers_lower = {k.lower(): k for k in headers.keys()}
+            if "connection" not in headers_lower:
+                headers["Connection"] = "close"
+            kwargs["headers"] = headers
+
+        self.meta_data["data"][0]["request"].update(kwargs)
+
+        trace_timing = TraceTiming()
+        start_timestamp = time.perf_counter()
+        response = await self._send_request_safe_mode(
+            method, url, trace_timing, **kwargs
+        )
+        finished_at = time.perf_counter()
+        response_time_ms = round((finished_at - start_timestamp) * 1000, 2)
+        timing = trace_timing.timing
+        if timing.response_received_at is not None:
+            timing.add("download_ms", finished_at - timing.response_received_at)
+
+        content_size = len(response.content or "")
+
+        # record the consumed time
+        self.meta_data["stat"] = {
+            "response_time_ms": response_time_ms,
+            "elapsed_ms": round(response.elapsed.total_seconds() * 1000, 2),
+            "content_size": content_size,
+        }
+        self.meta_data["stat"].update(timing.get_stat())
+
+        # record request and response histories, include 30X redirection
+        self.record_responses(response.history + [response])
+
+        try:
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.log_error("{exception}".format(exception=str(e)))
+        else:
+            logger.log_info(
+                """status_code: {}, response_time(ms): {} ms, response_length: {} bytes\n""".format(
+                    response.status_code, response_time_ms, content_size
+                )
+            )
+
+        return response
+
+    async def _send_request_safe_mode(self, method, url, trace_timing, **kwargs):
+        """send request, and catch any exception that might occur due to connection problems."""
+        client = self._get_client(kwargs.get("verify", True), kwargs.get("cert"))
+        try:
+            msg = "processed request:\n"
+            msg += "> {method} {url}\n".format(method=method, url=url)
+            msg += "> kwargs: {kwargs}".format(kwargs=kwargs)
+            logger.log_debug(msg)
+            httpx_response = await client.request(
+                method,
+                url,
+                extensions={"trace": trace_timing},
+                **_prepare_httpx_kwargs(kwargs),
+            )
+            return to_requests_response(httpx_response)
+        except (httpx.UnsupportedProtocol, httpx.InvalidURL):
+            raise
+        except httpx.RequestError as ex:
+            resp = ApiResponse()
+            resp.error = ex
+            resp.status_code = 0  # with this status_code, content returns None
+            resp.request = requests.Request(method, url).prepare()
+            return resp
+
+    async def aclose(self):
+        """close clients, transports shared with other sessions are kept open for
+        them, and should be closed by close_transports.
+        """
+        if self._owns_transports:
+            for client in self._clients.values():
+                await client.aclose()
+        self._clients = {}
+
+
+class AsyncRunner(Runner):
+    """Running testcases in asyncio event loop.
+
+    Examples:
+        >>> test_runner = AsyncRunner(parsed_testcase["config"])
+        >>> await test_runner.run_test(parsed_testcase["teststeps"][0])
+
+    """
+
+    def __init__(self, config, http_client_session=None):
+        super(AsyncRunner, self).__init__(
+            config, http_client_session or AsyncHttpSession()
+        )
+
+    async def _await_deferred_sleeps(self):
+        pending_sleeps = deferred_sleeps.get()
+        if pending_sleeps:
+            n_secs = sum(pending_sleeps)
+            del pending_sleeps[:]
+            await asyncio.sleep(n_secs)
+
+    async def _run_test(self, test_dict):
+        """run single teststep, the same with Runner._run_test except that request is async."""
+        token = deferred_sleeps.set([])
+        try:
+            # clear meta data first to ensure independence for each test
+            self.http_client_session.init_meta_data()
+
+            test_dict, request_name, method, parsed_url, parsed_test_request = (
+                self._prepare_test(test_dict)
+            )
+            await self._await_deferred_sleeps()
+
+            # request
+            resp = await self.http_client_session.request(
+                method, parsed_url, name=request_name, **parsed_test_request
+            )
+            self._handle_response(
+                test_dict, resp, method, parsed_url, parsed_test_request
+            )
+            await self._await_deferred_sleeps()
+        finally:
+            deferred_sleeps.reset(token)
+
+    async def _run_testcase(self, testcase_dict):
+        """run single testcase."""
+        self.meta_datas = []
+        config = testcase_dict.get("config", {})
+
+        # each teststeps in one testcase (YAML/JSON) share the same session.
+        test_runner = AsyncRunner(config, self.http_client_session)
+
+        tests = testcase_dict.get("teststeps", [])
+
+        for index, test_dict in enumerate(tests):
+
+            # override current teststep variables with former testcase output variables
+            # copy test_dict to avoid influence on teststeps shared by testcases
+            former_output_variables = self.session_context.test_variables_mapping
+            if former_output_variables:
+                test_dict = dict(test_dict)
+                test_dict["variables"] = dict(test_dict.get("variables", {}))
+                test_dict["variables"].update(former_output_variables)
+
+            try:
+                await test_runner.run_test(test_dict)
+            except Exception:
+                self.exception_request_type = test_runner.exception_request_type
+                self.exception_name = test_runner.exception_name
+                raise
+            finally:
+                _meta_datas = test_runner.meta_datas
+                self.meta_datas.append(_meta_datas)
+
+        self.session_context.update_session_variables(
+            test_runner.export_variables(test_runner.export)
+        )
+
+    async def run_test(self, test_dict):
+        """run single teststep or nested testcase, the same with Runner.run_test."""
+        self.meta_datas = None
+        token = cache.current_testcase_scope.set(self.cache_scope)
+        try:
+            if "teststeps" in test_dict:
+                # nested testcase
+                # copy config to avoid influence on teststeps shared by testcases
+                config = dict(test_dict.get("config", {}))
+                config["variables"] = dict(config.get("variables", {}))
+                config["variables"].update(
+                    self.session_context.session_variables_mapping
+                )
+                test_dict = dict(test_dict, config=config)
+                await self._run_testcase(test_dict)
+            else:
+                # api
+                self.validation_results = {}
+                try:
+                    await self._run_test(test_dict)
+                except Exception:
+                    self.exception_request_type = test_dict["request"]["method"]
+                    self.exception_name = test_dict.get("name")
+                    raise
+                finally:
+                    # get request/response data and validate results
+                    self.meta_datas = getattr(
+                        self.http_client_session, "meta_data", {}
+                    )
+                    self.meta_datas["validators"] = self.validation_results
+        finally:
+            cache.current_testcase_scope.reset(token)
@@ -13,7 +13,7 @@ from apimeter.loader.locate import (
     get_project_working_directory as get_pwd,
     init_project_working_directory as init_pwd,
 )
-from apimeter.loader.load import load_csv_file, load_builtin_functions
+from apimeter.loader.load import load_csv_file, iter_csv_file, load_builtin_functions
 from apimeter.loader.buildup import load_cases, load_project_data
 
 __all__ = [
@@ -23,6 +23,7 @@ __all__ = [
     "get_pwd",
     "init_pwd",
     "load_csv_file",
+    "iter_csv_file",
     "load_builtin_functions",
     "load_project_data",
     "load_cases",
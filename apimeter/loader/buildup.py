@@ -1,9 +1,12 @@
 import importlib
+import importlib.util
 import os
 import sys
+import threading
 
-from apimeter import exceptions, logger, utils
+from apimeter import exceptions, logger, runtime, utils
 from apimeter.compat import is_py3
+from apimeter.loader import cache
 from apimeter.loader.check import JsonSchemaChecker
 from apimeter.loader.load import (
     load_dot_env_file,
@@ -16,13 +19,24 @@ from apimeter.loader.locate import (
     init_project_working_directory,
 )
 
-tests_def_mapping = {"api": {}, "testcases": {}}
+# project data is loaded into process-wide states, i.e. sys.path, os.environ and
+# debugtalk module in sys.modules, thus projects are loaded one by one
+project_data_lock = threading.RLock()
 
 
-def load_debugtalk_functions():
+def load_debugtalk_functions(debugtalk_path=None):
     """load project debugtalk.py module functions
         debugtalk.py should be located in project working directory.
 
+        If debugtalk_path is specified, debugtalk.py is executed as a new module each
+        time, thus functions loaded before keep their own module globals and are not
+        changed by loading another project. The new module replaces "debugtalk" in
+        sys.modules.
+
+    Args:
+        debugtalk_path (str): debugtalk.py file path, debugtalk module is imported
+            from sys.path if not specified.
+
     Returns:
         dict: debugtalk module functions mapping
             {
@@ -31,6 +45,24 @@ def load_debugtalk_functions():
             }
 
     """
+    if debugtalk_path:
+        spec = importlib.util.spec_from_file_location("debugtalk", debugtalk_path)
+        imported_module = importlib.util.module_from_spec(spec)
+        with project_data_lock:
+            former_module = sys.modules.get("debugtalk")
+            # registered before executing as import system does
+            sys.modules["debugtalk"] = imported_module
+            try:
+                spec.loader.exec_module(imported_module)
+            except BaseException:
+                if former_module is None:
+                    sys.modules.pop("debugtalk", None)
+                else:
+                    sys.modules["debugtalk"] = former_module
+                raise
+
+        return load_module_functions(imported_module)
+
     # load debugtalk.py module
     if is_py3 and sys.modules.get("debugtalk"):
         # importlib.reload only works in python 3
@@ -61,11 +93,13 @@ def __extend_with_api_ref(raw_testinfo):
             # type 1: api is defined in individual file
             api_name = api_path
 
+    tests_def_mapping = runtime.get_run_context().tests_def_mapping
     if api_name in tests_def_mapping["api"]:
         block = tests_def_mapping["api"][api_name]
     elif not os.path.isfile(api_name):
         raise exceptions.ApiNotFound("{} not found!".format(api_name))
     else:
+        cache.record_file(api_name)
         block = load_file(api_name)
 
     # NOTICE: avoid project_mapping been changed during iteration.
@@ -77,10 +111,12 @@ def __extend_with_testcase_ref(raw_testinfo):
     """extend with testcase reference"""
     testcase_path = raw_testinfo["testcase"]
 
+    tests_def_mapping = runtime.get_run_context().tests_def_mapping
     if testcase_path not in tests_def_mapping["testcases"]:
         # make compatible with Windows/Linux
         pwd = get_project_working_directory()
         testcase_path = os.path.join(pwd, *testcase_path.split("/"))
+        cache.record_file(testcase_path)
         loaded_testcase = load_file(testcase_path)
 
         if isinstance(loaded_testcase, list):
@@ -347,6 +383,7 @@ def load_test_file(path):
             }
 
     """
+    cache.record_file(path)
     raw_content = load_file(path)
 
     if isinstance(raw_content, dict):
@@ -401,6 +438,11 @@ def load_project_data(test_path, dot_env_path=None):
             environments and debugtalk.py functions.
 
     """
+    with project_data_lock:
+        return _load_project_data(test_path, dot_env_path)
+
+
+def _load_project_data(test_path, dot_env_path=None):
     debugtalk_path, project_working_directory = init_project_working_directory(
         test_path
     )
@@ -416,7 +458,7 @@ def load_project_data(test_path, dot_env_path=None):
 
     if debugtalk_path:
         # load debugtalk.py functions
-        debugtalk_functions = load_debugtalk_functions()
+        debugtalk_functions = load_debugtalk_functions(debugtalk_path)
     else:
         debugtalk_functions = {}
 
@@ -428,7 +470,7 @@ def load_project_data(test_path, dot_env_path=None):
     return project_mapping
 
 
-def load_cases(path, dot_env_path=None):
+def load_cases(path, dot_env_path=None, use_cache=False, project_mapping=None):
     """load testcases from file path, extend and merge with api/testcase definitions.
 
     Args:
@@ -437,6 +479,10 @@ def load_cases(path, dot_env_path=None):
                 - absolute/relative file path
                 - absolute/relative folder path
         dot_env_path (str): specified .env file path
+        use_cache (bool): load tests from .apimeter_cache if test files are unchanged,
+            and save loaded tests to cache otherwise.
+        project_mapping (dict): project data loaded by load_project_data before,
+            e.g. kept by runner daemon, it will be loaded from path if not specified.
 
     Returns:
         dict: tests mapping, include project_mapping and testcases.
@@ -482,7 +528,24 @@ def load_cases(path, dot_env_path=None):
 
     """
 
-    tests_mapping = {"project_mapping": load_project_data(path, dot_env_path)}
+    if project_mapping is None:
+        project_mapping = load_project_data(path, dot_env_path)
+
+    tests_mapping = {"project_mapping": project_mapping}
+
+    if use_cache:
+        cached_tests = cache.load_cached_tests(
+            path, tests_mapping["project_mapping"], dot_env_path
+        )
+        if cached_tests is not None:
+            tests_mapping.update(cached_tests)
+            return tests_mapping
+
+        # reload all referenced api/testcase definitions to record them
+        tests_def_mapping = runtime.get_run_context().tests_def_mapping
+        tests_def_mapping["api"].clear()
+        tests_def_mapping["testcases"].clear()
+        cache.start_recording()
 
     def __load_file_content(path):
         loaded_content = None
@@ -502,12 +565,29 @@ def load_cases(path, dot_env_path=None):
         elif loaded_content["type"] == "api":
             tests_mapping.setdefault("apis", []).append(loaded_content)
 
-    if os.path.isdir(path):
-        files_list = load_folder_files(path)
-        for path in files_list:
-            __load_file_content(path)
+    try:
+        if os.path.isdir(path):
+            files_list = load_folder_files(path)
+            for file_path in files_list:
+                __load_file_content(file_path)
 
-    elif os.path.isfile(path):
-        __load_file_content(path)
+        elif os.path.isfile(path):
+            __load_file_content(path)
+    finally:
+        recorded_files = cache.stop_recording() if use_cache else None
+
+    if use_cache:
+        loaded_tests = {
+            key: value
+            for key, value in tests_mapping.items()
+            if key != "project_mapping"
+        }
+        cache.save_cached_tests(
+            path,
+            tests_mapping["project_mapping"],
+            loaded_tests,
+            recorded_files,
+            dot_env_path,
+        )
 
     return tests_mapping
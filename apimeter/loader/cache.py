@@ -0,0 +1,154 @@
+"""
+persistent cache of loaded tests
+
+Loaded testcases/testsuites/apis are pickled into .apimeter_cache folder under
+project working directory. Cache entry is addressed by test path, apimeter version,
+.env and debugtalk.py contents, and records content hash of each file read while
+loading, including referenced api/testcase files. Entry is used only if all these
+files are unchanged and no test file is added to or removed from test folder.
+
+"""
+
+import contextvars
+import hashlib
+import os
+import pickle
+import tempfile
+
+from apimeter import __version__, logger
+from apimeter.loader.load import load_folder_files
+
+CACHE_DIR_NAME = ".apimeter_cache"
+
+# files read while loading tests, None if recording is not started.
+# it is a context variable, thus tests can be loaded concurrently in threads.
+referenced_files = contextvars.ContextVar("referenced_files", default=None)
+
+
+def start_recording():
+    """start recording files read while loading tests."""
+    referenced_files.set(set())
+
+
+def stop_recording():
+    """stop recording and return recorded files.
+
+    Returns:
+        set: absolute file paths
+
+    """
+    recorded_files = referenced_files.get() or set()
+    referenced_files.set(None)
+    return recorded_files
+
+
+def record_file(file_path):
+    """record file read while loading tests, called by loader."""
+    recorded_files = referenced_files.get()
+    if recorded_files is not None:
+        recorded_files.add(os.path.abspath(file_path))
+
+
+def get_file_hash(file_path):
+    """get sha1 hash of file content, None if file not exist."""
+    if not file_path or not os.path.isfile(file_path):
+        return None
+
+    with open(file_path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _list_test_files(path):
+    if os.path.isdir(path):
+        files_list = load_folder_files(path)
+        return sorted(os.path.abspath(file_path) for file_path in files_list)
+
+    return [os.path.abspath(path)]
+
+
+def get_cache_path(path, project_mapping, dot_env_path=None):
+    """get cache entry file path of test path.
+
+    Args:
+        path (str): testcase/testsuite file/folder path.
+        project_mapping (dict): loaded project mapping, include PWD.
+        dot_env_path (str): specified .env file path
+
+    Returns:
+        str: cache entry file path
+
+    """
+    project_working_directory = project_mapping["PWD"]
+    dot_env_path = dot_env_path or os.path.join(project_working_directory, ".env")
+    debugtalk_path = os.path.join(project_working_directory, "debugtalk.py")
+
+    key_items = [
+        __version__,
+        os.path.abspath(path),
+        get_file_hash(dot_env_path),
+        get_file_hash(debugtalk_path),
+    ]
+    cache_key = hashlib.sha1(repr(key_items).encode("utf-8")).hexdigest()
+    return os.path.join(
+        project_working_directory, CACHE_DIR_NAME, "{}.pickle".format(cache_key)
+    )
+
+
+def load_cached_tests(path, project_mapping, dot_env_path=None):
+    """load cached tests of test path.
+
+    Returns:
+        dict: loaded tests, include testcases/testsuites/apis.
+            None if cache entry not exist or invalidated.
+
+    """
+    cache_path = get_cache_path(path, project_mapping, dot_env_path)
+    if not os.path.isfile(cache_path):
+        return None
+
+    try:
+        with open(cache_path, "rb") as f:
+            cache_entry = pickle.load(f)
+    except Exception as ex:
+        logger.log_warning("failed to load cache {}: {}".format(cache_path, ex))
+        return None
+
+    if cache_entry["test_files"] != _list_test_files(path):
+        return None
+
+    for file_path, file_hash in cache_entry["files_hash"].items():
+        if get_file_hash(file_path) != file_hash:
+            return None
+
+    logger.log_debug("load cached tests: {}".format(cache_path))
+    return cache_entry["tests"]
+
+
+def save_cached_tests(path, project_mapping, tests, files, dot_env_path=None):
+    """save loaded tests of test path to cache.
+
+    Args:
+        path (str): testcase/testsuite file/folder path.
+        project_mapping (dict): loaded project mapping, include PWD.
+        tests (dict): loaded tests, include testcases/testsuites/apis.
+        files (set): files read while loading tests.
+        dot_env_path (str): specified .env file path
+
+    """
+    cache_path = get_cache_path(path, project_mapping, dot_env_path)
+    cache_entry = {
+        "test_files": _list_test_files(path),
+        "files_hash": {file_path: get_file_hash(file_path) for file_path in files},
+        "tests": tests,
+    }
+
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        # write to temp file first, in case of being read by another process
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(cache_entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except Exception as ex:
+        logger.log_warning("failed to save cache {}: {}".format(cache_path, ex))
@@ -62,6 +62,22 @@ def load_csv_file(csv_file):
             {'username': 'test3', 'password': '333333'}
         ]
 
+    """
+    return list(iter_csv_file(csv_file))
+
+
+def iter_csv_file(csv_file):
+    """iterate csv file rows lazily, rows are read one by one without loading whole file.
+
+    Args:
+        csv_file (str): csv file path, relative path is based on project working directory.
+
+    Yields:
+        dict: csv row
+
+    Raises:
+        exceptions.CSVNotFound: csv file not exist.
+
     """
     if not os.path.isabs(csv_file):
         pwd = get_project_working_directory()
@@ -72,14 +88,10 @@ def load_csv_file(csv_file):
         # file path not exist
         raise exceptions.CSVNotFound(csv_file)
 
-    csv_content_list = []
-
     with io.open(csv_file, encoding="utf-8") as csvfile:
         reader = csv.DictReader(csvfile)
         for row in reader:
-            csv_content_list.append(row)
-
-    return csv_content_list
+            yield row
 
 
 def load_file(file_path):
@@ -201,6 +213,7 @@ def load_module_functions(module):
 
     for name, item in vars(module).items():
         if isinstance(item, types.FunctionType):
+            # function marked by apimeter.memoize is cached when it is called
             module_functions[name] = item
 
     return module_functions
@@ -1,9 +1,7 @@
 import os
 import sys
 
-from apimeter import exceptions, logger
-
-project_working_directory = None
+from apimeter import exceptions, logger, runtime
 
 
 def locate_file(start_path, file_name):
@@ -103,7 +101,6 @@ def init_project_working_directory(test_path):
     # locate debugtalk.py file
     debugtalk_path = locate_debugtalk_py(test_path)
 
-    global project_working_directory
     if debugtalk_path:
         # The folder contains debugtalk.py will be treated as PWD.
         project_working_directory = os.path.dirname(debugtalk_path)
@@ -111,14 +108,18 @@ def init_project_working_directory(test_path):
         # debugtalk.py not found, use os.getcwd() as PWD.
         project_working_directory = os.getcwd()
 
-    # add PWD to sys.path
-    sys.path.insert(0, project_working_directory)
+    # PWD is kept in current run context
+    runtime.get_run_context().project_working_directory = project_working_directory
+
+    # add PWD to sys.path, only once for the same PWD in long-running process
+    if sys.path[0] != project_working_directory:
+        sys.path.insert(0, project_working_directory)
 
     return debugtalk_path, project_working_directory
 
 
 def get_project_working_directory():
-    global project_working_directory
+    project_working_directory = runtime.get_run_context().project_working_directory
     if project_working_directory is None:
         raise exceptions.MyBaseFailure("loader.load_cases() has not been called!")
 
@@ -3,16 +3,18 @@
 import ast
 import builtins
 import collections
+import copy
 try:
     # Python 3.10+ 中 collections.Hashable 被移动到 collections.abc
-    from collections.abc import Hashable
+    from collections.abc import Hashable, Iterator
 except ImportError:
     # Python < 3.10 兼容性
-    from collections import Hashable
+    from collections import Hashable, Iterator
+import itertools
 import json
 import re
 
-from apimeter import exceptions, utils, loader
+from apimeter import cache, exceptions, response, runtime, utils, loader
 from apimeter import logger
 from apimeter.compat import basestring, numeric_types, str
 
@@ -25,13 +27,10 @@ function_regex_compile = re.compile(r"\$\{(\w+)\(([^)]*)\)\}")
 # global variables
 global_variables = ['content', 'body', 'text', 'json', 'status_code', 'headers', 'cookies', 'encoding', 'ok', 'reason', 'url', 'elapsed']
 
-""" Store parse failed api/testcase/testsuite file path
-"""
-parse_failed_testfiles = {}
-
 
 def get_parse_failed_testfiles():
-    return parse_failed_testfiles
+    """get parse failed api/testcase/testsuite file paths of current run."""
+    return runtime.get_run_context().parse_failed_testfiles
 
 
 def parse_string_value(str_value):
@@ -228,69 +227,129 @@ def parse_parameters(parameters, variables_mapping=None, functions_mapping=None)
         ]
         >>> parse_parameters(parameters)
 
+    """
+    return list(iter_parameters(parameters, variables_mapping, functions_mapping))
+
+
+class ParameterRows(object):
+    """re-iterable parameter rows, rows are generated lazily on each iteration."""
+
+    def __init__(self, rows_factory, *args):
+        self.rows_factory = rows_factory
+        self.args = args
+
+    def __iter__(self):
+        return self.rows_factory(*self.args)
+
+
+def _iter_data_list_parameters(parameter_name_list, parameter_content):
+    """(1) data list
+    e.g. {"app_version": ["2.8.5", "2.8.6"]}
+          => [{"app_version": "2.8.5", "app_version": "2.8.6"}]
+    e.g. {"username-password": [["user1", "111111"], ["test2", "222222"]}
+          => [{"username": "user1", "password": "111111"}, {"username": "user2", "password": "222222"}]
+    """
+    for parameter_item in parameter_content:
+        if not isinstance(parameter_item, (list, tuple)):
+            # "2.8.5" => ["2.8.5"]
+            parameter_item = [parameter_item]
+
+        # ["app_version"], ["2.8.5"] => {"app_version": "2.8.5"}
+        # ["username", "password"], ["user1", "111111"] => {"username": "user1", "password": "111111"}
+        yield dict(zip(parameter_name_list, parameter_item))
+
+
+def _iter_function_parameters(
+    parameter_name_list, parameter_content, variables_mapping, functions_mapping
+):
+    """(2) call built-in parameterize function, csv file is streamed row by row.
+    (3) call custom function, which may return list or generator.
+    """
+    prepared_parameter_content = prepare_lazy_data(
+        parameter_content, functions_mapping, set(variables_mapping.keys())
+    )
+    lazy_function = None
+    if isinstance(prepared_parameter_content, LazyString):
+        lazy_function = prepared_parameter_content.get_function()
+
+    if lazy_function and lazy_function.func_name == "load_csv_file":
+        # ${parameterize(account.csv)}
+        csv_file = parse_lazy_data(lazy_function.get_args()[0], variables_mapping)
+        parsed_parameter_content = loader.iter_csv_file(csv_file)
+    else:
+        parsed_parameter_content = parse_lazy_data(
+            prepared_parameter_content, variables_mapping
+        )
+        if not isinstance(parsed_parameter_content, (list, tuple, Iterator)):
+            raise exceptions.ParamsError("parameters syntax error!")
+
+    for parameter_item in parsed_parameter_content:
+        if isinstance(parameter_item, dict):
+            # get subset by parameter name
+            # {"app_version": "${gen_app_version()}"}
+            # gen_app_version() => [{'app_version': '2.8.5'}, {'app_version': '2.8.6'}]
+            # {"username-password": "${get_account()}"}
+            # get_account() => [
+            #       {"username": "user1", "password": "111111"},
+            #       {"username": "user2", "password": "222222"}
+            # ]
+            parameter_dict = {key: parameter_item[key] for key in parameter_name_list}
+        elif isinstance(parameter_item, (list, tuple)):
+            # {"username-password": "${get_account()}"}
+            # get_account() => [("user1", "111111"), ("user2", "222222")]
+            parameter_dict = dict(zip(parameter_name_list, parameter_item))
+        elif len(parameter_name_list) == 1:
+            # {"user_agent": "${get_user_agent()}"}
+            # get_user_agent() => ["iOS/10.1", "iOS/10.2"]
+            parameter_dict = {parameter_name_list[0]: parameter_item}
+
+        yield parameter_dict
+
+
+def iter_parameters(parameters, variables_mapping=None, functions_mapping=None):
+    """parse parameters and generate cartesian product lazily.
+        csv files are streamed, and functions may return generator.
+        Notice: only the first parameter is streamed, other parameter sources are
+        loaded once and kept in memory, i.e. csv file is read and function is called
+        only once.
+
+    Args:
+        parameters (list): the same with parse_parameters
+        variables_mapping (dict): variables mapping loaded from testcase config
+        functions_mapping (dict): functions mapping loaded from debugtalk.py
+
+    Returns:
+        iterator: cartesian product iterator
+
     """
     variables_mapping = variables_mapping or {}
     functions_mapping = functions_mapping or {}
-    parsed_parameters_list = []
+    parsed_variables_mapping = None
+    parameters_rows_list = []
 
     parameters = utils.ensure_mapping_format(parameters)
     for parameter_name, parameter_content in parameters.items():
         parameter_name_list = parameter_name.split("-")
 
         if isinstance(parameter_content, list):
-            # (1) data list
-            # e.g. {"app_version": ["2.8.5", "2.8.6"]}
-            #       => [{"app_version": "2.8.5", "app_version": "2.8.6"}]
-            # e.g. {"username-password": [["user1", "111111"], ["test2", "222222"]}
-            #       => [{"username": "user1", "password": "111111"}, {"username": "user2", "password": "222222"}]
-            parameter_content_list = []
-            for parameter_item in parameter_content:
-                if not isinstance(parameter_item, (list, tuple)):
-                    # "2.8.5" => ["2.8.5"]
-                    parameter_item = [parameter_item]
-
-                # ["app_version"], ["2.8.5"] => {"app_version": "2.8.5"}
-                # ["username", "password"], ["user1", "111111"] => {"username": "user1", "password": "111111"}
-                parameter_content_dict = dict(zip(parameter_name_list, parameter_item))
-
-                parameter_content_list.append(parameter_content_dict)
+            parameter_rows = ParameterRows(
+                _iter_data_list_parameters, parameter_name_list, parameter_content
+            )
         else:
-            # (2) & (3)
-            parsed_variables_mapping = parse_variables_mapping(variables_mapping)
-            parsed_parameter_content = eval_lazy_data(
-                parameter_content, parsed_variables_mapping, functions_mapping
+            if parsed_variables_mapping is None:
+                parsed_variables_mapping = parse_variables_mapping(variables_mapping)
+
+            parameter_rows = ParameterRows(
+                _iter_function_parameters,
+                parameter_name_list,
+                parameter_content,
+                parsed_variables_mapping,
+                functions_mapping,
             )
-            if not isinstance(parsed_parameter_content, list):
-                raise exceptions.ParamsError("parameters syntax error!")
-
-            parameter_content_list = []
-            for parameter_item in parsed_parameter_content:
-                if isinstance(parameter_item, dict):
-                    # get subset by parameter name
-                    # {"app_version": "${gen_app_version()}"}
-                    # gen_app_version() => [{'app_version': '2.8.5'}, {'app_version': '2.8.6'}]
-                    # {"username-password": "${get_account()}"}
-                    # get_account() => [
-                    #       {"username": "user1", "password": "111111"},
-                    #       {"username": "user2", "password": "222222"}
-                    # ]
-                    parameter_dict = {
-                        key: parameter_item[key] for key in parameter_name_list
-                    }
-                elif isinstance(parameter_item, (list, tuple)):
-                    # {"username-password": "${get_account()}"}
-                    # get_account() => [("user1", "111111"), ("user2", "222222")]
-                    parameter_dict = dict(zip(parameter_name_list, parameter_item))
-                elif len(parameter_name_list) == 1:
-                    # {"user_agent": "${get_user_agent()}"}
-                    # get_user_agent() => ["iOS/10.1", "iOS/10.2"]
-                    parameter_dict = {parameter_name_list[0]: parameter_item}
 
-                parameter_content_list.append(parameter_dict)
+        parameters_rows_list.append(parameter_rows)
 
-        parsed_parameters_list.append(parameter_content_list)
-
-    return utils.gen_cartesian_product(*parsed_parameters_list)
+    return utils.iter_cartesian_product(*parameters_rows_list)
 
 
 def get_uniform_comparator(comparator):
@@ -656,6 +715,114 @@ def parse_function_params(params):
     return function_meta
 
 
+def _is_global_variable(name):
+    """check if name is global variable or its property, e.g. content, content.token"""
+    return name in global_variables or (
+        "." in name and name.split(".")[0] in global_variables
+    )
+
+
+def _resolve_constant_arg(arg, variables_mapping):
+    return arg
+
+
+def _resolve_literal_container_arg(arg, variables_mapping):
+    # copy pre-evaluated container, in case of being modified by function
+    return copy.deepcopy(arg)
+
+
+def _resolve_container_arg(arg, variables_mapping):
+    """container string with unquoted items, which may reference variables,
+    e.g. "[TESTCASE_SETUP_XXX, ios, 2.8.6]"
+    """
+    try:
+        python_literal = LazyFunction._convert_to_python_literal(arg, variables_mapping)
+        return ast.literal_eval(python_literal)
+    except (ValueError, SyntaxError):
+        return arg
+
+
+def _resolve_field_arg(arg, variables_mapping):
+    """response field reference, e.g. content.token, status_code"""
+    try:
+        if "response" in variables_mapping:
+            resp_obj = variables_mapping["response"]
+            if hasattr(resp_obj, "extract_field"):
+                return resp_obj.extract_field(arg)
+
+        # 如果不是响应路径，尝试作为变量解析（只针对全局变量）
+        try:
+            return get_mapping_variable(arg, variables_mapping)
+        except exceptions.VariableNotFound:
+            pass
+    except Exception:
+        pass
+
+    return arg
+
+
+def _resolve_lazy_arg(arg, variables_mapping):
+    """container with variables or functions, e.g. [LazyString($a), 1]"""
+    return _parse_lazy_data(arg, variables_mapping)
+
+
+def _resolve_dynamic_arg(arg, variables_mapping):
+    """argument whose shape is known only after evaluated, e.g. LazyString($a)"""
+    value = _parse_lazy_data(arg, variables_mapping)
+    if isinstance(value, str):
+        resolver, value = classify_function_arg(value, evaluate_literal=False)
+        return resolver(value, variables_mapping)
+
+    return value
+
+
+def classify_function_arg(arg, evaluate_literal=True):
+    """classify function argument by its shape, which is fixed once parsed.
+
+    Args:
+        arg: prepared function argument.
+        evaluate_literal (bool): pre-evaluate container literal string.
+
+    Returns:
+        tuple: (resolver, payload), argument value is resolver(payload, variables_mapping)
+
+    """
+    if isinstance(arg, LazyString):
+        return _resolve_dynamic_arg, arg
+
+    elif isinstance(arg, (list, dict)):
+        return _resolve_lazy_arg, arg
+
+    elif not isinstance(arg, str):
+        return _resolve_constant_arg, arg
+
+    if (arg.startswith("[") and arg.endswith("]")) or (
+        arg.startswith("{") and arg.endswith("}")
+    ):
+        # 列表或字典格式
+        if evaluate_literal:
+            try:
+                return _resolve_literal_container_arg, ast.literal_eval(arg)
+            except (ValueError, SyntaxError):
+                pass
+        return _resolve_container_arg, arg
+
+    elif arg.startswith("\\") and len(arg) > 1:
+        # 转义的全局变量（如 \content 表示字面量 "content"）
+        if _is_global_variable(arg[1:]):
+            return _resolve_constant_arg, arg[1:]
+
+    elif not arg.startswith(("$", '"', "'")) and _is_global_variable(arg):
+        # 响应字段引用（如 content.token, status_code等），排除数字和布尔值等字面量
+        if arg.lower() not in ["true", "false", "none", "null"]:
+            try:
+                float(arg)
+            except ValueError:
+                return _resolve_field_arg, arg
+
+    return _resolve_constant_arg, arg
+
+
 class LazyFunction(object):
     """call function lazily."""
 
@@ -673,7 +840,6 @@ class LazyFunction(object):
         """
         self.functions_mapping = functions_mapping or {}
         self.check_variables_set = check_variables_set or set()
-        self.cache_key = None
         self.__parse(function_meta)
 
     def __parse(self, function_meta):
@@ -706,11 +872,25 @@ class LazyFunction(object):
                 raise exceptions.ParamsError("ENV() should only pass in one argument!")
             self._args = [self._args[0]]
 
+        # classify arguments once, only resolvers are called in to_value
+        self._prepared_args = self._args
+        self._prepared_arg_resolvers = [classify_function_arg(arg) for arg in self._args]
+        self._arg_resolvers = self._prepared_arg_resolvers
+        self._kwarg_resolvers = {
+            key: classify_function_arg(value) for key, value in self._kwargs.items()
+        }
+
     def get_args(self):
         return self._args
 
     def update_args(self, args):
         self._args = args
+        if args is self._prepared_args:
+            # restore prepared args
+            self._arg_resolvers = self._prepared_arg_resolvers
+        else:
+            # evaluated args, e.g. check value of validator
+            self._arg_resolvers = [(_resolve_dynamic_arg, arg) for arg in args]
 
     def __repr__(self):
         args_string = ""
@@ -728,135 +908,55 @@ class LazyFunction(object):
 
         return "LazyFunction({}({}))".format(self.func_name, args_string)
 
-    def __prepare_cache_key(self, args, kwargs):
-        return self.func_name, repr(args), repr(kwargs)
-
-    def to_value(self, variables_mapping=None):
+    def to_value(self, variables_mapping=None, function_cache=None):
         """parse lazy data with evaluated variables mapping.
         Notice: variables_mapping should not contain any variable or function.
+
+        Args:
+            variables_mapping (dict): evaluated variables mapping.
+            function_cache (cache.FunctionCache): if specified, function result is
+                cached by evaluated arguments.
+
         """
-        variables_mapping = variables_mapping or {}
-        args = parse_lazy_data(self._args, variables_mapping)
-        kwargs = parse_lazy_data(self._kwargs, variables_mapping)
-        
-        # 对于列表和字典格式的字符串参数，以及变量引用，尝试进一步解析
-        processed_args = []
-        for arg in args:
-            if isinstance(arg, str):
-                # 检查是否是列表格式
-                if arg.startswith('[') and arg.endswith(']'):
-                    try:
-                        # 尝试解析为实际的列表
-                        # 首先处理变量替换后的字符串，将其转换为有效的Python字面量
-                        processed_arg = self._convert_to_python_literal(arg, variables_mapping)
-                        processed_args.append(ast.literal_eval(processed_arg))
-                        continue
-                    except (ValueError, SyntaxError):
-                        pass
-                # 检查是否是字典格式
-                elif arg.startswith('{') and arg.endswith('}'):
-                    try:
-                        # 尝试解析为实际的字典
-                        processed_arg = self._convert_to_python_literal(arg, variables_mapping)
-                        processed_args.append(ast.literal_eval(processed_arg))
-                        continue
-                    except (ValueError, SyntaxError):
-                        pass
-                # 检查是否是转义的全局变量（如 \content 表示字面量 "content"）
-                elif arg.startswith('\\') and len(arg) > 1:
-                    # 检查转义后的字符串是否是全局变量
-                    unescaped = arg[1:]  # 去掉前面的反斜杠
-                    if ('.' in unescaped and unescaped.split('.')[0] in global_variables) or unescaped in global_variables:
-                        # 这是一个转义的全局变量，作为字面量字符串处理
-                        processed_args.append(unescaped)
-                        continue
-                # 检查是否是响应字段引用（如 content.token, status_code等）
-                elif not arg.startswith('$') and not arg.startswith('"') and not arg.startswith("'") and not arg.startswith('\\'):
-                    # 只有当参数明确是响应字段时才尝试解析为变量引用
-                    # 这避免了将普通函数参数错误地当作变量处理
-                    if ('.' in arg and arg.split('.')[0] in global_variables) or arg in global_variables:
-                        try:
-                            # 先检查是否是数字或布尔值等字面量
-                            if arg.lower() not in ['true', 'false', 'none', 'null']:
-                                try:
-                                    float(arg)  # 测试是否是数字
-                                except ValueError:
-                                    # 不是数字，检查是否是响应路径
-                                    if 'response' in variables_mapping:
-                                        resp_obj = variables_mapping['response']
-                                        if hasattr(resp_obj, 'extract_field'):
-                                            resp_value = resp_obj.extract_field(arg)
-                                            processed_args.append(resp_value)
-                                            continue
-                                    # 如果不是响应路径，尝试作为变量解析（只针对全局变量）
-                                    try:
-                                        var_value = get_mapping_variable(arg, variables_mapping)
-                                        processed_args.append(var_value)
-                                        continue
-                                    except exceptions.VariableNotFound:
-                                        pass
-                        except Exception:
-                            pass
-            processed_args.append(arg)
-        
-        # 对kwargs也进行同样的处理
-        processed_kwargs = {}
-        for key, value in kwargs.items():
-            if isinstance(value, str):
-                if value.startswith('[') and value.endswith(']'):
-                    try:
-                        processed_value = self._convert_to_python_literal(value, variables_mapping)
-                        processed_kwargs[key] = ast.literal_eval(processed_value)
-                        continue
-                    except (ValueError, SyntaxError):
-                        pass
-                elif value.startswith('{') and value.endswith('}'):
-                    try:
-                        processed_value = self._convert_to_python_literal(value, variables_mapping)
-                        processed_kwargs[key] = ast.literal_eval(processed_value)
-                        continue
-                    except (ValueError, SyntaxError):
-                        pass
-                # 检查是否是转义的全局变量（如 \content 表示字面量 "content"）
-                elif value.startswith('\\') and len(value) > 1:
-                    # 检查转义后的字符串是否是全局变量
-                    unescaped = value[1:]  # 去掉前面的反斜杠
-                    if ('.' in unescaped and unescaped.split('.')[0] in global_variables) or unescaped in global_variables:
-                        # 这是一个转义的全局变量，作为字面量字符串处理
-                        processed_kwargs[key] = unescaped
-                        continue
-                # 检查是否是响应字段引用
-                elif not value.startswith('$') and not value.startswith('"') and not value.startswith("'") and not value.startswith('\\'):
-                    # 只有当参数明确是响应字段时才尝试解析为变量引用
-                    # 这避免了将普通函数参数错误地当作变量处理
-                    if ('.' in value and value.split('.')[0] in global_variables) or value in global_variables:
-                        try:
-                            if value.lower() not in ['true', 'false', 'none', 'null']:
-                                try:
-                                    float(value)  # 测试是否是数字
-                                except ValueError:
-                                    # 不是数字，检查是否是响应路径
-                                    if 'response' in variables_mapping:
-                                        resp_obj = variables_mapping['response']
-                                        if hasattr(resp_obj, 'extract_field'):
-                                            resp_value = resp_obj.extract_field(value)
-                                            processed_kwargs[key] = resp_value
-                                            continue
-                                    # 如果不是响应路径，尝试作为变量解析（只针对全局变量）
-                                    try:
-                                        var_value = get_mapping_variable(value, variables_mapping)
-                                        processed_kwargs[key] = var_value
-                                        continue
-                                    except exceptions.VariableNotFound:
-                                        pass
-                        except Exception:
-                            pass
-            processed_kwargs[key] = value
-        
-        self.cache_key = self.__prepare_cache_key(processed_args, processed_kwargs)
-        return self._func(*processed_args, **processed_kwargs)
+        return self.__call(self._arg_resolvers, variables_mapping, function_cache)
+
+    def call_with_args(self, args, variables_mapping=None):
+        """call function with specified args instead of parsed args, e.g. evaluated
+        check value and expect value of validator. LazyFunction itself is not changed,
+        thus it can be shared by concurrent runs.
+        """
+        arg_resolvers = [(_resolve_dynamic_arg, arg) for arg in args]
+        return self.__call(arg_resolvers, variables_mapping)
+
+    def __call(self, arg_resolvers, variables_mapping=None, function_cache=None):
+        variables_mapping = utils.ensure_mapping_format(variables_mapping or {})
+        processed_args = [
+            resolver(arg, variables_mapping) for resolver, arg in arg_resolvers
+        ]
+        processed_kwargs = {
+            key: resolver(value, variables_mapping)
+            for key, (resolver, value) in self._kwarg_resolvers.items()
+        }
+
+        if function_cache is None:
+            return runtime.call_function(
+                self._func, *processed_args, **processed_kwargs
+            )
+
+        cache_key = cache.make_cache_key(
+            self.func_name, processed_args, processed_kwargs
+        )
+        value = function_cache.get(cache_key, cache.NOT_CACHED)
+        if value is cache.NOT_CACHED:
+            value = runtime.call_function(
+                self._func, *processed_args, **processed_kwargs
+            )
+            function_cache.set(cache_key, value)
+
+        return value
     
-    def _convert_to_python_literal(self, arg_str, variables_mapping):
+    @staticmethod
+    def _convert_to_python_literal(arg_str, variables_mapping):
         """将包含变量值的字符串转换为有效的Python字面量
         
         Args:
@@ -1041,11 +1141,6 @@ class LazyFunction(object):
         return arg_str
 
 
-cached_functions_mapping = {}
-""" cached function calling results.
-"""
-
-
 class LazyString(object):
     """evaluate string lazily."""
 
@@ -1059,7 +1154,19 @@ class LazyString(object):
         self.functions_mapping = functions_mapping or {}
         self.check_variables_set = check_variables_set or set()
         self.cached = cached
+        self._variables = None
         self.__parse(raw_string)
+        self._render = self.__compile()
+
+    def __getstate__(self):
+        # render closure can not be pickled, it will be compiled again when unpickled.
+        state = self.__dict__.copy()
+        state.pop("_render", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._render = self.__compile()
 
     def __parse(self, raw_string):
         """parse raw string, replace function and variable with {}
@@ -1074,6 +1181,8 @@ class LazyString(object):
 
         """
         self._args = []
+        # literal parts split by args, len(self._literals) == len(self._args) + 1
+        self._literals = [""]
 
         def escape_braces(origin_string):
             return origin_string.replace("{", "{{").replace("}", "}}")
@@ -1082,8 +1191,10 @@ class LazyString(object):
             match_start_position = raw_string.index("$", 0)
             begin_string = raw_string[0:match_start_position]
             self._string = escape_braces(begin_string)
+            self._literals[-1] += begin_string
         except ValueError:
             self._string = escape_braces(raw_string)
+            self._literals[-1] += raw_string
             return
 
         while match_start_position < len(raw_string):
@@ -1096,6 +1207,7 @@ class LazyString(object):
             if dollar_match:
                 match_start_position = dollar_match.end()
                 self._string += "$"
+                self._literals[-1] += "$"
                 continue
 
             # search function like ${func($a, $b)}
@@ -1107,6 +1219,7 @@ class LazyString(object):
                     function_meta, self.functions_mapping, self.check_variables_set
                 )
                 self._args.append(lazy_func)
+                self._literals.append("")
                 match_start_position = func_match.end()
                 self._string += "{}"
                 continue
@@ -1122,6 +1235,7 @@ class LazyString(object):
                     raise exceptions.VariableNotFound(base_var_name)
 
                 self._args.append(var_name)
+                self._literals.append("")
                 match_start_position = var_match.end()
                 self._string += "{}"
                 continue
@@ -1137,6 +1251,88 @@ class LazyString(object):
                 match_start_position = len(raw_string)
 
             self._string += escape_braces(remain_string)
+            self._literals[-1] += remain_string
+
+    def __compile(self):
+        """compile parsed template into render callable, which is called with
+        variables mapping on each evaluation.
+
+            "$var" => direct lookup of var
+            "ABC" => constant string
+            "ABC${func($a)}DE$c" => join of "ABC", func result, "DE" and c value
+
+        """
+        accessors = [self.__make_accessor(arg) for arg in self._args]
+
+        if not accessors:
+            value = self._literals[0]
+            return lambda variables_mapping: value
+
+        if self._string == "{}":
+            # keep evaluated value type, e.g. "$var" => var value
+            return accessors[0]
+
+        # precompute parts list, empty literals are dropped
+        parts = []
+        slots = []
+        for literal, accessor in zip(self._literals, accessors):
+            if literal:
+                parts.append(literal)
+            slots.append((len(parts), accessor))
+            parts.append(None)
+        if self._literals[-1]:
+            parts.append(self._literals[-1])
+
+        def render(variables_mapping):
+            rendered_parts = list(parts)
+            for index, accessor in slots:
+                rendered_parts[index] = str(accessor(variables_mapping))
+            return "".join(rendered_parts)
+
+        return render
+
+    def __make_accessor(self, arg):
+        """make accessor of variable name or LazyFunction."""
+        if isinstance(arg, LazyFunction):
+
+            def call_function(variables_mapping):
+                if not self.cached:
+                    return arg.to_value(variables_mapping)
+
+                # function results in config variables are cached in current run
+                function_cache = runtime.get_run_context().function_cache
+                return arg.to_value(variables_mapping, function_cache)
+
+            return call_function
+
+        if "." in arg:
+            # nested property access like "resp.token"
+            return lambda variables_mapping: get_mapping_variable(
+                arg, variables_mapping
+            )
+
+        def get_variable(variables_mapping):
+            try:
+                return variables_mapping[arg]
+            except KeyError:
+                raise exceptions.VariableNotFound("{} is not found.".format(arg))
+
+        return get_variable
+
+    def get_function(self):
+        """get LazyFunction if raw string is a single function call,
+        e.g. "${parameterize(account.csv)}", otherwise return None.
+        """
+        if self._string == "{}" and isinstance(self._args[0], LazyFunction):
+            return self._args[0]
+
+        return None
+
+    def get_variables(self):
+        """get variables referenced in raw string, which are extracted only once."""
+        if self._variables is None:
+            self._variables = frozenset(regex_findall_variables(self.raw_string))
+        return self._variables
 
     def __repr__(self):
         return "LazyString({})".format(self.raw_string)
@@ -1148,36 +1344,34 @@ class LazyString(object):
         """parse lazy data with evaluated variables mapping.
         Notice: variables_mapping should not contain any variable or function.
         """
-        variables_mapping = variables_mapping or {}
-
-        args = []
-        for arg in self._args:
-            if isinstance(arg, LazyFunction):
-                if (
-                    self.cached
-                    and arg.cache_key
-                    and arg.cache_key in cached_functions_mapping
-                ):
-                    value = cached_functions_mapping[arg.cache_key]
-                else:
-                    value = arg.to_value(variables_mapping)
-                    cached_functions_mapping[arg.cache_key] = value
-                args.append(value)
-            else:
-                # variable
-                var_value = get_mapping_variable(arg, variables_mapping)
-                args.append(var_value)
+        return self._render(variables_mapping or {})
 
-        if self._string == "{}":
-            return args[0]
-        else:
-            return self._string.format(*args)
+
+class StaticDict(dict):
+    """prepared dict without any variable or function in it, including nested items."""
+
+
+class StaticList(list):
+    """prepared list without any variable or function in it, including nested items."""
+
+
+def is_lazy_data(content):
+    """check if prepared content contains any variable or function."""
+    if isinstance(content, (StaticDict, StaticList)):
+        return False
+
+    elif isinstance(content, (LazyString, LazyFunction, dict, list)):
+        return True
+
+    return False
 
 
 def prepare_lazy_data(
     content, functions_mapping=None, check_variables_set=None, cached=False
 ):
-    """make string in content as lazy object with functions_mapping
+    """make string in content as lazy object with functions_mapping,
+        dict/list without any variable or function is marked as StaticDict/StaticList,
+        which will not be walked through again in parse_lazy_data.
 
     Raises:
         exceptions.VariableNotFound: if any variable undefined in check_variables_set
@@ -1188,13 +1382,18 @@ def prepare_lazy_data(
         return content
 
     elif isinstance(content, (list, set, tuple)):
-        return [
+        parsed_content = [
             prepare_lazy_data(item, functions_mapping, check_variables_set, cached)
             for item in content
         ]
+        if not any(is_lazy_data(item) for item in parsed_content):
+            return StaticList(parsed_content)
+
+        return parsed_content
 
     elif isinstance(content, dict):
         parsed_content = {}
+        is_static = True
         for key, value in content.items():
             parsed_key = prepare_lazy_data(
                 key, functions_mapping, check_variables_set, cached
@@ -1203,6 +1402,11 @@ def prepare_lazy_data(
                 value, functions_mapping, check_variables_set, cached
             )
             parsed_content[parsed_key] = parsed_value
+            if is_lazy_data(parsed_key) or is_lazy_data(parsed_value):
+                is_static = False
+
+        if is_static:
+            return StaticDict(parsed_content)
 
         return parsed_content
 
@@ -1225,22 +1429,36 @@ def parse_lazy_data(content, variables_mapping=None):
     """parse lazy data with evaluated variables mapping.
     Notice: variables_mapping should not contain any variable or function.
     """
+    variables_mapping = utils.ensure_mapping_format(variables_mapping or {})
+    return _parse_lazy_data(content, variables_mapping)
+
+
+def _parse_lazy_data(content, variables_mapping):
+    """parse lazy data recursively, variables_mapping is ensured in mapping format."""
+    if isinstance(content, LazyString):
+        return content._render(variables_mapping)
+
     # TODO: refactor type check
-    if content is None or isinstance(content, (numeric_types, bool, type)):
+    elif content is None or isinstance(content, (numeric_types, bool, type)):
         return content
 
-    elif isinstance(content, LazyString):
-        variables_mapping = utils.ensure_mapping_format(variables_mapping or {})
-        return content.to_value(variables_mapping)
+    elif isinstance(content, StaticDict):
+        # static subtree is reused, only the outermost container is copied,
+        # in case of being modified by hooks, e.g. request["json"]["key"] = value,
+        # nested containers are shared and should be regarded as read-only.
+        return dict(content)
+
+    elif isinstance(content, StaticList):
+        return list(content)
 
     elif isinstance(content, (list, set, tuple)):
-        return [parse_lazy_data(item, variables_mapping) for item in content]
+        return [_parse_lazy_data(item, variables_mapping) for item in content]
 
     elif isinstance(content, dict):
         parsed_content = {}
         for key, value in content.items():
-            parsed_key = parse_lazy_data(key, variables_mapping)
-            parsed_value = parse_lazy_data(value, variables_mapping)
+            parsed_key = _parse_lazy_data(key, variables_mapping)
+            parsed_value = _parse_lazy_data(value, variables_mapping)
             parsed_content[parsed_key] = parsed_value
 
         return parsed_content
@@ -1275,12 +1493,17 @@ def extract_variables(content):
         return variables
 
     elif isinstance(content, LazyString):
-        return set(regex_findall_variables(content.raw_string))
+        return content.get_variables()
+
+    elif isinstance(content, LazyFunction):
+        return extract_variables(content.get_args()) | extract_variables(
+            content._kwargs
+        )
 
     return set()
 
 
-def parse_variables_mapping(variables_mapping):
+def parse_variables_mapping(variables_mapping, variables_order=None):
     """eval each prepared variable and function in variables_mapping.
 
     Args:
@@ -1294,6 +1517,9 @@ def parse_variables_mapping(variables_mapping):
                 "c": {"key": LazyString($b)},
                 "d": [LazyString($a), 3]
             }
+        variables_order (list): evaluation order sorted when parsing teststep,
+            variables not in it should be evaluated values, e.g. session variables.
+            Variables are sorted again if not specified.
 
     Returns:
         dict: parsed variables_mapping should not contain any variable or function.
@@ -1308,53 +1534,109 @@ def parse_variables_mapping(variables_mapping):
             }
 
     """
-    run_times = 0
+    if variables_order is None:
+        variables_order = sort_variables_mapping(variables_mapping)
+    else:
+        variables_order = _complete_variables_order(variables_mapping, variables_order)
+
     parsed_variables_mapping = {}
+    for var_name in variables_order:
+        parsed_variables_mapping[var_name] = _parse_lazy_data(
+            variables_mapping[var_name], parsed_variables_mapping
+        )
 
-    while len(parsed_variables_mapping) != len(variables_mapping):
-        for var_name in variables_mapping:
+    return parsed_variables_mapping
 
-            run_times += 1
-            if run_times > len(variables_mapping) * 4:
-                not_found_variables = {
-                    key: variables_mapping[key]
-                    for key in variables_mapping
-                    if key not in parsed_variables_mapping
-                }
-                raise exceptions.VariableNotFound(not_found_variables)
 
-            if var_name in parsed_variables_mapping:
-                continue
+def _complete_variables_order(variables_mapping, variables_order):
+    """complete evaluation order sorted when parsing with variables added at runtime,
+    which are evaluated first as they are values without dependency.
+    """
+    ordered_variables = set(variables_order)
+    added_variables = [
+        var_name for var_name in variables_mapping if var_name not in ordered_variables
+    ]
+    for var_name in added_variables:
+        if isinstance(variables_mapping[var_name], (LazyString, LazyFunction)):
+            # not evaluated, dependencies are unknown
+            return sort_variables_mapping(variables_mapping)
+
+    return added_variables + [
+        var_name for var_name in variables_order if var_name in variables_mapping
+    ]
+
+
+def sort_variables_mapping(variables_mapping, strict=True):
+    """sort variables topologically by their dependencies, thus each variable can be
+        evaluated after all variables it references in one single pass.
+
+    Args:
+        variables_mapping (dict): prepared variables mapping.
+        strict (bool): raise if referenced variable is not defined, otherwise it is
+            regarded as provided at runtime, e.g. extracted by former teststep.
+
+    Returns:
+        list: variable names in evaluation order, declaration order is kept
+            for variables without dependency between them.
 
-            value = variables_mapping[var_name]
-            variables = extract_variables(value)
+    Raises:
+        exceptions.VariableNotFound: reference variable itself, circular reference,
+            or reference undefined variable.
 
-            # check if reference variable itself
-            if var_name in variables:
+    """
+    # dependency graph, for nested property access like "resp.token",
+    # only depends on base variable "resp"
+    dependencies = {}
+    for var_name, value in variables_mapping.items():
+        dependencies[var_name] = [
+            _var_name.split(".")[0] for _var_name in extract_variables(value)
+        ]
+
+    sorted_variables = []
+    # visiting variables stack, used to report circular reference path
+    visiting = []
+    visited = set()
+
+    def visit(var_name):
+        visiting.append(var_name)
+        for dep_var_name in dependencies[var_name]:
+            if dep_var_name == var_name:
                 # e.g.
-                # var_name = "token"
                 # variables_mapping = {"token": LazyString($token)}
-                # var_name = "key"
                 # variables_mapping = {"key": [LazyString($key), 2]}
                 raise exceptions.VariableNotFound(var_name)
 
-            if variables:
-                # reference other variable, or function call with other variable
-                # e.g. {"varA": "123$varB", "varB": "456$varC"}
-                # e.g. {"varC": "${sum_two($a, $b)}"}
-                if any(
-                    [
-                        _var_name not in parsed_variables_mapping
-                        for _var_name in variables
-                    ]
-                ):
-                    # reference variable not parsed
+            if dep_var_name in visited:
+                continue
+
+            if dep_var_name in visiting:
+                # e.g. {"varA": "$varB", "varB": "$varA"}
+                circle = visiting[visiting.index(dep_var_name):] + [dep_var_name]
+                raise exceptions.VariableNotFound(
+                    "circular reference: {}".format(" -> ".join(circle))
+                )
+
+            if dep_var_name not in dependencies:
+                if not strict:
                     continue
 
-            parsed_value = parse_lazy_data(value, parsed_variables_mapping)
-            parsed_variables_mapping[var_name] = parsed_value
+                raise exceptions.VariableNotFound(
+                    "{} is referenced by {} but not defined".format(
+                        dep_var_name, var_name
+                    )
+                )
 
-    return parsed_variables_mapping
+            visit(dep_var_name)
+
+        visiting.pop()
+        visited.add(var_name)
+        sorted_variables.append(var_name)
+
+    for var_name in variables_mapping:
+        if var_name not in visited:
+            visit(var_name)
+
+    return sorted_variables
 
 
 def _extend_with_api(test_dict, api_def_dict):
@@ -1621,6 +1903,14 @@ def __prepare_testcase_tests(
 
         teststep_variables_set |= session_variables_set
 
+        # merge extract and validate check fields into one extraction plan
+        if "request" in test_dict:
+            extraction_plan = _build_extraction_plan(
+                test_dict.get("extract", {}), test_dict.get("validate", [])
+            )
+        else:
+            extraction_plan = None
+
         # convert validators to lazy function
         validators = test_dict.pop("validate", [])
         prepared_validators = []
@@ -1640,11 +1930,49 @@ def __prepare_testcase_tests(
         prepared_test_dict = prepare_lazy_data(
             test_dict, functions, teststep_variables_set
         )
+        if extraction_plan:
+            prepared_test_dict["extraction_plan"] = extraction_plan
+
+        # sort teststep variables once, instead of each time teststep runs
+        if prepared_test_dict.get("variables"):
+            try:
+                prepared_test_dict["variables_order"] = sort_variables_mapping(
+                    prepared_test_dict["variables"], strict=False
+                )
+            except exceptions.VariableNotFound:
+                # e.g. self reference overridden by session variable at runtime
+                pass
+
         prepared_testcase_tests.append(prepared_test_dict)
 
     return prepared_testcase_tests
 
 
+def _build_extraction_plan(extractors, validators):
+    """merge response fields referenced by extractors and validators into one
+    extraction plan, thus response body is walked once for both stages.
+
+    Args:
+        extractors (dict/list): extract of teststep.
+        validators (list): uniformed validators of teststep.
+
+    Returns:
+        response.ExtractionPlan: fields with variable or function reference are
+            excluded, as they are evaluated in runtime.
+
+    """
+    fields = list(utils.ensure_mapping_format(extractors).values())
+    fields.extend(validator.get("check") for validator in validators)
+
+    return response.ExtractionPlan(
+        [
+            field
+            for field in fields
+            if isinstance(field, basestring) and not is_var_or_func_exist(field)
+        ]
+    )
+
+
 def _parse_testcase(testcase, project_mapping, session_variables_set=None):
     """parse testcase
 
@@ -1677,16 +2005,15 @@ def _parse_testcase(testcase, project_mapping, session_variables_set=None):
             "failed to parse testcase: {}, error: {}".format(testcase_path, ex)
         )
 
-        global parse_failed_testfiles
-        if testcase_type not in parse_failed_testfiles:
-            parse_failed_testfiles[testcase_type] = []
-
-        parse_failed_testfiles[testcase_type].append(testcase_path)
+        parse_failed_testfiles = get_parse_failed_testfiles()
+        parse_failed_testfiles.setdefault(testcase_type, []).append(testcase_path)
 
         return None
 
 
-def __get_parsed_testsuite_testcases(testcases, testsuite_config, project_mapping):
+def __get_parsed_testsuite_testcases(
+    testcases, testsuite_config, project_mapping, shard_selector
+):
     """override testscases with testsuite config variables, base_url and verify.
 
         variables priority:
@@ -1732,7 +2059,6 @@ def __get_parsed_testsuite_testcases(testcases, testsuite_config, project_mappin
     testsuite_base_url = testsuite_config.get("base_url")
     testsuite_config_variables = testsuite_config.get("variables", {})
     functions = project_mapping.get("functions", {})
-    parsed_testcase_list = []
 
     for testcase_name, testcase in testcases.items():
 
@@ -1770,46 +2096,126 @@ def __get_parsed_testsuite_testcases(testcases, testsuite_config, project_mappin
 
         # parse parameters
         if "parameters" in testcase and testcase["parameters"]:
-            cartesian_product_parameters = parse_parameters(
+            cartesian_product_parameters = iter_parameters(
                 testcase["parameters"], parsed_config_variables, functions
             )
 
-            for parameter_variables in cartesian_product_parameters:
-                # deepcopy to avoid influence between parameters
-                testcase_copied = utils.deepcopy_dict(parsed_testcase)
-                parsed_config_variables_copied = utils.deepcopy_dict(
-                    parsed_config_variables
-                )
-                testcase_copied["config"]["variables"] = utils.extend_variables(
-                    parsed_config_variables_copied, parameter_variables
-                )
-                parsed_testcase_copied = _parse_testcase(
-                    testcase_copied, project_mapping
-                )
-                if not parsed_testcase_copied:
-                    continue
-                parsed_testcase_copied["config"]["name"] = parse_lazy_data(
-                    parsed_testcase_copied["config"]["name"],
-                    testcase_copied["config"]["variables"],
-                )
-                parsed_testcase_list.append(parsed_testcase_copied)
+            for bound_testcase in _bind_testcase_parameters(
+                parsed_testcase,
+                parsed_config_variables,
+                cartesian_product_parameters,
+                project_mapping,
+                shard_selector,
+            ):
+                yield bound_testcase
 
         else:
             parsed_testcase = _parse_testcase(parsed_testcase, project_mapping)
-            if not parsed_testcase:
+            if not parsed_testcase or not shard_selector.select():
                 continue
-            parsed_testcase_list.append(parsed_testcase)
+            yield parsed_testcase
+
+
+def _bind_testcase_parameters(
+    testcase, parsed_config_variables, parameters_list, project_mapping, shard_selector
+):
+    """parse testcase only once, and bind each parameter variables to config variables.
+        teststeps are shared by all bound testcases, parameter variables will override
+        teststep variables at runtime as session variables.
+
+    Args:
+        testcase (dict): testcase to be parsed, with config and teststeps.
+        parsed_config_variables (dict): parsed testcase config variables.
+        parameters_list (iterable): cartesian product of parameters, variables mapping
+            is bound one by one, thus parameters may be generated lazily.
+        project_mapping (dict): project info, variables in it have the highest priority.
+        shard_selector (ShardSelector): testcases not in shard are skipped before
+            binding parameter variables.
+
+    Yields:
+        dict: bound testcase, each one corresponds to one parameter variables.
+
+    """
+    parameters_iterator = iter(parameters_list)
+    try:
+        first_parameter_variables = next(parameters_iterator)
+    except StopIteration:
+        return
+
+    functions = project_mapping.get("functions", {})
+    override_variables = project_mapping.get("variables", {})
+
+    # parse testcase template with the first parameter variables
+    testcase["config"]["variables"] = utils.extend_variables(
+        utils.deepcopy_dict(parsed_config_variables), first_parameter_variables
+    )
+    parsed_testcase_template = _parse_testcase(testcase, project_mapping)
+    if not parsed_testcase_template:
+        return
 
-    return parsed_testcase_list
+    prepared_config_template = parsed_testcase_template["config"]
+    check_variables_set = set(prepared_config_template.get("variables", {}).keys())
 
+    for parameter_variables in itertools.chain(
+        [first_parameter_variables], parameters_iterator
+    ):
+        if not shard_selector.select():
+            continue
+
+        # priority: project mapping variables > parameters > testcase config variables
+        config_variables = utils.extend_variables(
+            dict(parsed_config_variables), parameter_variables
+        )
+        prepared_config_variables = prepare_lazy_data(
+            utils.extend_variables(dict(config_variables), override_variables),
+            functions,
+            check_variables_set,
+            cached=True,
+        )
+
+        bound_config = dict(prepared_config_template)
+        bound_config["variables"] = prepared_config_variables
+        bound_config["name"] = parse_lazy_data(
+            prepared_config_template["name"], config_variables
+        )
+        yield {
+            "config": bound_config,
+            "teststeps": parsed_testcase_template["teststeps"],
+        }
+
+
+class ShardSelector(object):
+    """select generated testcases of one shard with round-robin by generated order,
+    testcases are counted before parameters are bound, thus testcases of other
+    shards are skipped without binding.
+    """
+
+    def __init__(self, shard=None):
+        """
+        Args:
+            shard (tuple): (shard_index, shard_count), shard_index starts from 1,
+                all testcases are selected if not specified.
+
+        """
+        self.shard = shard
+        self.index = -1
+
+    def select(self):
+        """count next generated testcase and check if it is in shard."""
+        self.index += 1
+        if not self.shard:
+            return True
+
+        shard_index, shard_count = self.shard
+        return self.index % shard_count == shard_index - 1
 
-def _parse_testsuite(testsuite, project_mapping):
+
+def _parse_testsuite(testsuite, project_mapping, shard_selector):
     testsuite.setdefault("config", {})
     prepared_config = __prepare_config(testsuite["config"], project_mapping)
-    parsed_testcase_list = __get_parsed_testsuite_testcases(
-        testsuite["testcases"], prepared_config, project_mapping
+    return __get_parsed_testsuite_testcases(
+        testsuite["testcases"], prepared_config, project_mapping, shard_selector
     )
-    return parsed_testcase_list
 
 
 def parse_tests(tests_mapping):
@@ -1877,26 +2283,42 @@ def parse_tests(tests_mapping):
             }
 
     """
-    project_mapping = tests_mapping.get("project_mapping", {})
-    testcases = []
+    return list(iter_parse_tests(tests_mapping))
+
+
+def iter_parse_tests(tests_mapping, shard=None):
+    """parse tests lazily, parameterized testcases are generated one by one.
 
+    Args:
+        tests_mapping (dict): the same with parse_tests
+        shard (tuple): (shard_index, shard_count), shard_index starts from 1,
+            only testcases in specified shard will be generated, with round-robin
+            selection by testcase generated order.
+
+    Yields:
+        dict: parsed testcase
+
+    """
+    project_mapping = tests_mapping.get("project_mapping", {})
+    shard_selector = ShardSelector(shard)
     for test_type in tests_mapping:
 
         if test_type == "testsuites":
             # load testcases of testsuite
             testsuites = tests_mapping["testsuites"]
             for testsuite in testsuites:
-                parsed_testcases = _parse_testsuite(testsuite, project_mapping)
-                for parsed_testcase in parsed_testcases:
-                    testcases.append(parsed_testcase)
+                for parsed_testcase in _parse_testsuite(
+                    testsuite, project_mapping, shard_selector
+                ):
+                    yield parsed_testcase
 
         elif test_type == "testcases":
             for testcase in tests_mapping["testcases"]:
                 testcase["type"] = "testcase"
                 parsed_testcase = _parse_testcase(testcase, project_mapping)
-                if not parsed_testcase:
+                if not parsed_testcase or not shard_selector.select():
                     continue
-                testcases.append(parsed_testcase)
+                yield parsed_testcase
 
         elif test_type == "apis":
             # encapsulate api as a testcase
@@ -1908,8 +2330,6 @@ def parse_tests(tests_mapping):
                     "type": api_content.pop("type", "api"),
                 }
                 parsed_testcase = _parse_testcase(testcase, project_mapping)
-                if not parsed_testcase:
+                if not parsed_testcase or not shard_selector.select():
                     continue
-                testcases.append(parsed_testcase)
-
-    return testcases
+                yield parsed_testcase
@@ -3,11 +3,13 @@ HttpRunner report
 
 - summarize: aggregate test stat data to summary
 - stringify: stringify summary, in order to dump json file and generate html report.
+- store: spill teststep records to SQLite file in large runs.
 - html: render html report
 """
 
 from apimeter.report.summarize import get_platform, aggregate_stat, get_summary
 from apimeter.report.stringify import stringify_summary
+from apimeter.report.store import RecordStore, StoredRecords, make_records
 from apimeter.report.html import HtmlTestResult, gen_html_report
 
 __all__ = [
@@ -15,6 +17,9 @@ __all__ = [
     "aggregate_stat",
     "get_summary",
     "stringify_summary",
+    "RecordStore",
+    "StoredRecords",
+    "make_records",
     "HtmlTestResult",
     "gen_html_report",
 ]
@@ -58,10 +58,11 @@ def gen_html_report(summary, report_template=None, report_dir=None, report_file=
     with io.open(report_template, "r", encoding="utf-8") as fp_r:
         template_content = fp_r.read()
         with io.open(report_path, "w", encoding="utf-8") as fp_w:
-            rendered_content = Template(
+            # render in stream, records are written once rendered instead of
+            # holding the whole report content in memory
+            Template(
                 template_content, extensions=["jinja2.ext.loopcontrols"]
-            ).render(summary)
-            fp_w.write(rendered_content)
+            ).stream(summary).dump(fp_w)
 
     logger.log_info("Generated Html report: {}".format(report_path))
 
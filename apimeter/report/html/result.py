@@ -1,7 +1,8 @@
 import time
 import unittest
 
-from apimeter import logger
+from apimeter import client, logger
+from apimeter.report.store import make_records
 
 
 class HtmlTestResult(unittest.TextTestResult):
@@ -11,14 +12,14 @@ class HtmlTestResult(unittest.TextTestResult):
 
     def __init__(self, stream, descriptions, verbosity):
         super(HtmlTestResult, self).__init__(stream, descriptions, verbosity)
-        self.records = []
+        self.records = make_records()
 
     def _record_test(self, test, status, attachment=""):
         data = {
             "name": test.shortDescription(),
             "status": status,
             "attachment": attachment,
-            "meta_datas": test.meta_datas,
+            "meta_datas": client.record_meta_datas(test.meta_datas, status),
         }
         self.records.append(data)
 
@@ -0,0 +1,199 @@
+"""
+record store
+
+Teststep records with request/response details are kept in memory until the summary
+and html report are generated, which may exhaust memory in large runs. With record
+store set in run context, records are stringified and spilled to SQLite file once
+the teststep is finished, only a bounded buffer is kept in memory. Records in
+summary are StoredRecords then, which are read from the store lazily when iterated,
+e.g. by get_summary and html report rendering.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+from apimeter import runtime
+from apimeter.report.stringify import stringify_record
+
+# records are written to store in batches of buffer size
+RECORD_BUFFER_SIZE = 100
+# rows fetched at once when iterating records
+RECORD_FETCH_SIZE = 100
+
+
+class RecordStore(object):
+    """SQLite store of teststep records in one run.
+
+    Examples:
+        >>> record_store = RecordStore("reports/records.sqlite3")
+        >>> records = record_store.new_records()
+        >>> records.append(record)
+        >>> for record in records:
+        ...     print(record["name"])
+
+    """
+
+    def __init__(self, path, buffer_size=RECORD_BUFFER_SIZE):
+        """
+        Args:
+            path (str): SQLite file path, records of former run in it are dropped.
+            buffer_size (int): max count of records buffered in memory.
+
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self.testcases = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+
+        store_dir = os.path.dirname(os.path.abspath(path))
+        if not os.path.isdir(store_dir):
+            os.makedirs(store_dir)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # records are temporary data of current run, durability is not required
+        self._conn.executescript(
+            """
+            PRAGMA synchronous = OFF;
+            PRAGMA journal_mode = MEMORY;
+            DROP TABLE IF EXISTS records;
+            CREATE TABLE records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                testcase_id INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                record TEXT NOT NULL
+            );
+            CREATE INDEX records_testcase ON records (testcase_id, id);
+            """
+        )
+
+    def new_records(self, records=None):
+        """create records of a new testcase in store.
+
+        Args:
+            records (list): initial records, e.g. records of testcase run in worker.
+
+        Returns:
+            StoredRecords: records of testcase.
+
+        """
+        with self._lock:
+            self.testcases += 1
+            stored_records = StoredRecords(self, self.testcases)
+
+        for record in records or []:
+            stored_records.append(record)
+
+        return stored_records
+
+    def add(self, testcase_id, record):
+        """stringify record and add it to buffer, buffer is written when it is full."""
+        stringify_record(record)
+        row = (
+            testcase_id,
+            record["status"],
+            json.dumps(record, ensure_ascii=False, default=str),
+        )
+        with self._lock:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.buffer_size:
+                self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+
+        self._conn.executemany(
+            "INSERT INTO records (testcase_id, status, record) VALUES (?, ?, ?)",
+            self._buffer,
+        )
+        self._conn.commit()
+        self._buffer = []
+
+    def flush(self):
+        """write buffered records to store."""
+        with self._lock:
+            self._flush()
+
+    def iter_records(self, testcase_id):
+        """iterate records of testcase in added order, fetched in batches."""
+        with self._lock:
+            self._flush()
+            cursor = self._conn.execute(
+                "SELECT record FROM records WHERE testcase_id = ? ORDER BY id",
+                (testcase_id,),
+            )
+
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(RECORD_FETCH_SIZE)
+            if not rows:
+                break
+
+            for (record,) in rows:
+                yield json.loads(record)
+
+    def count(self, testcase_id):
+        with self._lock:
+            self._flush()
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM records WHERE testcase_id = ?", (testcase_id,)
+            ).fetchone()
+
+        return count
+
+    def remove(self, testcase_id, status):
+        """remove records of testcase with specified status."""
+        with self._lock:
+            self._flush()
+            self._conn.execute(
+                "DELETE FROM records WHERE testcase_id = ? AND status = ?",
+                (testcase_id, status),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._conn.close()
+
+
+class StoredRecords(object):
+    """records of one testcase in RecordStore, used in place of records list of
+    test result and testcase summary.
+    """
+
+    def __init__(self, store, testcase_id):
+        self.store = store
+        self.testcase_id = testcase_id
+
+    def append(self, record):
+        self.store.add(self.testcase_id, record)
+
+    def remove(self, status):
+        """remove records with specified status, e.g. success."""
+        self.store.remove(self.testcase_id, status)
+
+    def __iter__(self):
+        return self.store.iter_records(self.testcase_id)
+
+    def __len__(self):
+        return self.store.count(self.testcase_id)
+
+    def __repr__(self):
+        return "<StoredRecords testcase_id={} path={}>".format(
+            self.testcase_id, self.store.path
+        )
+
+
+def make_records():
+    """make records of test result, which are stored in record store of current run
+    if it is set, otherwise kept in list.
+    """
+    record_store = runtime.get_run_context().record_store
+    if record_store is None:
+        return []
+
+    return record_store.new_records()
@@ -200,6 +200,16 @@ def __stringify_meta_datas(meta_datas):
             __stringify_response(data["response"])
 
 
+def stringify_record(record):
+    """stringify teststep record, meta datas are expanded to one level."""
+    meta_datas = record["meta_datas"]
+    __stringify_meta_datas(meta_datas)
+    meta_datas_expanded = []
+    __expand_meta_datas(meta_datas, meta_datas_expanded)
+    record["meta_datas_expanded"] = meta_datas_expanded
+    record["response_time"] = __get_total_response_time(meta_datas_expanded)
+
+
 def stringify_summary(summary):
     """stringify summary, in order to dump json file and generate html report."""
     for index, suite_summary in enumerate(summary["details"]):
@@ -207,10 +217,10 @@ def stringify_summary(summary):
         if not suite_summary.get("name"):
             suite_summary["name"] = "testcase {}".format(index)
 
-        for record in suite_summary.get("records"):
-            meta_datas = record["meta_datas"]
-            __stringify_meta_datas(meta_datas)
-            meta_datas_expanded = []
-            __expand_meta_datas(meta_datas, meta_datas_expanded)
-            record["meta_datas_expanded"] = meta_datas_expanded
-            record["response_time"] = __get_total_response_time(meta_datas_expanded)
+        records = suite_summary.get("records")
+        if not isinstance(records, list):
+            # records in record store are stringified when written
+            continue
+
+        for record in records:
+            stringify_record(record)
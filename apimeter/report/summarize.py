@@ -22,7 +22,10 @@ def aggregate_stat(origin_stat, new_stat):
 
     """
     for key in new_stat:
-        if key not in origin_stat:
+        if isinstance(new_stat[key], dict):
+            # nested stat, e.g. request timing phases
+            aggregate_stat(origin_stat.setdefault(key, {}), new_stat[key])
+        elif key not in origin_stat:
             origin_stat[key] = new_stat[key]
         elif key == "start_at":
             # start datetime
@@ -39,6 +42,59 @@ def aggregate_stat(origin_stat, new_stat):
             origin_stat[key] += new_stat[key]
 
 
+# request timing stat aggregated in summary, recorded by HttpSession
+REQUEST_STAT_KEYS = (
+    "response_time_ms",
+    "elapsed_ms",
+    "dns_ms",
+    "connect_ms",
+    "tls_ms",
+    "ttfb_ms",
+    "download_ms",
+    "retries",
+)
+
+
+def get_requests_stat(records):
+    """aggregate request timing phases of all teststeps in records, thus network
+    latency (dns, connect, tls) can be told apart from server latency (ttfb).
+
+    Args:
+        records (list): test records, meta_datas of teststep may be nested list
+            for nested testcase.
+
+    Returns:
+        dict: request count and total of each timing phase, requests failed
+            before sent are not counted.
+
+    """
+    requests_stat = dict.fromkeys(REQUEST_STAT_KEYS, 0)
+    requests_stat["count"] = 0
+
+    meta_datas = [record.get("meta_datas") for record in records]
+    while meta_datas:
+        meta_data = meta_datas.pop()
+        if isinstance(meta_data, list):
+            meta_datas.extend(meta_data)
+            continue
+
+        stat = (meta_data or {}).get("stat", {})
+        if not isinstance(stat.get("response_time_ms"), (int, float)):
+            continue
+
+        requests_stat["count"] += 1
+        for key in REQUEST_STAT_KEYS:
+            value = stat.get(key, 0)
+            if isinstance(value, (int, float)):
+                requests_stat[key] += value
+
+    for key in REQUEST_STAT_KEYS:
+        if key != "retries":
+            requests_stat[key] = round(requests_stat[key], 2)
+
+    return requests_stat
+
+
 def get_summary(result):
     """get summary from test result
 
@@ -76,7 +132,11 @@ def get_summary(result):
         - summary["stat"]["unexpectedSuccesses"]
     )
 
-    summary["time"] = {"start_at": result.start_at, "duration": result.duration}
+    summary["time"] = {
+        "start_at": result.start_at,
+        "duration": result.duration,
+        "requests": get_requests_stat(result.records),
+    }
     summary["records"] = result.records
 
     return summary
@@ -1,3 +1,5 @@
+import copy
+import functools
 import re
 from collections import OrderedDict
 
@@ -8,6 +10,250 @@ from apimeter.compat import basestring, is_py2
 
 text_extractor_regexp_compile = re.compile(r".*\(.*\).*")
 
+# max count of compiled JSONPath expressions kept in cache
+JSONPATH_CACHE_SIZE = 1024
+
+# sentinel of path not found in response
+NOT_FOUND = object()
+
+
+def _is_simple_jsonpath_loc(loc):
+    """simple location is dict key or list index, e.g. data, items, 0"""
+    if not loc or loc in ("*", "..", "!"):
+        return False
+
+    # index expression (expr), filter ?(expr), slice 0:2 and union 0,1
+    return not (loc.startswith("(") or loc.startswith("?(") or ":" in loc or "," in loc)
+
+
+def _parse_simple_jsonpath(expr):
+    """parse simple JSONPath expression to steps of dict key or list index.
+
+    Returns:
+        list: steps in [(key, index)], index is None if key is not digit.
+            None if expr is not simple, e.g. with wildcard or filter.
+
+    """
+    cleaned_expr = jsonpath.normalize(expr)
+    if cleaned_expr.startswith("$;"):
+        cleaned_expr = cleaned_expr[2:]
+
+    steps = []
+    for loc in cleaned_expr.split(";") if cleaned_expr else []:
+        if not _is_simple_jsonpath_loc(loc):
+            return None
+
+        try:
+            index = int(loc) if loc.isdigit() else None
+        except ValueError:
+            return None
+
+        steps.append((loc, index))
+
+    return steps
+
+
+def _get_jsonpath_step(obj, key, index):
+    """get child of obj with JSONPath step, NOT_FOUND if not matched."""
+    if isinstance(obj, dict):
+        return obj[key] if key in obj else NOT_FOUND
+    elif isinstance(obj, list) and index is not None and index < len(obj):
+        return obj[index]
+
+    return NOT_FOUND
+
+
+def _get_delimiter_step(obj, key):
+    """get child of obj with delimiter query key, the same as utils.query_json."""
+    try:
+        if isinstance(obj, (list, basestring)):
+            return obj[int(key)]
+        elif isinstance(obj, dict):
+            return obj[key]
+    except (KeyError, ValueError, IndexError):
+        pass
+
+    return NOT_FOUND
+
+
+@functools.lru_cache(maxsize=JSONPATH_CACHE_SIZE)
+def compile_jsonpath(expr):
+    """compile JSONPath expression to query function, which returns the same result
+    with jsonpath.jsonpath(obj, expr).
+
+    Simple path like $.data.items[0].id is compiled to direct accessor, other
+    expressions with wildcard, recursive descent, slice or filter are evaluated
+    by jsonpath.
+
+    Args:
+        expr (str): JSONPath expression
+
+    Returns:
+        function: query(obj), returns list of matched values, False if not matched.
+
+    """
+    if not expr:
+        return lambda obj: False
+
+    steps = _parse_simple_jsonpath(expr)
+    if steps is None:
+        return functools.partial(jsonpath.jsonpath, expr=expr)
+
+    def query(obj):
+        if not obj:
+            return False
+
+        for key, index in steps:
+            obj = _get_jsonpath_step(obj, key, index)
+            if obj is NOT_FOUND:
+                return False
+
+        return [obj]
+
+    return query
+
+
+class _PlanNode(object):
+    """trie node of extraction plan."""
+
+    __slots__ = ("children", "fields")
+
+    def __init__(self):
+        # (kind, key, index) => _PlanNode
+        self.children = {}
+        # fields end at this node
+        self.fields = []
+
+
+class ExtractionPlan(object):
+    """merged extraction paths of one teststep, built by parser from extract and
+    validate check fields.
+
+    Paths of response body, i.e. delimiter fields like content.data.id and simple
+    JSONPath like $.data.id, are stored in a trie over path segments, thus response
+    body is walked once and common prefixes are resolved once. Other JSONPath
+    expressions are evaluated once for all references. Fields not supported, e.g.
+    regex and headers, are left to ResponseObject.extract_field.
+
+    Examples:
+        >>> plan = ExtractionPlan(["content.data.id", "$.data.name", "status_code"])
+        >>> plan.fields
+        ['content.data.id', '$.data.name']
+        >>> resp_obj.prefetch_fields(plan)
+
+    """
+
+    def __init__(self, fields=None):
+        self.root = _PlanNode()
+        self.jsonpath_queries = []
+        self.fields = []
+        for field in fields or []:
+            self.add(field)
+
+    def __len__(self):
+        return len(self.fields)
+
+    def __repr__(self):
+        return "ExtractionPlan({})".format(self.fields)
+
+    def add(self, field):
+        """add field to plan, the same field is added only once.
+
+        Returns:
+            bool: True if field is supported by plan.
+
+        """
+        if not isinstance(field, basestring):
+            return False
+
+        if field in self.fields:
+            return True
+
+        if field.startswith("$"):
+            steps = _parse_simple_jsonpath(field)
+            if steps is None:
+                self.jsonpath_queries.append(field)
+            else:
+                self._insert(field, [("jsonpath", key, index) for key, index in steps])
+
+        elif text_extractor_regexp_compile.match(field):
+            return False
+
+        else:
+            try:
+                top_query, sub_query = field.split(".", 1)
+            except ValueError:
+                return False
+
+            if top_query not in ["body", "content", "text", "json"]:
+                return False
+
+            self._insert(
+                field, [("delimiter", key, None) for key in sub_query.split(".")]
+            )
+
+        self.fields.append(field)
+        return True
+
+    def _insert(self, field, segments):
+        node = self.root
+        for segment in segments:
+            node = node.children.setdefault(segment, _PlanNode())
+
+        node.fields.append(field)
+
+    def execute(self, body):
+        """walk response body once, get values of all fields in plan.
+
+        Args:
+            body: response body parsed as JSON, or text if body is not JSON.
+
+        Returns:
+            dict: values of fields which are extracted successfully, failed fields
+                are not included.
+
+        """
+        values = {}
+        for expr in self.jsonpath_queries:
+            result = compile_jsonpath(expr)(body)
+            if result:
+                values[expr] = result
+
+        # query_json only walks JSON body, and JSONPath returns False for empty body
+        walk_delimiter = isinstance(body, (dict, list))
+        walk_jsonpath = bool(body)
+
+        if walk_jsonpath:
+            # JSONPath $ matches whole body
+            for field in self.root.fields:
+                values[field] = [body]
+
+        stack = []
+        for segment, node in self.root.children.items():
+            kind = segment[0]
+            if kind == "delimiter" and walk_delimiter:
+                stack.append((segment, node, body))
+            elif kind == "jsonpath" and walk_jsonpath:
+                stack.append((segment, node, body))
+
+        while stack:
+            (kind, key, index), node, parent = stack.pop()
+            if kind == "jsonpath":
+                value = _get_jsonpath_step(parent, key, index)
+            else:
+                value = _get_delimiter_step(parent, key)
+
+            if value is NOT_FOUND:
+                continue
+
+            for field in node.fields:
+                values[field] = [value] if kind == "jsonpath" else value
+
+            for segment, child in node.children.items():
+                stack.append((segment, child, value))
+
+        return values
+
 
 class ResponseObject(object):
     def __init__(self, resp_obj):
@@ -17,8 +263,18 @@ class ResponseObject(object):
             resp_obj (instance): requests.Response instance
 
         """
+        # field => extracted value, reused by extractors, validators and functions
+        self.field_cache = {}
+        # field => exception raised when extracting, re-raised without formatting
+        self.failed_fields = {}
         self.resp_obj = resp_obj
 
+    def __setattr__(self, key, value):
+        # attributes set in teardown hooks may change values of extracted fields
+        self.__dict__[key] = value
+        if key not in ("field_cache", "failed_fields"):
+            self.clear_field_cache()
+
     def __getattr__(self, key):
         try:
             if key == "json":
@@ -35,6 +291,28 @@ class ResponseObject(object):
             logger.log_error(err_msg)
             raise exceptions.ParamsError(err_msg)
 
+    def parsed_body(self):
+        """get response body parsed as JSON, or text if body is not JSON."""
+        try:
+            return self.json
+        except exceptions.JSONDecodeError:
+            return self.text
+
+    def prefetch_fields(self, extraction_plan):
+        """walk response body once with extraction plan, values of fields in plan
+        are reused by extract_field in extract and validate stages.
+
+        Args:
+            extraction_plan (ExtractionPlan): merged extract and validate fields.
+
+        """
+        self.field_cache.update(extraction_plan.execute(self.parsed_body()))
+
+    def clear_field_cache(self):
+        """clear cached fields, called when response is changed by teardown hooks."""
+        self.field_cache.clear()
+        self.failed_fields.clear()
+
     def _extract_field_with_jsonpath(self, field):
         """
         JSONPath Docs: https://goessner.net/articles/JsonPath/
@@ -58,7 +336,7 @@ class ResponseObject(object):
         :param field:  Jsonpath expression, e.g. 1)$.code   2) $..items.*.id
         :return:       A list that extracted from json repsonse example.    1) [200]   2) [1, 2]
         """
-        result = jsonpath.jsonpath(self.parsed_body(), field)
+        result = compile_jsonpath(field)(self.parsed_body())
         if result:
             return result
         else:
@@ -254,14 +532,28 @@ class ResponseObject(object):
             logger.log_error(err_msg)
             raise exceptions.ParamsError(err_msg)
 
+        if field in self.field_cache:
+            return self._copy_field_value(self.field_cache[field])
+
+        if field in self.failed_fields:
+            raise self.failed_fields[field]
+
         msg = "extract: {}".format(field)
 
-        if field.startswith("$"):
-            value = self._extract_field_with_jsonpath(field)
-        elif text_extractor_regexp_compile.match(field):
-            value = self._extract_field_with_regex(field)
-        else:
-            value = self._extract_field_with_delimiter(field)
+        try:
+            if field.startswith("$"):
+                value = self._extract_field_with_jsonpath(field)
+            elif text_extractor_regexp_compile.match(field):
+                value = self._extract_field_with_regex(field)
+            else:
+                value = self._extract_field_with_delimiter(field)
+        except (
+            exceptions.ParamsError,
+            exceptions.ExtractFailure,
+            exceptions.TeardownHooksFailure,
+        ) as ex:
+            self.failed_fields[field] = ex
+            raise
 
         if is_py2 and isinstance(value, unicode):
             value = value.encode("utf-8")
@@ -269,6 +561,17 @@ class ResponseObject(object):
         msg += "\t=> {}".format(value)
         logger.log_debug(msg)
 
+        self.field_cache[field] = value
+        return self._copy_field_value(value)
+
+    @staticmethod
+    def _copy_field_value(value):
+        """cached value of list or dict is copied when extracted, in case of being
+        modified by hooks or functions and affecting later extractions.
+        """
+        if isinstance(value, (list, dict)):
+            return copy.deepcopy(value)
+
         return value
 
     def extract_response(self, extractors):
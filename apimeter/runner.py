@@ -3,7 +3,7 @@
 from enum import Enum
 from unittest.case import SkipTest
 
-from apimeter import exceptions, logger, response, utils
+from apimeter import cache, exceptions, logger, response, utils
 from apimeter.client import HttpSession
 from apimeter.context import SessionContext
 from apimeter.validator import Validator
@@ -77,6 +77,8 @@ class Runner(object):
         self.testcase_teardown_hooks = config.get("teardown_hooks", [])
 
         self.http_client_session = http_client_session or HttpSession()
+        # results of memoized functions in testcase scope
+        self.cache_scope = cache.CacheScope()
         self.session_context = SessionContext(config_variables)
 
         if testcase_setup_hooks:
@@ -194,13 +196,36 @@ class Runner(object):
         # clear meta data first to ensure independence for each test
         self.__clear_test_data()
 
+        test_dict, request_name, method, parsed_url, parsed_test_request = (
+            self._prepare_test(test_dict)
+        )
+
+        # request
+        resp = self.http_client_session.request(
+            method, parsed_url, name=request_name, **parsed_test_request
+        )
+        self._handle_response(test_dict, resp, method, parsed_url, parsed_test_request)
+
+    def _prepare_test(self, test_dict):
+        """prepare teststep before sending request: check skip, init variables,
+        parse request and call setup hooks.
+
+        Args:
+            test_dict (dict): teststep info
+
+        Returns:
+            tuple: (test_dict, request_name, method, parsed_url, parsed_test_request)
+
+        """
         # check skip
         self._handle_skip_feature(test_dict)
 
         # prepare
         test_dict = utils.lower_test_dict_keys(test_dict)
         test_variables = test_dict.get("variables", {})
-        self.session_context.init_test_variables(test_variables)
+        self.session_context.init_test_variables(
+            test_variables, test_dict.get("variables_order")
+        )
 
         # teststep name
         test_name = self.session_context.eval_content(test_dict.get("name", ""))
@@ -232,10 +257,25 @@ class Runner(object):
             "request kwargs(raw): {kwargs}".format(kwargs=parsed_test_request)
         )
 
-        # request
-        resp = self.http_client_session.request(
-            method, parsed_url, name=(group_name or test_name), **parsed_test_request
+        return (
+            test_dict,
+            group_name or test_name,
+            method,
+            parsed_url,
+            parsed_test_request,
         )
+
+    def _handle_response(self, test_dict, resp, method, parsed_url, parsed_test_request):
+        """handle response of teststep: call teardown hooks, extract and validate.
+
+        Args:
+            test_dict (dict): prepared teststep info
+            resp (requests.Response): response of teststep request
+            method (str): request method
+            parsed_url (str): request url
+            parsed_test_request (dict): request kwargs
+
+        """
         resp_obj = response.ResponseObject(resp)
 
         def log_req_resp_details():
@@ -264,8 +304,15 @@ class Runner(object):
         if teardown_hooks:
             self.session_context.update_test_variables("response", resp_obj)
             self.do_hook_actions(teardown_hooks, HookTypeEnum.TEARDOWN)
+            # response may be changed in place by teardown hooks
+            resp_obj.clear_field_cache()
             self.http_client_session.update_last_req_resp_record(resp_obj)
 
+        # walk response once for fields referenced by extract and validate
+        extraction_plan = test_dict.get("extraction_plan")
+        if extraction_plan:
+            resp_obj.prefetch_fields(extraction_plan)
+
         # extract
         extractors = test_dict.get("extract", {})
         try:
@@ -282,7 +329,9 @@ class Runner(object):
         validators = test_dict.get("validate") or test_dict.get("validators") or []
         validate_script = test_dict.get("script", [])
         if validate_script:
-            validators.append({"type": "python_script", "script": validate_script})
+            validators = validators + [
+                {"type": "python_script", "script": validate_script}
+            ]
 
         validator = Validator(self.session_context, resp_obj)
         try:
@@ -306,9 +355,11 @@ class Runner(object):
         for index, test_dict in enumerate(tests):
 
             # override current teststep variables with former testcase output variables
+            # copy test_dict to avoid influence on teststeps shared by testcases
             former_output_variables = self.session_context.test_variables_mapping
             if former_output_variables:
-                test_dict.setdefault("variables", {})
+                test_dict = dict(test_dict)
+                test_dict["variables"] = dict(test_dict.get("variables", {}))
                 test_dict["variables"].update(former_output_variables)
 
             try:
@@ -360,27 +411,37 @@ class Runner(object):
 
         """
         self.meta_datas = None
-        if "teststeps" in test_dict:
-            # nested testcase
-            test_dict.setdefault("config", {}).setdefault("variables", {})
-            test_dict["config"]["variables"].update(
-                self.session_context.session_variables_mapping
-            )
-            self._run_testcase(test_dict)
-        else:
-            # api
-            self.validation_results = {}
-            try:
-                self._run_test(test_dict)
-            except Exception:
-                # log exception request_type and name for locust stat
-                self.exception_request_type = test_dict["request"]["method"]
-                self.exception_name = test_dict.get("name")
-                raise
-            finally:
-                # get request/response data and validate results
-                self.meta_datas = getattr(self.http_client_session, "meta_data", {})
-                self.meta_datas["validators"] = self.validation_results
+        # memoized functions in testcase scope share results in current testcase
+        token = cache.current_testcase_scope.set(self.cache_scope)
+        try:
+            if "teststeps" in test_dict:
+                # nested testcase
+                # copy config to avoid influence on teststeps shared by testcases
+                config = dict(test_dict.get("config", {}))
+                config["variables"] = dict(config.get("variables", {}))
+                config["variables"].update(
+                    self.session_context.session_variables_mapping
+                )
+                test_dict = dict(test_dict, config=config)
+                self._run_testcase(test_dict)
+            else:
+                # api
+                self.validation_results = {}
+                try:
+                    self._run_test(test_dict)
+                except Exception:
+                    # log exception request_type and name for locust stat
+                    self.exception_request_type = test_dict["request"]["method"]
+                    self.exception_name = test_dict.get("name")
+                    raise
+                finally:
+                    # get request/response data and validate results
+                    self.meta_datas = getattr(
+                        self.http_client_session, "meta_data", {}
+                    )
+                    self.meta_datas["validators"] = self.validation_results
+        finally:
+            cache.current_testcase_scope.reset(token)
 
     def export_variables(self, output_variables_list):
         """export current testcase variables"""
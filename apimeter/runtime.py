@@ -0,0 +1,117 @@
+"""
+run context
+
+States of one run, e.g. project working directory, loaded api/testcase definitions,
+parse failures and function caches, are kept in RunContext instead of module globals.
+RunContext is activated with context variable by HttpRunner, thus multiple HttpRunner
+instances can run concurrently in threads of one process without sharing these states,
+and all states are released when the run ends.
+
+Notice: project data is still loaded into process-wide states, i.e. PWD in sys.path,
+.env in os.environ and debugtalk module in sys.modules. Projects are loaded one by one
+with loader lock, and functions loaded by each run keep their own debugtalk module,
+while debugtalk.py importing sibling modules and .env of different projects are not
+isolated.
+
+Loader and parser called directly out of HttpRunner share the default run context.
+"""
+
+import contextlib
+import contextvars
+
+from apimeter import cache
+
+# record request and response details of all teststeps, failed teststeps only,
+# or none of teststeps with stat kept only
+RECORD_POLICIES = ("full", "failures", "stats")
+
+
+class RunContext(object):
+    """states of one run.
+
+    Examples:
+        >>> run_context = RunContext(project_working_directory)
+        >>> with run_context.activate():
+        ...     tests_mapping = loader.load_cases(path)
+        ...     parser.parse_tests(tests_mapping)
+
+    """
+
+    def __init__(self, project_working_directory=None, record_policy="full"):
+        """
+        Args:
+            project_working_directory (str): folder contains debugtalk.py,
+                it will be located when loading tests if not specified.
+            record_policy (str): how request and response details are recorded,
+                full/failures/stats, see RECORD_POLICIES.
+
+        """
+        self.project_working_directory = project_working_directory
+        self.record_policy = record_policy
+        # report.RecordStore which teststep records are spilled to, None if not set
+        self.record_store = None
+        # api/testcase definitions referenced by teststeps, cached while loading
+        self.tests_def_mapping = {"api": {}, "testcases": {}}
+        # testcase files failed to parse, grouped by testcase type
+        self.parse_failed_testfiles = {}
+        # results of functions in config variables
+        self.function_cache = cache.FunctionCache()
+        # caches of functions marked by apimeter.memoize with run scope
+        self.memoize_scope = cache.CacheScope()
+
+    @contextlib.contextmanager
+    def activate(self):
+        """activate run context in current thread or coroutine."""
+        token = current_run_context.set(self)
+        try:
+            yield self
+        finally:
+            current_run_context.reset(token)
+
+
+current_run_context = contextvars.ContextVar("run_context", default=None)
+
+# run context used out of HttpRunner, e.g. calling loader.load_cases directly
+default_run_context = RunContext()
+
+
+def get_run_context():
+    """get activated run context, or the default one if not activated."""
+    run_context = current_run_context.get()
+    if run_context is None:
+        return default_run_context
+
+    return run_context
+
+
+def get_memoize_scope(scope):
+    """get cache scope of current run or testcase, None if not in testcase."""
+    if scope == "testcase":
+        return cache.current_testcase_scope.get()
+
+    return get_run_context().memoize_scope
+
+
+def call_function(func, *args, **kwargs):
+    """call function in functions mapping, function marked by memoize is called with
+    scoped cache. Functions are kept as they are in functions mapping, thus parsed
+    testcases can still be pickled, e.g. to run in worker processes.
+    """
+    memoize_options = getattr(func, "__memoize__", None)
+    if not memoize_options:
+        return func(*args, **kwargs)
+
+    cache_scope = get_memoize_scope(memoize_options["scope"])
+    if cache_scope is None:
+        return func(*args, **kwargs)
+
+    function_cache = cache_scope.get_cache(
+        func, memoize_options["maxsize"], memoize_options["ttl"]
+    )
+    key = cache.make_cache_key(func.__name__, args, kwargs)
+    value = function_cache.get(key, cache.NOT_CACHED)
+    if value is cache.NOT_CACHED:
+        value = func(*args, **kwargs)
+        function_cache.set(key, value)
+
+    return value
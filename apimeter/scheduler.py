@@ -0,0 +1,271 @@
+"""
+dependency-aware teststeps scheduler
+
+Teststeps in one testcase are run concurrently on a thread pool, while teststeps
+depending on each other are kept in the declared order.
+
+A teststep depends on a former teststep if:
+    - it references variable extracted by the former teststep;
+    - it extracts variable which is referenced or extracted by the former teststep;
+    - either of them is a barrier step, e.g. nested testcase, teststep with hooks
+      or python script validator, which may touch any variable in session.
+
+Notice: dependencies via server side state (e.g. create user and then get user
+without referencing any extracted variable) can not be detected, so scheduler is
+opt-in and should be enabled only when teststeps are independent in this way.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor, wait
+from unittest.case import SkipTest
+
+from apimeter import logger, parser, utils
+from apimeter.client import HttpSession
+from apimeter.runner import Runner
+
+
+def get_step_variables(test_dict):
+    """get variables referenced and extracted by teststep.
+
+    Args:
+        test_dict (dict): parsed teststep.
+
+    Returns:
+        tuple: (referenced variables set, extracted variables set)
+
+    """
+    extract_mapping = utils.ensure_mapping_format(test_dict.get("extract") or {})
+    extracted_variables = set(extract_mapping.keys())
+
+    referenced_variables = set()
+    for key, value in test_dict.items():
+        if key == "extract":
+            continue
+        referenced_variables |= parser.extract_variables(value)
+
+    # for nested property access like "resp.token", only depends on base variable "resp"
+    referenced_variables = {
+        var_name.split(".")[0] for var_name in referenced_variables
+    }
+    return referenced_variables, extracted_variables
+
+
+def is_barrier_step(test_dict):
+    """check if teststep should be run exclusively."""
+    return bool(
+        "teststeps" in test_dict
+        or test_dict.get("setup_hooks")
+        or test_dict.get("teardown_hooks")
+        or test_dict.get("script")
+    )
+
+
+class ScheduledStep(object):
+    """teststep scheduled by StepScheduler, it has the same interface with Runner
+    for running teststep and getting meta datas.
+    """
+
+    def __init__(self, scheduler, index, test_dict, dependencies):
+        self.scheduler = scheduler
+        self.index = index
+        self.test_dict = test_dict
+        self.dependencies = dependencies
+        self.barrier = is_barrier_step(test_dict)
+        _, self.extracted_variables = get_step_variables(test_dict)
+        self.meta_datas = None
+
+    def run_test(self, test_dict):
+        """wait for scheduled teststep to finish, exception in teststep will be raised again."""
+        future = self.scheduler.get_future(self.index)
+        try:
+            future.result()
+        except CancelledError:
+            raise SkipTest("teststep is cancelled as former teststep failed.")
+
+
+class StepScheduler(object):
+    """run teststeps of one testcase concurrently with dependency DAG.
+
+    Examples:
+        >>> step_scheduler = StepScheduler(test_runner, max_workers=4)
+        >>> steps = [step_scheduler.add_step(test_dict) for test_dict in teststeps]
+        >>> steps[0].run_test(teststeps[0])
+
+    """
+
+    def __init__(self, test_runner, max_workers, failfast=False):
+        """
+        Args:
+            test_runner (Runner): runner initialized with testcase config,
+                extracted variables of all teststeps will be updated to its session.
+            max_workers (int): max threads number to run teststeps concurrently.
+            failfast (bool): cancel teststeps not started yet once any teststep fails.
+
+        """
+        self.test_runner = test_runner
+        self.max_workers = max_workers
+        self.failfast = failfast
+        self.steps = []
+        self._futures = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+        # dependency tracking state
+        self._last_barrier = None
+        self._steps_since_barrier = []
+        self._last_writers = {}
+        self._readers = {}
+        self._last_step_of_test_dict = {}
+
+    def add_step(self, test_dict):
+        """add teststep in declared order, and resolve its dependencies on former teststeps.
+
+        Args:
+            test_dict (dict): parsed teststep.
+
+        Returns:
+            ScheduledStep: scheduled teststep.
+
+        """
+        index = len(self.steps)
+        referenced_variables, extracted_variables = get_step_variables(test_dict)
+        dependencies = set()
+
+        # repeated teststep (times > 1) runs in order
+        if id(test_dict) in self._last_step_of_test_dict:
+            dependencies.add(self._last_step_of_test_dict[id(test_dict)])
+        self._last_step_of_test_dict[id(test_dict)] = index
+
+        if is_barrier_step(test_dict):
+            dependencies.update(self._steps_since_barrier)
+            if self._last_barrier is not None:
+                dependencies.add(self._last_barrier)
+
+            # all latter teststeps depend on barrier
+            self._last_barrier = index
+            self._steps_since_barrier = []
+            self._last_writers = {}
+            self._readers = {}
+        else:
+            if self._last_barrier is not None:
+                dependencies.add(self._last_barrier)
+
+            for var_name in referenced_variables:
+                if var_name in self._last_writers:
+                    dependencies.add(self._last_writers[var_name])
+
+            for var_name in extracted_variables:
+                if var_name in self._last_writers:
+                    dependencies.add(self._last_writers[var_name])
+                dependencies.update(self._readers.get(var_name, []))
+
+            for var_name in referenced_variables:
+                self._readers.setdefault(var_name, []).append(index)
+
+            for var_name in extracted_variables:
+                self._last_writers[var_name] = index
+                self._readers[var_name] = []
+
+            self._steps_since_barrier.append(index)
+
+        dependencies.discard(index)
+        step = ScheduledStep(self, index, test_dict, sorted(dependencies))
+        self.steps.append(step)
+        return step
+
+    def get_future(self, index):
+        """get future of teststep, all teststeps will be started on first call."""
+        with self._lock:
+            if not self._futures:
+                self._start()
+
+        return self._futures[index]
+
+    def _start(self):
+        logger.log_info(
+            "run {} teststeps concurrently with {} workers.".format(
+                len(self.steps), self.max_workers
+            )
+        )
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # teststeps are submitted in declared order and only wait for former ones,
+        # thus waiting teststeps will never block the teststeps they depend on.
+        # context is copied for each teststep, e.g. run context of current run.
+        for step in self.steps:
+            context = contextvars.copy_context()
+            self._futures.append(executor.submit(context.run, self._run_step, step))
+
+        # pending teststeps are still run after shutdown, unless they are cancelled
+        executor.shutdown(wait=False)
+
+    def cancel(self):
+        """cancel teststeps not started yet, teststeps waiting for their dependencies
+        will not be run either. Running teststeps are not interrupted.
+        """
+        self._cancelled.set()
+        with self._lock:
+            futures = list(self._futures)
+
+        for future in futures:
+            future.cancel()
+
+    def _fork_runner(self, session_variables):
+        """create runner for one teststep, which shares cookies and connection pool
+        with testcase runner.
+        """
+        main_session = self.test_runner.http_client_session
+        http_client_session = HttpSession()
+        http_client_session.cookies = main_session.cookies
+        for prefix, adapter in main_session.adapters.items():
+            http_client_session.mount(prefix, adapter)
+
+        step_runner = Runner({"verify": self.test_runner.verify}, http_client_session)
+        # memoized functions share results in testcase scope
+        step_runner.cache_scope = self.test_runner.cache_scope
+        step_runner.session_context.update_session_variables(session_variables)
+        return step_runner
+
+    def _run_step(self, step):
+        wait([self._futures[index] for index in step.dependencies])
+        if self._cancelled.is_set():
+            raise CancelledError()
+
+        try:
+            self._run_step_test(step)
+        except SkipTest:
+            raise
+        except Exception:
+            if self.failfast:
+                self.cancel()
+            raise
+
+    def _run_step_test(self, step):
+        if step.barrier:
+            # no other teststep is running now
+            try:
+                self.test_runner.run_test(step.test_dict)
+            finally:
+                step.meta_datas = self.test_runner.meta_datas
+            return
+
+        with self._lock:
+            session_variables = dict(
+                self.test_runner.session_context.session_variables_mapping
+            )
+
+        step_runner = self._fork_runner(session_variables)
+        try:
+            step_runner.run_test(step.test_dict)
+        finally:
+            step.meta_datas = step_runner.meta_datas
+            step_session_variables = step_runner.session_context.session_variables_mapping
+            extracted_variables_mapping = {
+                var_name: step_session_variables[var_name]
+                for var_name in step.extracted_variables
+                if var_name in step_session_variables
+            }
+            with self._lock:
+                self.test_runner.session_context.update_session_variables(
+                    extracted_variables_mapping
+                )
@@ -0,0 +1,401 @@
+"""
+runner daemon
+
+`apimeter serve` starts a long-running process which accepts run requests over local
+HTTP or unix socket, thus python startup, imports, loading debugtalk.py and .env are
+paid once instead of in each run.
+
+    $ apimeter serve --port 8088
+    $ curl -X POST http://127.0.0.1:8088/run -d '{"path": "testcases/demo.yml"}'
+
+Run request is a JSON object:
+
+    {
+        "path": "testcases/demo.yml",   # required, testcase/testsuite file/folder path
+        "dot_env_path": ".env",         # optional, specified .env file path
+        "mapping": {"uid": 1000},       # optional, override variables in config block
+        "failfast": false,              # optional
+        "step_workers": 1,              # optional
+        "shard": "1/4",                 # optional
+        "record": "failures",           # optional, full/failures/stats
+        "stream": false                 # optional
+    }
+
+Result summary is returned in JSON. If stream is true, summary of each testcase is
+returned in JSON line once the testcase is finished, and the last line is the summary.
+
+Project data, i.e. debugtalk.py functions and .env, is reloaded only if the files are
+changed, and loaded tests are kept in .apimeter_cache with --cache.
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from apimeter import __version__, client, exceptions, loader, logger
+from apimeter.api import HttpRunner
+from apimeter.loader import cache as loader_cache
+from apimeter.loader.locate import locate_debugtalk_py
+
+# options of run request passed to HttpRunner
+RUN_OPTIONS = ("failfast", "step_workers", "shard", "record")
+
+
+class ProjectDataCache(object):
+    """keep project data loaded by the latest run, and reuse it in later runs if
+    debugtalk.py and .env are unchanged.
+
+    Only one project is kept, because debugtalk.py is imported as the same module
+    of the process and PWD is inserted to sys.path, and loading another project will
+    reload it. Thus runs of the same project are run concurrently, while runs of
+    another project wait until all runs of the loaded project are released.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._key = None
+        self._project_mapping = None
+        self._active_runs = 0
+        self._lock = threading.Lock()
+        self._runs_released = threading.Condition(self._lock)
+
+    def load(self, test_path, dot_env_path=None):
+        """load project data of test path for one run, PWD is initialized in current
+        run context. release() should be called once the run is finished.
+
+        Returns:
+            dict: project mapping, which is copied for each run.
+
+        """
+        debugtalk_path = locate_debugtalk_py(os.path.abspath(test_path))
+        if debugtalk_path:
+            project_working_directory = os.path.dirname(debugtalk_path)
+        else:
+            project_working_directory = os.getcwd()
+
+        dot_env_path = dot_env_path or os.path.join(project_working_directory, ".env")
+        key = (
+            debugtalk_path,
+            loader_cache.get_file_hash(debugtalk_path),
+            os.path.abspath(dot_env_path),
+            loader_cache.get_file_hash(dot_env_path),
+        )
+
+        with self._lock:
+            # project data used by running runs should not be reloaded
+            while self._active_runs and key != self._key:
+                self._runs_released.wait()
+
+            if key == self._key:
+                self.hits += 1
+                loader.init_pwd(test_path)
+            else:
+                self.misses += 1
+                self._project_mapping = loader.load_project_data(
+                    test_path, dot_env_path
+                )
+                self._key = key
+
+            self._active_runs += 1
+            project_mapping = dict(self._project_mapping)
+
+        project_mapping["test_path"] = os.path.abspath(test_path)
+        return project_mapping
+
+    def release(self):
+        """release project data loaded for one run."""
+        with self._lock:
+            self._active_runs -= 1
+            if not self._active_runs:
+                self._runs_released.notify_all()
+
+    def get_stat(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+class ServerHttpRunner(HttpRunner):
+    """HttpRunner used by runner daemon, project data is loaded from cache, and
+    testcase summary is passed to callback once the testcase is finished.
+    """
+
+    def __init__(self, project_data_cache, testcase_callback=None, **kwargs):
+        super(ServerHttpRunner, self).__init__(**kwargs)
+        self.project_data_cache = project_data_cache
+        self.testcase_callback = testcase_callback
+        self._project_loaded = False
+
+    def run_path(self, path, dot_env_path=None, mapping=None):
+        self._project_loaded = False
+        try:
+            return super(ServerHttpRunner, self).run_path(path, dot_env_path, mapping)
+        finally:
+            if self._project_loaded:
+                self.project_data_cache.release()
+
+    def _load_cases(self, path, dot_env_path=None):
+        project_mapping = self.project_data_cache.load(path, dot_env_path)
+        self._project_loaded = True
+        return loader.load_cases(path, dot_env_path, self.use_cache, project_mapping)
+
+    def _run_suite(self, test_suite):
+        if not self.testcase_callback:
+            return super(ServerHttpRunner, self)._run_suite(test_suite)
+
+        tests_results = []
+        for testcase in test_suite:
+            testcase_results = super(ServerHttpRunner, self)._run_suite([testcase])
+            testcase, result = testcase_results[0]
+            self.testcase_callback(self._summarize_testcase(testcase, result))
+
+            # failed testcases are put in front as HttpRunner._run_suite
+            if result.wasSuccessful():
+                tests_results.append((testcase, result))
+            else:
+                tests_results.insert(0, (testcase, result))
+
+        return tests_results
+
+
+def dumps_json(data):
+    """dump data to JSON line, objects not serializable are converted to string."""
+    return json.dumps(data, ensure_ascii=False, default=str) + "\n"
+
+
+class RunRequestHandler(BaseHTTPRequestHandler):
+    """handle run request, POST /run to run tests, GET /status to get server status."""
+
+    server_version = "apimeter/{}".format(__version__)
+
+    def address_string(self):
+        if isinstance(self.client_address, str):
+            # unix socket
+            return self.client_address or "unix"
+
+        return super(RunRequestHandler, self).address_string()
+
+    def log_message(self, format, *args):
+        logger.log_debug("{} - {}".format(self.address_string(), format % args))
+
+    def _send_json(self, status_code, data):
+        body = dumps_json(data).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _load_run_request(self):
+        """load JSON run request from body.
+
+        Raises:
+            exceptions.ParamsError: request is not JSON object or path is missing.
+
+        """
+        content_length = int(self.headers.get("Content-Length") or 0)
+        try:
+            run_request = json.loads(self.rfile.read(content_length) or b"{}")
+        except ValueError as ex:
+            raise exceptions.ParamsError("invalid JSON run request: {}".format(ex))
+
+        if not isinstance(run_request, dict) or not run_request.get("path"):
+            raise exceptions.ParamsError("path is required in run request.")
+
+        return run_request
+
+    def do_GET(self):
+        if self.path != "/status":
+            self._send_json(404, {"error": "not found: {}".format(self.path)})
+            return
+
+        self._send_json(200, self.server.get_status())
+
+    def do_POST(self):
+        if self.path != "/run":
+            self._send_json(404, {"error": "not found: {}".format(self.path)})
+            return
+
+        try:
+            run_request = self._load_run_request()
+            runner_kwargs = {
+                key: run_request[key] for key in RUN_OPTIONS if key in run_request
+            }
+            testcase_callback = self._stream_line if run_request.get("stream") else None
+            runner = self.server.make_runner(testcase_callback, **runner_kwargs)
+        except (exceptions.MyBaseError, TypeError) as ex:
+            self._send_json(400, {"error": str(ex)})
+            return
+
+        if testcase_callback:
+            # response is finished by closing connection, as content length is unknown
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.end_headers()
+
+        try:
+            summary = runner.run_path(
+                run_request["path"],
+                run_request.get("dot_env_path"),
+                run_request.get("mapping"),
+            )
+        except Exception as ex:
+            logger.log_error("failed to run {}: {}".format(run_request["path"], ex))
+            result = {"error": str(ex), "exception_stage": runner.exception_stage}
+            status_code = 500
+        else:
+            result = summary
+            status_code = 200
+        finally:
+            self.server.count_run()
+
+        if testcase_callback:
+            self._stream_line(result)
+        else:
+            self._send_json(status_code, result)
+
+    def _stream_line(self, data):
+        self.wfile.write(dumps_json(data).encode("utf-8"))
+        self.wfile.flush()
+
+
+class RunServerMixin(object):
+    """runner daemon states, shared by HTTP server and unix socket server."""
+
+    daemon_threads = True
+
+    def init_run_server(self, use_cache=False, runner_kwargs=None):
+        """
+        Args:
+            use_cache (bool): cache loaded tests in .apimeter_cache.
+            runner_kwargs (dict): default HttpRunner arguments of each run,
+                e.g. log_level, skip_success.
+
+        """
+        self.use_cache = use_cache
+        self.runner_kwargs = runner_kwargs or {}
+        self.project_data_cache = ProjectDataCache()
+        self.runs = 0
+        # runs are counted by handler threads concurrently
+        self._runs_lock = threading.Lock()
+
+    def count_run(self):
+        with self._runs_lock:
+            self.runs += 1
+
+    def make_runner(self, testcase_callback=None, **kwargs):
+        runner_kwargs = dict(self.runner_kwargs, use_cache=self.use_cache)
+        runner_kwargs.update(kwargs)
+        return ServerHttpRunner(
+            self.project_data_cache, testcase_callback, **runner_kwargs
+        )
+
+    def get_status(self):
+        return {
+            "version": __version__,
+            "runs": self.runs,
+            "project_data_cache": self.project_data_cache.get_stat(),
+            "connection_pool": client.get_connection_pool_stat(),
+        }
+
+
+class RunServer(RunServerMixin, socketserver.ThreadingMixIn, HTTPServer):
+    """runner daemon listening on local HTTP address."""
+
+    def __init__(self, address, use_cache=False, runner_kwargs=None):
+        HTTPServer.__init__(self, address, RunRequestHandler)
+        self.init_run_server(use_cache, runner_kwargs)
+
+
+class UnixRunServer(
+    RunServerMixin, socketserver.ThreadingMixIn, socketserver.UnixStreamServer
+):
+    """runner daemon listening on unix socket."""
+
+    def __init__(self, socket_path, use_cache=False, runner_kwargs=None):
+        if os.path.exists(socket_path):
+            # remove socket file left by former server
+            os.remove(socket_path)
+
+        socketserver.UnixStreamServer.__init__(self, socket_path, RunRequestHandler)
+        self.init_run_server(use_cache, runner_kwargs)
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def main_serve(args=None):
+    """start runner daemon: parse command line options of `apimeter serve`."""
+    parser = argparse.ArgumentParser(
+        prog="apimeter serve",
+        description="Start runner daemon, project data is kept between runs.",
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="Specify listening host, default is local."
+    )
+    parser.add_argument(
+        "--port", type=int, default=8088, help="Specify listening port, default 8088."
+    )
+    parser.add_argument(
+        "--unix-socket", help="Listen on specified unix socket path instead of port."
+    )
+    parser.add_argument(
+        "--log-level", default="INFO", help="Specify logging level, default is INFO."
+    )
+    parser.add_argument("--log-file", help="Write logs to specified file path.")
+    # same as skip-success arguments of `apimeter run`, default is True
+    skip_success_group = parser.add_mutually_exclusive_group()
+    skip_success_group.add_argument(
+        "--skip-success",
+        dest="skip_success",
+        action="store_true",
+        help="Skip success testcases in summary (default behavior).",
+    )
+    skip_success_group.add_argument(
+        "--no-skip-success",
+        dest="skip_success",
+        action="store_false",
+        help="Don't skip success testcases in summary.",
+    )
+    parser.set_defaults(skip_success=True)
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        default=False,
+        help="Cache loaded tests in .apimeter_cache, reuse them if files unchanged.",
+    )
+    parser.add_argument(
+        "--record",
+        choices=["full", "failures", "stats"],
+        default="full",
+        help="Default record policy of runs, full/failures/stats, default is full.",
+    )
+    args = parser.parse_args(args)
+
+    runner_kwargs = {
+        "log_level": args.log_level,
+        "log_file": args.log_file,
+        "skip_success": args.skip_success,
+        "record": args.record,
+    }
+    if args.unix_socket:
+        server = UnixRunServer(args.unix_socket, args.cache, runner_kwargs)
+        address = args.unix_socket
+    else:
+        server = RunServer((args.host, args.port), args.cache, runner_kwargs)
+        address = "http://{}:{}".format(*server.server_address[:2])
+
+    logger.setup_logger(args.log_level, args.log_file)
+    logger.color_print("runner daemon is listening on {}".format(address), "GREEN")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return 0
@@ -18,21 +18,39 @@ import io
 import itertools
 import json
 import os.path
+import queue
 import re
+import threading
 import uuid
 from datetime import datetime
 
-import requests
-import sentry_sdk
-
 from apimeter import __version__, exceptions, logger
 from apimeter.compat import basestring, bytes, is_py2
 from apimeter.exceptions import ParamsError
 
 absolute_http_url_regexp = re.compile(r"^https?://", re.I)
 
+# telemetry events are sent in background, and dropped when queue is full
+TELEMETRY_QUEUE_SIZE = 100
+# timeout in seconds of sending each telemetry event
+TELEMETRY_TIMEOUT = 2
+
+
+def is_telemetry_enabled():
+    """telemetry, including GA events and sentry error reports, is opt-in,
+    enable it with environment variable APIMETER_TELEMETRY=true.
+    """
+    telemetry = os.getenv("APIMETER_TELEMETRY", "false")
+    return telemetry.lower() in ("true", "on", "yes", "1")
+
 
 def init_sentry_sdk():
+    if not is_telemetry_enabled():
+        return
+
+    # sentry_sdk is imported only when running tests, which costs much at startup
+    import sentry_sdk
+
     sentry_sdk.init(
         dsn="https://aa296f8dafe9c785593e318d44cc0ca9@o4510260785053696.ingest.us.sentry.io/4510260797177856",
         release="apimeter@{}".format(__version__),
@@ -42,7 +60,20 @@ def init_sentry_sdk():
         scope.set_user({"id": uuid.getnode()})
 
 
+def capture_exception(ex):
+    """report exception to sentry if telemetry is enabled."""
+    if not is_telemetry_enabled():
+        return
+
+    import sentry_sdk
+
+    sentry_sdk.capture_exception(ex)
+
+
 class GAClient(object):
+    """send GA events in background thread if telemetry is enabled, thus tracking
+    never blocks running, events are dropped if sending is slower than tracking.
+    """
 
     version = "1"  # GA API Version
     report_url = "https://www.google-analytics.com/collect"
@@ -51,7 +82,10 @@ class GAClient(object):
     )
 
     def __init__(self, tracking_id):
-        self.http_client = requests.Session()
+        self._http_client = None
+        self._queue = None
+        self._sender = None
+        self._lock = threading.Lock()
         self.label = str(__version__)
         self.common_params = {
             "v": self.version,
@@ -60,6 +94,18 @@ class GAClient(object):
             "ua": "HttpRunner/{}".format(__version__),
         }
 
+    @property
+    def http_client(self):
+        """requests session is created on first tracking, thus requests is not
+        imported when utils is imported.
+        """
+        if self._http_client is None:
+            import requests
+
+            self._http_client = requests.Session()
+
+        return self._http_client
+
     def track_event(self, category, action, value=0):
         data = {
             "t": "event",  # Event hit type = event
@@ -69,10 +115,7 @@ class GAClient(object):
             "ev": value,  # Optional. Event value, must be non-negative integer
         }
         data.update(self.common_params)
-        try:
-            self.http_client.post(self.report_url, data=data, timeout=5)
-        except Exception:  # ProxyError, SSLError, ConnectionError
-            pass
+        self._send(data)
 
     def track_user_timing(self, category, variable, duration):
         data = {
@@ -83,11 +126,39 @@ class GAClient(object):
             "utl": self.label,  # Optional. user timing label, used as version.
         }
         data.update(self.common_params)
+        self._send(data)
+
+    def _send(self, data):
+        """put data into queue of background sender, which is started on first use."""
+        if not is_telemetry_enabled():
+            return
+
+        with self._lock:
+            # sender thread is not inherited by forked worker process
+            if self._sender is None or not self._sender.is_alive():
+                self._queue = queue.Queue(maxsize=TELEMETRY_QUEUE_SIZE)
+                self._sender = threading.Thread(
+                    target=self._send_forever, name="apimeter-telemetry", daemon=True
+                )
+                self._sender.start()
+
         try:
-            self.http_client.post(self.report_url, data=data, timeout=5)
-        except Exception:  # ProxyError, SSLError, ConnectionError
+            self._queue.put_nowait(data)
+        except queue.Full:
             pass
 
+    def _send_forever(self):
+        while True:
+            data = self._queue.get()
+            try:
+                self.http_client.post(
+                    self.report_url, data=data, timeout=TELEMETRY_TIMEOUT
+                )
+            except Exception:  # ProxyError, SSLError, ConnectionError
+                pass
+            finally:
+                self._queue.task_done()
+
 
 ga_client = GAClient("UA-114587036-1")
 
@@ -578,6 +649,46 @@ def gen_cartesian_product(*args):
     return product_list
 
 
+def iter_cartesian_product(*args):
+    """generate cartesian product lazily, the same order with gen_cartesian_product.
+        the first arg is streamed, while others are loaded into list once they are
+        needed and reused for each item of former args.
+
+    Args:
+        args (list of iterable): dicts to be generated with cartesian product
+
+    Yields:
+        dict: cartesian product item
+
+    """
+    if not args:
+        return
+
+    loaded_args = [None] * len(args)
+
+    def _iter_arg(index):
+        if index == 0:
+            return args[0]
+
+        if loaded_args[index] is None:
+            loaded_args[index] = list(args[index])
+        return loaded_args[index]
+
+    def _product(index, product_item_dict):
+        if index == len(args):
+            yield product_item_dict
+            return
+
+        for item in _iter_arg(index):
+            new_product_item_dict = dict(product_item_dict)
+            new_product_item_dict.update(item)
+            for product in _product(index + 1, new_product_item_dict):
+                yield product
+
+    for product in _product(0, {}):
+        yield product
+
+
 def prettify_json_file(file_list):
     """prettify JSON testcase format"""
     for json_file in set(file_list):
@@ -626,9 +737,14 @@ def omit_long_data(body, omit_len=512):
 
 def dump_json_file(json_data, json_file_abs_path):
     """dump json data to file"""
+    from apimeter.report.store import StoredRecords
 
     class PythonObjectEncoder(json.JSONEncoder):
         def default(self, obj):
+            if isinstance(obj, StoredRecords):
+                # records in record store are loaded when they are dumped
+                return list(obj)
+
             try:
                 return super().default(self, obj)
             except TypeError:
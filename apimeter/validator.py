@@ -279,7 +279,6 @@ class Validator(object):
             check_item, expect_item = validator_args
             check_value = self.__eval_validator_check(check_item)
             expect_value = self.__eval_validator_expect(expect_item)
-            validator.update_args([check_value, expect_value])
 
             comparator = validator.func_name
             validator_dict = {
@@ -294,7 +293,10 @@ class Validator(object):
             )
 
             try:
-                validator.to_value(self.session_context.test_variables_mapping)
+                validator.call_with_args(
+                    [check_value, expect_value],
+                    self.session_context.test_variables_mapping,
+                )
                 validator_dict["check_result"] = "pass"
                 validate_msg += "\t==> pass"
                 logger.log_debug(validate_msg)
@@ -314,9 +316,6 @@ class Validator(object):
 
             self.validation_results["validate_extractor"].append(validator_dict)
 
-            # restore validator args, in case of running multiple times
-            validator.update_args(validator_args)
-
         if not validate_pass:
             failures_string = "\n".join([failure for failure in failures])
             raise exceptions.ValidationFailure(failures_string)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CLI 启动耗时基准脚本
+功能：统计 apimeter 命令的启动耗时，输出 python -X importtime 中耗时最多的模块，
+并检查启动耗时是否超出预算（超出时返回非 0 退出码，可用于 CI）
+
+    $ python scripts/bench_startup.py
+    $ python scripts/bench_startup.py --repeat 10 --budget-ms 100
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 基准命令：(名称, python 参数)
+COMMANDS = [
+    ("python", ["-c", "pass"]),
+    ("apimeter -V", ["-m", "apimeter", "-V"]),
+    ("apimeter -h", ["-m", "apimeter", "-h"]),
+    (
+        "apimeter --validate",
+        ["-m", "apimeter", "--validate", "tests/data/demo_testcase_hardcode.yml"],
+    ),
+]
+
+
+def run_command(args):
+    """执行命令并返回耗时（秒）"""
+    start_at = time.perf_counter()
+    subprocess.run(
+        [sys.executable] + args,
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=False,
+    )
+    return time.perf_counter() - start_at
+
+
+def bench_commands(repeat):
+    """统计每个命令的耗时
+
+    Returns:
+        dict: {name: (min_ms, median_ms)}
+
+    """
+    results = {}
+    for name, args in COMMANDS:
+        # 预热一次，排除 .pyc 编译耗时
+        run_command(args)
+        durations = [run_command(args) * 1000 for _ in range(repeat)]
+        results[name] = (min(durations), statistics.median(durations))
+
+    return results
+
+
+def get_import_times(module_name, top):
+    """解析 python -X importtime 输出，返回累计耗时最多的模块
+
+    Returns:
+        list: [(module_name, cumulative_ms)]
+
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import {}".format(module_name)],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    import_times = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, imported_name = line[len("import time:"):].split("|")
+        import_times.append((imported_name.strip(), int(cumulative) / 1000))
+
+    import_times.sort(key=lambda item: item[1], reverse=True)
+    return import_times[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark apimeter CLI startup time.")
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Repeat times of each command."
+    )
+    parser.add_argument(
+        "--top", type=int, default=15, help="Show top N modules of import time."
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=100,
+        help="Budget of `apimeter -V` startup time over bare python startup, in ms.",
+    )
+    args = parser.parse_args()
+
+    print("startup time (ms), min / median of {} runs:".format(args.repeat))
+    results = bench_commands(args.repeat)
+    for name, (min_ms, median_ms) in results.items():
+        print("  {:<24} {:>8.1f} / {:>8.1f}".format(name, min_ms, median_ms))
+
+    print("\nimport time of apimeter.cli (ms, cumulative):")
+    for imported_name, cumulative_ms in get_import_times("apimeter.cli", args.top):
+        print("  {:<40} {:>8.1f}".format(imported_name, cumulative_ms))
+
+    overhead_ms = results["apimeter -V"][1] - results["python"][1]
+    print("\napimeter -V overhead: {:.1f} ms, budget: {:.1f} ms".format(
+        overhead_ms, args.budget_ms
+    ))
+    if overhead_ms > args.budget_ms:
+        print("startup time exceeds budget!")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,7 @@ import random
 import string
 import time
 
+import apimeter
 from tests.api_server import HTTPBIN_SERVER, gen_md5, get_sign
 
 BASE_URL = "http://127.0.0.1:5000"
@@ -12,6 +13,11 @@ def get_httpbin_server():
     return HTTPBIN_SERVER
 
 
+@apimeter.memoize(scope="testcase")
+def get_memoized_sign(*args):
+    return get_sign(*args)
+
+
 def get_base_url():
     return BASE_URL
 
@@ -0,0 +1,190 @@
+import asyncio
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+from apimeter import loader, parser
+from tests.api_server import HTTPBIN_SERVER
+from tests.base import ApiServerUnittest
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+if httpx:
+    from apimeter.client import RequestTiming
+    from apimeter.ext.aio import AsyncHttpSession, AsyncRunner, close_transports
+
+
+@unittest.skipIf(httpx is None, "httpx is not installed")
+class TestAsyncRunner(ApiServerUnittest):
+    def setUp(self):
+        self.reset_all()
+
+    def reset_all(self):
+        url = "%s/api/reset-all" % self.host
+        headers = self.get_authenticated_headers()
+        return self.api_client.get(url, headers=headers)
+
+    def test_run_single_testcase(self):
+        testcase_file_path = os.path.join(
+            os.getcwd(), "tests/data/demo_testcase_hardcode.yml"
+        )
+        tests_mapping = loader.load_cases(testcase_file_path)
+        parsed_testcase = parser.parse_tests(tests_mapping)[0]
+
+        async def run():
+            test_runner = AsyncRunner(parsed_testcase["config"])
+            meta_datas = []
+            try:
+                for test_dict in parsed_testcase["teststeps"]:
+                    await test_runner.run_test(test_dict)
+                    meta_datas.append(test_runner.meta_datas)
+            finally:
+                await test_runner.http_client_session.aclose()
+            return meta_datas
+
+        meta_datas = asyncio.run(run())
+        self.assertEqual(len(meta_datas), 3)
+        self.assertEqual(meta_datas[0]["data"][0]["response"]["status_code"], 200)
+        self.assertEqual(meta_datas[1]["data"][0]["response"]["status_code"], 201)
+        self.assertEqual(
+            meta_datas[1]["data"][0]["request"]["url"],
+            "http://127.0.0.1:5000/api/users/1000",
+        )
+        self.assertTrue(meta_datas[1]["validators"]["validate_extractor"])
+
+    def test_extract_and_validate(self):
+        teststeps = [
+            {
+                "name": "get with params",
+                "request": {
+                    "url": "{}/get".format(HTTPBIN_SERVER),
+                    "method": "GET",
+                    "params": {"a": 1},
+                },
+                "extract": {"arg_a": "content.args.a"},
+                "validate": [{"eq": ["status_code", 200]}],
+            },
+            {
+                "name": "post with extracted variable",
+                "request": {
+                    "url": "{}/post".format(HTTPBIN_SERVER),
+                    "method": "POST",
+                    "json": {"arg_a": "$arg_a"},
+                },
+                "validate": [{"eq": ["content.json.arg_a", "1"]}],
+            },
+        ]
+        testcase = {
+            "config": {"name": "async testcase", "export": ["arg_a"]},
+            "teststeps": teststeps,
+        }
+        parsed_testcase = parser.parse_tests({"testcases": [testcase]})[0]
+
+        async def run():
+            test_runner = AsyncRunner(parsed_testcase["config"])
+            try:
+                await test_runner.run_test(parsed_testcase)
+            finally:
+                await test_runner.http_client_session.aclose()
+            return test_runner
+
+        test_runner = asyncio.run(run())
+        self.assertEqual(
+            test_runner.session_context.session_variables_mapping["arg_a"], "1"
+        )
+
+    def test_run_concurrently_with_sleep(self):
+        teststeps = [
+            {
+                "name": "sleep and delay",
+                "setup_hooks": ["${sleep(1)}"],
+                "request": {"url": "{}/delay/1".format(HTTPBIN_SERVER), "method": "GET"},
+                "validate": [{"eq": ["status_code", 200]}],
+            }
+        ]
+        testcases = [
+            {"config": {"name": "testcase {}".format(index)}, "teststeps": teststeps}
+            for index in range(5)
+        ]
+        parsed_testcases = parser.parse_tests({"testcases": testcases})
+
+        async def run():
+            transports = {}
+            runners = [
+                AsyncRunner(testcase["config"], AsyncHttpSession(transports))
+                for testcase in parsed_testcases
+            ]
+            try:
+                await asyncio.gather(
+                    *[
+                        test_runner.run_test(testcase)
+                        for test_runner, testcase in zip(runners, parsed_testcases)
+                    ]
+                )
+            finally:
+                for test_runner in runners:
+                    await test_runner.http_client_session.aclose()
+                await close_transports(transports)
+            return runners
+
+        start_time = time.time()
+        runners = asyncio.run(run())
+        self.assertLess(time.time() - start_time, 4)
+        for test_runner in runners:
+            self.assertEqual(
+                test_runner.meta_datas[0]["data"][0]["response"]["status_code"], 200
+            )
+
+    def test_request_timing_phases(self):
+        url = "{}/get".format(HTTPBIN_SERVER)
+
+        async def run():
+            session = AsyncHttpSession()
+            try:
+                await session.request("GET", url)
+                return session.meta_data["stat"]
+            finally:
+                await session.aclose()
+
+        stat = asyncio.run(run())
+        for phase in RequestTiming.PHASES:
+            self.assertGreaterEqual(stat[phase], 0)
+        self.assertGreater(stat["connect_ms"], 0)
+        self.assertGreater(stat["ttfb_ms"], 0)
+        self.assertEqual(stat["retries"], 0)
+        self.assertLessEqual(stat["ttfb_ms"], stat["response_time_ms"])
+
+    def test_shared_transports_kept_open(self):
+        url = "{}/get".format(HTTPBIN_SERVER)
+        closed_transports = []
+        transport_aclose = httpx.AsyncHTTPTransport.aclose
+
+        async def aclose(transport):
+            closed_transports.append(transport)
+            await transport_aclose(transport)
+
+        async def run():
+            transports = {}
+            session_a = AsyncHttpSession(transports)
+            session_b = AsyncHttpSession(transports)
+            await session_a.request("GET", url)
+            await session_b.request("GET", url)
+            # closing one session keeps shared transports for other sessions
+            await session_a.aclose()
+            self.assertEqual(closed_transports, [])
+            resp = await session_b.request("GET", url)
+            self.assertEqual(resp.status_code, 200)
+            await session_b.aclose()
+            self.assertEqual(closed_transports, [])
+
+            shared_transports = list(transports.values())
+            await close_transports(transports)
+            self.assertEqual(closed_transports, shared_transports)
+            self.assertEqual(transports, {})
+
+        with patch.object(httpx.AsyncHTTPTransport, "aclose", aclose):
+            asyncio.run(run())
@@ -1,3 +1,4 @@
+import copy
 import json
 import os
 import re
@@ -199,6 +200,40 @@ class TestHttpRunner(ApiServerUnittest):
         self.assertTrue(os.path.isfile(report_file))
         shutil.rmtree(report_save_dir)
 
+    def test_html_report_with_result_store(self):
+        summary = HttpRunner().run(self.testcase_cli_path)
+        records = summary["details"][0]["records"]
+
+        result_store = os.path.join(os.getcwd(), "reports", "demo", "records.sqlite3")
+        runner = HttpRunner(result_store=result_store)
+        self.reset_all()
+        stored_summary = runner.run(self.testcase_cli_path)
+        stored_records = stored_summary["details"][0]["records"]
+        self.assertIsInstance(stored_records, report.StoredRecords)
+        self.assertEqual(stored_summary["stat"], summary["stat"])
+        self.assertEqual(
+            stored_summary["time"]["requests"]["count"],
+            summary["time"]["requests"]["count"],
+        )
+        self.assertEqual(len(stored_records), len(records))
+        self.assertEqual(
+            [(record["name"], record["status"]) for record in stored_records],
+            [(record["name"], record["status"]) for record in records],
+        )
+        stored_record = next(iter(stored_records))
+        self.assertIn("meta_datas_expanded", stored_record)
+        self.assertIsInstance(
+            stored_record["meta_datas"]["data"][0]["request"]["headers"], str
+        )
+
+        report_file = os.path.join(os.getcwd(), "reports", "demo", "test.html")
+        report.gen_html_report(stored_summary, report_file=report_file)
+        with open(report_file, encoding="utf-8") as f:
+            self.assertIn(stored_record["name"], f.read())
+
+        runner.record_store.close()
+        shutil.rmtree(os.path.dirname(report_file))
+
     def test_log_file(self):
         log_file_path = os.path.join(os.getcwd(), "reports", "test_log_file.log")
         runner = HttpRunner(failfast=True, log_file=log_file_path)
@@ -761,3 +796,121 @@ class TestApi(ApiServerUnittest):
         results = tests_results[0][1]
         self.assertIn("setup and reset all (override)", results.records[0]["name"])
         self.assertEqual(results.records[1]["name"], "create user and check result.")
+
+    def test_run_testcases_in_workers(self):
+        testcases = []
+        for index in range(4):
+            testcases.append(
+                {
+                    "config": {
+                        "name": "get data {}".format(index),
+                        "variables": {"index": index},
+                    },
+                    "teststeps": [
+                        {
+                            "name": "get data {}".format(index),
+                            "request": {
+                                "url": "{}/get".format(HTTPBIN_SERVER),
+                                "method": "GET",
+                                "params": {"index": "$index"},
+                            },
+                            "validate": [
+                                {"eq": ["status_code", 200]},
+                                {"eq": ["content.args.index", str(index % 2)]},
+                            ],
+                        }
+                    ],
+                }
+            )
+        # tests_mapping will be altered in parsing
+        summary = HttpRunner(workers=2).run_tests(
+            {"testcases": copy.deepcopy(testcases)}
+        )
+        expected_summary = HttpRunner().run_tests({"testcases": testcases})
+
+        self.assertEqual(summary["stat"], expected_summary["stat"])
+        self.assertEqual(summary["stat"]["testcases"]["fail"], 2)
+        self.assertEqual(
+            [detail["name"] for detail in summary["details"]],
+            [detail["name"] for detail in expected_summary["details"]],
+        )
+        self.assertEqual(summary["details"][0]["name"], "get data 3")
+        self.assertEqual(
+            [detail["in_out"] for detail in summary["details"]],
+            [detail["in_out"] for detail in expected_summary["details"]],
+        )
+        self.assertEqual(len(summary["details"][0]["records"]), 1)
+
+    def test_run_testcases_in_workers_failfast(self):
+        testcases = []
+        for index in range(10):
+            testcases.append(
+                {
+                    "config": {"name": "testcase {}".format(index)},
+                    "teststeps": [
+                        {
+                            "name": "get delay",
+                            "request": {
+                                "url": "{}/{}".format(
+                                    HTTPBIN_SERVER, "get" if index == 0 else "delay/1"
+                                ),
+                                "method": "GET",
+                            },
+                            "validate": [
+                                {"eq": ["status_code", 500 if index == 0 else 200]}
+                            ],
+                        }
+                    ],
+                }
+            )
+
+        start_time = time.time()
+        summary = HttpRunner(workers=2, failfast=True).run_tests(
+            {"testcases": testcases}
+        )
+        # testcases are not run any more after the first failure
+        self.assertLess(time.time() - start_time, 5)
+        self.assertEqual(summary["stat"]["testcases"]["fail"], 1)
+        self.assertLess(summary["stat"]["testcases"]["total"], 10)
+        self.assertEqual(summary["details"][0]["name"], "testcase 0")
+
+    def test_run_testcases_in_workers_with_memoize(self):
+        project_mapping = loader.load_project_data(os.path.join(os.getcwd(), "tests"))
+        testcase = {
+            "config": {
+                "name": "get memoized sign",
+                "variables": {"sign": "${get_memoized_sign(a, b)}"},
+            },
+            "teststeps": [
+                {
+                    "name": "get sign",
+                    "request": {
+                        "url": "{}/get".format(HTTPBIN_SERVER),
+                        "method": "GET",
+                        "params": {"sign": "$sign"},
+                    },
+                    "validate": [{"eq": ["status_code", 200]}],
+                }
+            ],
+        }
+        tests_mapping = {
+            "project_mapping": project_mapping,
+            "testcases": [testcase, copy.deepcopy(testcase)],
+        }
+        # memoized function is kept in functions mapping, thus it can be pickled
+        self.assertEqual(
+            project_mapping["functions"]["get_memoized_sign"].__memoize__["scope"],
+            "testcase",
+        )
+        summary = HttpRunner(workers=2).run_tests(tests_mapping)
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["stat"]["testcases"]["total"], 2)
+
+    def test_run_testcases_workers_invalid(self):
+        with self.assertRaises(exceptions.ParamsError):
+            HttpRunner(workers=0)
+
+    def test_run_testcases_shard_invalid(self):
+        for shard in ["0/2", "3/2", "1-2"]:
+            with self.assertRaises(exceptions.ParamsError):
+                HttpRunner(shard=shard)
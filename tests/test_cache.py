@@ -0,0 +1,157 @@
+import functools
+import threading
+import time
+import types
+import unittest
+
+import apimeter
+from apimeter import cache, exceptions, parser, runtime
+from apimeter.loader import load
+
+
+class TestFunctionCache(unittest.TestCase):
+    def test_make_cache_key(self):
+        self.assertEqual(
+            cache.make_cache_key("func", [1, "a"], {"b": 2}),
+            ("func", ((int, 1), (str, "a")), (("b", int, 2),)),
+        )
+        # unhashable arguments
+        self.assertEqual(
+            cache.make_cache_key("func", [{"a": 1}], {}),
+            ("func", "[{'a': 1}]", "{}"),
+        )
+        # equal arguments of different types
+        cache_keys = {
+            cache.make_cache_key("func", [value], {}) for value in [1, True, 1.0]
+        }
+        self.assertEqual(len(cache_keys), 3)
+        cache_keys = {
+            cache.make_cache_key("func", [(value,)], {}) for value in [1, True, 1.0]
+        }
+        self.assertEqual(len(cache_keys), 3)
+        cache_keys = {
+            cache.make_cache_key("func", [], {"a": value}) for value in [1, True]
+        }
+        self.assertEqual(len(cache_keys), 2)
+
+    def test_lru_eviction(self):
+        function_cache = cache.FunctionCache(maxsize=2)
+        function_cache.set("a", 1)
+        function_cache.set("b", 2)
+        self.assertEqual(function_cache.get("a"), 1)
+        function_cache.set("c", 3)
+        self.assertIsNone(function_cache.get("b"))
+        self.assertEqual(function_cache.get("a"), 1)
+        self.assertEqual(function_cache.get("c"), 3)
+        self.assertEqual(
+            function_cache.get_stat(),
+            {"hits": 3, "misses": 1, "size": 2, "maxsize": 2},
+        )
+
+    def test_ttl(self):
+        function_cache = cache.FunctionCache(ttl=0.1)
+        function_cache.set("a", 1)
+        self.assertEqual(function_cache.get("a"), 1)
+        time.sleep(0.2)
+        self.assertEqual(function_cache.get("a", "expired"), "expired")
+        self.assertEqual(len(function_cache), 0)
+
+    def test_concurrent_access(self):
+        function_cache = cache.FunctionCache(maxsize=100)
+
+        def access(thread_index):
+            for index in range(1000):
+                function_cache.set((thread_index, index), index)
+                function_cache.get((thread_index, index - 1))
+
+        threads = [threading.Thread(target=access, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(function_cache), 100)
+        stat = function_cache.get_stat()
+        self.assertEqual(stat["hits"] + stat["misses"], 8 * 1000)
+
+    def test_run_scoped_cache(self):
+        calls = []
+
+        def gen_token():
+            calls.append(1)
+            return "token{}".format(len(calls))
+
+        lazy_string = parser.LazyString(
+            "${gen_token()}", {"gen_token": gen_token}, cached=True
+        )
+
+        with runtime.RunContext().activate() as run_context:
+            self.assertEqual(lazy_string.to_value(), "token1")
+            self.assertEqual(lazy_string.to_value(), "token1")
+            function_cache = run_context.function_cache
+            self.assertEqual(len(function_cache), 1)
+
+        # new run with another function cache
+        with runtime.RunContext().activate():
+            self.assertEqual(lazy_string.to_value(), "token2")
+
+        self.assertEqual(len(function_cache), 1)
+
+
+class TestMemoize(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def gen_signature(app_key, timestamp=0):
+            self.calls.append((app_key, timestamp))
+            return "{}-{}".format(app_key, timestamp)
+
+        self.gen_signature = gen_signature
+
+    def load_memoized_function(self, **memoize_options):
+        module = types.ModuleType("debugtalk_memoize")
+        module.gen_signature = apimeter.memoize(**memoize_options)(self.gen_signature)
+        gen_signature = load.load_module_functions(module)["gen_signature"]
+        # function is loaded as it is, and memoized when it is called
+        self.assertIs(gen_signature, module.gen_signature)
+        return functools.partial(runtime.call_function, gen_signature)
+
+    def test_memoize_invalid_scope(self):
+        with self.assertRaises(exceptions.ParamsError):
+            apimeter.memoize(scope="session")
+
+    def test_not_memoized(self):
+        module = types.ModuleType("debugtalk_memoize")
+        module.gen_signature = self.gen_signature
+        functions = load.load_module_functions(module)
+        self.assertIs(functions["gen_signature"], self.gen_signature)
+
+    def test_memoize_run_scope(self):
+        gen_signature = self.load_memoized_function(scope="run", maxsize=2)
+
+        with runtime.RunContext().activate():
+            self.assertEqual(gen_signature("key", timestamp=1), "key-1")
+            self.assertEqual(gen_signature("key", timestamp=1), "key-1")
+            gen_signature("key", timestamp=2)
+            self.assertEqual(self.calls, [("key", 1), ("key", 2)])
+
+        # new run
+        with runtime.RunContext().activate():
+            gen_signature("key", timestamp=1)
+            self.assertEqual(len(self.calls), 3)
+
+    def test_memoize_testcase_scope(self):
+        gen_signature = self.load_memoized_function(scope="testcase")
+
+        # not in testcase
+        gen_signature("key")
+        gen_signature("key")
+        self.assertEqual(len(self.calls), 2)
+
+        token = cache.current_testcase_scope.set(cache.CacheScope())
+        try:
+            gen_signature("key")
+            gen_signature("key")
+            self.assertEqual(len(self.calls), 3)
+        finally:
+            cache.current_testcase_scope.reset(token)
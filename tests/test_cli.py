@@ -1,3 +1,4 @@
+import subprocess
 import sys
 import unittest
 
@@ -25,6 +26,15 @@ class TestCli(unittest.TestCase):
 
         self.assertIn(__version__, self.captured_output.getvalue().strip())
 
+    def test_lazy_imports(self):
+        # heavy modules should not be imported until commands need them
+        heavy_modules = ["sentry_sdk", "requests", "jinja2", "jsonschema"]
+        code = "import sys, apimeter.cli; print([m for m in {} if m in sys.modules])"
+        output = subprocess.check_output(
+            [sys.executable, "-c", code.format(heavy_modules)]
+        )
+        self.assertEqual(output.strip(), b"[]")
+
     def test_show_help(self):
         sys.argv = ["hrun", "-h"]
 
@@ -1,3 +1,11 @@
+import os
+import socket
+from unittest.mock import patch
+
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util import connection as urllib3_connection
+
+from apimeter import client
 from apimeter.client import HttpSession
 from tests.api_server import HTTPBIN_SERVER
 from tests.base import ApiServerUnittest
@@ -53,6 +61,185 @@ class TestHttpClient(ApiServerUnittest):
         self.assertEqual(resp.request._cookies["a"], "1")
         self.assertEqual(resp.request._cookies["b"], "2")
 
+    def test_shared_connection_pool(self):
+        session = HttpSession()
+        self.assertIs(session.get_adapter(self.host), client.get_shared_adapter())
+        self.assertIs(
+            session.get_adapter(self.host), self.api_client.get_adapter(self.host)
+        )
+
+        stat = client.get_connection_pool_stat()
+        session.get("{}/cookies/set?sid=1".format(HTTPBIN_SERVER))
+        self.assertEqual(session.cookies.get("sid"), "1")
+        # cookies are not shared by sessions with shared connection pool
+        resp = self.api_client.get("{}/cookies".format(HTTPBIN_SERVER))
+        self.assertEqual(resp.json()["cookies"], {})
+
+        # closing session keeps shared connection pool for other sessions
+        session.close()
+        resp = self.api_client.get("{}/cookies".format(HTTPBIN_SERVER))
+        self.assertEqual(resp.status_code, 200)
+        self.assertGreater(
+            client.get_connection_pool_stat()["requests"], stat["requests"]
+        )
+
+    def test_ssl_context_cached_without_pool_key_hook(self):
+        adapter = client.SharedHTTPAdapter()
+        url = "https://example.com/get"
+        with patch.object(client, "HAS_POOL_KEY_HOOK", False):
+            # requests < 2.32 gets connection with verify/cert kept in send
+            adapter._tls_settings.value = (True, None)
+            conn = adapter.get_connection(url)
+            self.assertIs(conn, adapter.get_connection(url))
+            self.assertIs(
+                conn.conn_kw["ssl_context"], adapter.get_ssl_context(True)
+            )
+
+            # SSLContext is not cached if CA bundle not found
+            adapter._tls_settings.value = ("/not/found/ca.pem", None)
+            conn = adapter.get_connection(url)
+            self.assertNotIn("ssl_context", conn.conn_kw)
+
+        self.assertEqual(adapter.get_stat()["ssl_contexts"], 2)
+
+    def test_request_timing_phases(self):
+        url = "{}/get".format(HTTPBIN_SERVER)
+        self.api_client.get(url)
+        stat = self.api_client.meta_data["stat"]
+        for phase in client.RequestTiming.PHASES:
+            self.assertGreaterEqual(stat[phase], 0)
+        self.assertGreater(stat["ttfb_ms"], 0)
+        self.assertEqual(stat["retries"], 0)
+        self.assertLessEqual(stat["ttfb_ms"], stat["response_time_ms"])
+
+        # status code in retry strategy is retried
+        self.api_client.get("{}/status/503".format(HTTPBIN_SERVER))
+        self.assertEqual(self.api_client.meta_data["stat"]["retries"], 3)
+
+    def test_new_connection_tries_next_address(self):
+        port = int(HTTPBIN_SERVER.rsplit(":", 1)[1])
+        address = (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", port))
+        create_connection = urllib3_connection.create_connection
+        attempts = []
+
+        def timeout_once(address, *args, **kwargs):
+            attempts.append(address)
+            if len(attempts) == 1:
+                raise socket.timeout("timed out")
+            return create_connection(address, *args, **kwargs)
+
+        def timeout_always(address, *args, **kwargs):
+            attempts.append(address)
+            raise socket.timeout("timed out")
+
+        timing = client.RequestTiming()
+        token = client.current_request_timing.set(timing)
+        try:
+            with patch("socket.getaddrinfo", return_value=[address, address]):
+                with patch.object(
+                    urllib3_connection, "create_connection", timeout_once
+                ):
+                    conn = client.TimedHTTPConnection("localhost", port, timeout=5)
+                    conn.connect()
+                    conn.close()
+                self.assertEqual(len(attempts), 2)
+
+                attempts = []
+                with patch.object(
+                    urllib3_connection, "create_connection", timeout_always
+                ):
+                    conn = client.TimedHTTPConnection("localhost", port, timeout=5)
+                    with self.assertRaises(ConnectTimeoutError):
+                        conn.connect()
+                # no extra connect attempt after all addresses failed
+                self.assertEqual(len(attempts), 2)
+        finally:
+            client.current_request_timing.reset(token)
+
+    def test_record_policy(self):
+        url = "{}/api/users/1000".format(self.host)
+        self.api_client.get(url, headers=self.headers)
+        self.assertEqual(self.api_client.record_policy, "full")
+        self.assertNotIn("responses", self.api_client.meta_data)
+        meta_data = self.api_client.meta_data
+        self.assertEqual(meta_data["data"][0]["response"]["status_code"], 404)
+
+        api_client = HttpSession(record_policy="failures")
+        api_client.get(url, headers=self.headers)
+        meta_data = api_client.meta_data
+        self.assertEqual(len(meta_data["responses"]), 1)
+        self.assertEqual(meta_data["data"][0]["response"]["status_code"], "N/A")
+
+        success_meta_data = client.record_meta_datas(
+            dict(meta_data), "success", record_policy="failures"
+        )
+        self.assertEqual(success_meta_data["data"], [])
+        self.assertEqual(success_meta_data["stat"], meta_data["stat"])
+
+        failure_meta_data = client.record_meta_datas(
+            meta_data, "failure", record_policy="failures"
+        )
+        self.assertNotIn("responses", failure_meta_data)
+        self.assertEqual(failure_meta_data["data"][0]["response"]["status_code"], 404)
+        self.assertEqual(failure_meta_data["data"][0]["request"]["url"], url)
+
+        meta_datas = client.record_meta_datas(
+            [failure_meta_data], "failure", record_policy="stats"
+        )
+        self.assertEqual(meta_datas[0]["data"], [])
+        self.assertIn("response_time_ms", meta_datas[0]["stat"])
+
+    def test_environment_settings(self):
+        url = "http://example.com/api"
+        with patch.dict(
+            os.environ, {"HTTP_PROXY": "http://127.0.0.1:8888", "NO_PROXY": ""}
+        ):
+            session = HttpSession()
+            settings = session.merge_environment_settings(url, {}, None, None, None)
+            self.assertEqual(settings["proxies"]["http"], "http://127.0.0.1:8888")
+
+            # environment settings are resolved once for each host
+            os.environ["HTTP_PROXY"] = "http://127.0.0.1:9999"
+            settings = session.merge_environment_settings(url, {}, None, None, None)
+            self.assertEqual(settings["proxies"]["http"], "http://127.0.0.1:8888")
+
+            session = HttpSession(trust_env=False)
+            settings = session.merge_environment_settings(url, {}, None, None, None)
+            self.assertNotIn("http", settings["proxies"])
+
+            os.environ["APIMETER_TRUST_ENV"] = "false"
+            self.assertFalse(HttpSession().trust_env)
+
+    def test_prepare_request_cache(self):
+        request = client.Request(
+            "GET",
+            "{}/get".format(HTTPBIN_SERVER),
+            headers={"X-Token": "abc"},
+            params={"id": 1},
+        )
+        prepared_request = self.api_client.prepare_request(request)
+        self.assertEqual(prepared_request.url, "{}/get?id=1".format(HTTPBIN_SERVER))
+        self.assertEqual(prepared_request.headers["x-token"], "abc")
+
+        # cached headers are not changed by prepared request
+        prepared_request.headers["X-Token"] = "changed"
+        prepared_request = self.api_client.prepare_request(request)
+        self.assertEqual(prepared_request.headers["X-Token"], "abc")
+
+        request.params = {"ids": [1, 2]}
+        prepared_request = self.api_client.prepare_request(request)
+        self.assertEqual(
+            prepared_request.url, "{}/get?ids=1&ids=2".format(HTTPBIN_SERVER)
+        )
+
+        # equal params values of different types are encoded differently
+        for value, query in [(1, "1"), (True, "True"), (1.0, "1.0")]:
+            request.params = {"id": value}
+            prepared_request = self.api_client.prepare_request(request)
+            self.assertEqual(
+                prepared_request.url, "{}/get?id={}".format(HTTPBIN_SERVER, query)
+            )
+
     # def test_request_redirect(self):
     #     url = "{}/redirect-to?url=https%3A%2F%2Fgithub.com&status_code=302".format(HTTPBIN_SERVER)
     #     headers = {"accept: text/html"}
@@ -0,0 +1,159 @@
+from apimeter import exceptions, executor, loader, parser, report
+from apimeter.api import HttpRunner
+from tests.api_server import HTTPBIN_SERVER
+from tests.base import ApiServerUnittest
+
+
+class TestTestcaseExecutor(ApiServerUnittest):
+    def setUp(self):
+        self.testcase_cli_path = "tests/data/demo_testcase_cli.yml"
+        self.reset_all()
+
+    def reset_all(self):
+        url = "%s/api/reset-all" % self.host
+        headers = self.get_authenticated_headers()
+        return self.api_client.get(url, headers=headers)
+
+    def test_expand_teststeps(self):
+        teststeps = [{"name": "a"}, {"name": "b", "times": "3"}]
+        expanded_teststeps = executor.expand_teststeps(teststeps)
+        self.assertEqual(
+            [(index, times_index) for index, times_index, _ in expanded_teststeps],
+            [(0, 0), (1, 0), (1, 1), (1, 2)],
+        )
+
+        with self.assertRaises(exceptions.ParamsError):
+            executor.expand_teststeps([{"name": "a", "times": "1.5"}])
+
+    def test_run_testcase(self):
+        tests_mapping = loader.load_cases(self.testcase_cli_path)
+        testcases = parser.parse_tests(tests_mapping)
+        testcase_executor = executor.TestcaseExecutor(testcases[0])
+        result = testcase_executor.run()
+
+        summary = report.get_summary(result)
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["stat"]["total"], 10)
+        self.assertEqual(summary["stat"]["skipped"], 4)
+        self.assertEqual(summary["stat"]["successes"], 6)
+        self.assertEqual(summary["records"][0]["name"], "get token")
+        self.assertEqual(summary["records"][0]["status"], "success")
+        self.assertIn("stat", summary["records"][0]["meta_datas"])
+
+    def test_same_summary_with_unittest(self):
+        def make_tests_mapping():
+            teststeps = [
+                {
+                    "name": "get data",
+                    "times": 2,
+                    "request": {"url": "{}/get".format(HTTPBIN_SERVER), "method": "GET"},
+                },
+                {
+                    "name": "get data with failure",
+                    "request": {"url": "{}/get".format(HTTPBIN_SERVER), "method": "GET"},
+                    "validate": [{"eq": ["status_code", 201]}],
+                },
+                {
+                    "name": "skip get data",
+                    "skip": "skip unconditionally",
+                    "request": {"url": "{}/get".format(HTTPBIN_SERVER), "method": "GET"},
+                },
+            ]
+            return {
+                "testcases": [
+                    {"config": {"name": "testcase"}, "teststeps": teststeps}
+                ]
+            }
+
+        summary = HttpRunner().run_tests(make_tests_mapping())
+        expected_summary = HttpRunner(use_unittest=True).run_tests(
+            make_tests_mapping()
+        )
+
+        self.assertEqual(summary["stat"], expected_summary["stat"])
+        self.assertEqual(summary["stat"]["teststeps"]["total"], 4)
+        self.assertEqual(summary["time"]["requests"]["count"], 3)
+        self.assertEqual(
+            summary["time"]["requests"], summary["details"][0]["time"]["requests"]
+        )
+        self.assertIsNot(
+            summary["time"]["requests"], summary["details"][0]["time"]["requests"]
+        )
+        self.assertEqual(
+            [
+                (record["name"], record["status"])
+                for record in summary["details"][0]["records"]
+            ],
+            [
+                (record["name"], record["status"])
+                for record in expected_summary["details"][0]["records"]
+            ],
+        )
+
+    def test_record_policy(self):
+        def make_tests_mapping():
+            teststeps = [
+                {
+                    "name": "get data",
+                    "request": {"url": "{}/get".format(HTTPBIN_SERVER), "method": "GET"},
+                },
+                {
+                    "name": "get data with failure",
+                    "request": {"url": "{}/get".format(HTTPBIN_SERVER), "method": "GET"},
+                    "validate": [{"eq": ["status_code", 201]}],
+                },
+            ]
+            return {
+                "testcases": [{"config": {"name": "record"}, "teststeps": teststeps}]
+            }
+
+        for use_unittest in [False, True]:
+            test_runner = HttpRunner(record="failures", use_unittest=use_unittest)
+            summary = test_runner.run_tests(make_tests_mapping())
+            records = summary["details"][0]["records"]
+            self.assertEqual(records[0]["meta_datas"]["data"], [])
+            self.assertIn("response_time_ms", records[0]["meta_datas"]["stat"])
+            self.assertEqual(
+                records[1]["meta_datas"]["data"][0]["response"]["status_code"], 200
+            )
+            self.assertNotIn("responses", records[1]["meta_datas"])
+            self.assertEqual(summary["time"]["requests"]["count"], 2)
+
+        summary = HttpRunner(record="stats").run_tests(make_tests_mapping())
+        records = summary["details"][0]["records"]
+        self.assertEqual(
+            [record["meta_datas"]["data"] for record in records], [[], []]
+        )
+
+        summary = HttpRunner(record="stats").run(make_tests_mapping())
+        records = summary["details"][0]["records"]
+        self.assertEqual(records[1]["meta_datas"]["data"], [])
+
+        with self.assertRaises(exceptions.ParamsError):
+            HttpRunner(record="none")
+
+    def test_run_testcase_failure_and_failfast(self):
+        teststeps = [
+            {
+                "name": "get data",
+                "request": {"url": "{}/get".format(HTTPBIN_SERVER), "method": "GET"},
+                "validate": [{"eq": ["status_code", 201]}],
+            },
+            {
+                "name": "get data again",
+                "request": {"url": "{}/get".format(HTTPBIN_SERVER), "method": "GET"},
+            },
+        ]
+        testcase = {"config": {"name": "failure"}, "teststeps": teststeps}
+        parsed_testcase = parser.parse_tests({"testcases": [testcase]})[0]
+
+        result = executor.TestcaseExecutor(parsed_testcase).run()
+        self.assertFalse(result.wasSuccessful())
+        self.assertEqual(result.testsRun, 2)
+        self.assertEqual(result.records[0]["status"], "failure")
+        self.assertIn("ValidationFailure", result.records[0]["attachment"])
+        self.assertEqual(result.records[1]["status"], "success")
+
+        result = executor.TestcaseExecutor(parsed_testcase, failfast=True).run()
+        self.assertEqual(result.testsRun, 1)
+        self.assertEqual(len(result.failures), 1)
@@ -0,0 +1,83 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from apimeter import loader
+from apimeter.loader import cache
+
+
+class TestLoaderCache(unittest.TestCase):
+    def setUp(self):
+        self.project_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.project_dir, "api"))
+        os.makedirs(os.path.join(self.project_dir, "testcases"))
+        self.write_file("debugtalk.py", "")
+        self.write_file(
+            "api/get_headers.yml",
+            "name: get headers\nrequest:\n    url: /headers\n    method: GET\n",
+        )
+        self.write_file(
+            "testcases/get_headers.yml",
+            "config:\n    name: get headers\n"
+            "teststeps:\n-\n    name: get headers\n    api: api/get_headers.yml\n",
+        )
+        self.testcases_dir = os.path.join(self.project_dir, "testcases")
+
+    def tearDown(self):
+        shutil.rmtree(self.project_dir)
+        loader.load_project_data(os.path.join(os.getcwd(), "tests"))
+
+    def write_file(self, relative_path, content):
+        with open(os.path.join(self.project_dir, relative_path), "w") as f:
+            f.write(content)
+
+    def get_api_url(self, tests_mapping):
+        teststep = tests_mapping["testcases"][0]["teststeps"][0]
+        return teststep["api_def"]["request"]["url"]
+
+    def test_load_cases_with_cache(self):
+        tests_mapping = loader.load_cases(self.testcases_dir, use_cache=True)
+        self.assertEqual(self.get_api_url(tests_mapping), "/headers")
+        cache_path = cache.get_cache_path(
+            self.testcases_dir, tests_mapping["project_mapping"]
+        )
+        self.assertTrue(os.path.isfile(cache_path))
+
+        cached_tests = cache.load_cached_tests(
+            self.testcases_dir, tests_mapping["project_mapping"]
+        )
+        self.assertEqual(cached_tests["testcases"], tests_mapping["testcases"])
+
+        # referenced api file changed
+        self.write_file(
+            "api/get_headers.yml",
+            "name: get headers\nrequest:\n    url: /get\n    method: GET\n",
+        )
+        project_mapping = tests_mapping["project_mapping"]
+        self.assertIsNone(cache.load_cached_tests(self.testcases_dir, project_mapping))
+        tests_mapping = loader.load_cases(self.testcases_dir, use_cache=True)
+        self.assertEqual(self.get_api_url(tests_mapping), "/get")
+
+        # testcase file added
+        self.write_file(
+            "testcases/get_headers_2.yml",
+            "config:\n    name: get headers 2\n"
+            "teststeps:\n-\n    name: get headers\n    api: api/get_headers.yml\n",
+        )
+        project_mapping = tests_mapping["project_mapping"]
+        self.assertIsNone(cache.load_cached_tests(self.testcases_dir, project_mapping))
+        tests_mapping = loader.load_cases(self.testcases_dir, use_cache=True)
+        self.assertEqual(len(tests_mapping["testcases"]), 2)
+
+    def test_load_cases_cache_invalidated_by_debugtalk(self):
+        tests_mapping = loader.load_cases(self.testcases_dir, use_cache=True)
+        cache_path = cache.get_cache_path(
+            self.testcases_dir, tests_mapping["project_mapping"]
+        )
+
+        self.write_file("debugtalk.py", "def gen_token():\n    return 'abc'\n")
+        project_mapping = tests_mapping["project_mapping"]
+        self.assertNotEqual(
+            cache.get_cache_path(self.testcases_dir, project_mapping), cache_path
+        )
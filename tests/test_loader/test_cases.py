@@ -1,7 +1,7 @@
 import os
 import unittest
 
-from apimeter import exceptions, loader
+from apimeter import exceptions, loader, runtime
 from apimeter.loader import buildup
 
 
@@ -50,7 +50,7 @@ class TestSuiteLoader(unittest.TestCase):
         cls.project_mapping = buildup.load_project_data(
             os.path.join(os.getcwd(), "tests")
         )
-        cls.tests_def_mapping = buildup.tests_def_mapping
+        cls.tests_def_mapping = runtime.get_run_context().tests_def_mapping
 
     def test_load_teststep_api(self):
         raw_test = {
@@ -109,6 +109,17 @@ class TestFileLoader(unittest.TestCase):
             ],
         )
 
+    def test_iter_csv_file(self):
+        csv_file_path = os.path.join(os.getcwd(), "tests/data/account.csv")
+        csv_rows = load.iter_csv_file(csv_file_path)
+        self.assertEqual(
+            next(csv_rows), {"username": "test1", "password": "111111"}
+        )
+        self.assertEqual(len(list(csv_rows)), 2)
+
+        with self.assertRaises(exceptions.CSVNotFound):
+            next(load.iter_csv_file(os.path.join(os.getcwd(), "tests/data/no.csv")))
+
     def test_load_folder_files(self):
         folder = os.path.join(os.getcwd(), "tests")
         file1 = os.path.join(os.getcwd(), "tests", "test_utils.py")
@@ -1,8 +1,9 @@
 import os
+import pickle
 import time
 import unittest
 
-from apimeter import exceptions, loader, parser
+from apimeter import cache, exceptions, loader, parser
 from apimeter.loader import load
 from tests.debugtalk import gen_random_string, sum_two
 
@@ -333,6 +334,72 @@ class TestParserBasic(unittest.TestCase):
         self.assertEqual(var._string, "ABC{}{}--{}{}")
         self.assertEqual(var.to_value(variables_mapping), "ABCabc123abc--abc123abc")
 
+    def test_lazy_string_compiled_render(self):
+        variables_mapping = {"var_1": "abc", "var_3": 123, "var_4": {"a": 1}}
+        check_variables_set = set(variables_mapping.keys())
+
+        var = parser.LazyString("$var_4", {}, check_variables_set)
+        self.assertEqual(var._literals, ["", ""])
+        self.assertIs(var.to_value(variables_mapping), variables_mapping["var_4"])
+
+        var = parser.LazyString("{$var_1}$$-$var_3", {}, check_variables_set)
+        self.assertEqual(var._literals, ["{", "}$-", ""])
+        self.assertEqual(var.to_value(variables_mapping), "{abc}$-123")
+        with self.assertRaises(exceptions.VariableNotFound):
+            var.to_value({"var_1": "abc"})
+
+        # render closure is compiled again after unpickled
+        var = pickle.loads(pickle.dumps(var))
+        self.assertEqual(var.to_value(variables_mapping), "{abc}$-123")
+
+    def test_classify_function_arg(self):
+        resolver, payload = parser.classify_function_arg('["a", 1]')
+        self.assertEqual(resolver(payload, {}), ["a", 1])
+        # pre-evaluated container is copied for each call
+        self.assertIsNot(resolver(payload, {}), resolver(payload, {}))
+
+        resolver, payload = parser.classify_function_arg("[abc, 1]")
+        self.assertEqual(resolver(payload, {"abc": "x"}), ["x", 1])
+
+        resolver, payload = parser.classify_function_arg("\\content")
+        self.assertEqual(resolver(payload, {"content": "x"}), "content")
+
+        resolver, payload = parser.classify_function_arg("content.token")
+        self.assertEqual(resolver(payload, {"content": {"token": "x"}}), "x")
+
+        for arg in ["abc", "\\abc", 123]:
+            resolver, payload = parser.classify_function_arg(arg)
+            self.assertEqual(resolver(payload, {"abc": "x"}), arg)
+
+        lazy_arg = parser.LazyString("$var", {}, {"var"})
+        resolver, payload = parser.classify_function_arg(lazy_arg)
+        self.assertEqual(resolver(payload, {"var": "[1, 2]"}), [1, 2])
+
+    def test_lazy_function_call_with_args(self):
+        calls = []
+
+        def gen_id(prefix, index):
+            calls.append(index)
+            return "{}{}".format(prefix, index)
+
+        lazy_function = parser.LazyFunction(
+            {"func_name": "gen_id", "args": ["$prefix", 1]},
+            {"gen_id": gen_id},
+            {"prefix"},
+        )
+        args = lazy_function.get_args()
+        self.assertEqual(lazy_function.call_with_args(["user", 2]), "user2")
+        self.assertIs(lazy_function.get_args(), args)
+        self.assertEqual(lazy_function.to_value({"prefix": "id"}), "id1")
+
+        # results are cached by evaluated arguments
+        function_cache = cache.FunctionCache()
+        lazy_function.to_value({"prefix": "id"}, function_cache)
+        lazy_function.to_value({"prefix": "id"}, function_cache)
+        lazy_function.to_value({"prefix": "no"}, function_cache)
+        self.assertEqual(calls, [2, 1, 1, 1])
+        self.assertEqual(len(function_cache), 2)
+
     def test_parse_function(self):
         variables_mapping = {
             "var_1": "abc",
@@ -622,6 +689,57 @@ class TestParserBasic(unittest.TestCase):
         with self.assertRaises(exceptions.VariableNotFound):
             parser.parse_variables_mapping(prepared_variables)
 
+    def test_parse_variables_mapping_circular_reference(self):
+        variables = {
+            "varA": "$varB",
+            "varB": "123$varC",
+            "varC": "${sum_two($varA, 1)}",
+        }
+        prepared_variables = parser.prepare_lazy_data(
+            variables, {"sum_two": sum_two}, variables.keys()
+        )
+        with self.assertRaises(exceptions.VariableNotFound) as context:
+            parser.parse_variables_mapping(prepared_variables)
+        self.assertIn("varA -> varB -> varC -> varA", str(context.exception))
+
+    def test_sort_variables_mapping(self):
+        variables = {
+            "varA": "$varB",
+            "varB": "${sum_two($varC, 1)}",
+            "varC": 1,
+            "varD": "$resp.token",
+            "resp": {"token": "abc"},
+        }
+        prepared_variables = parser.prepare_lazy_data(
+            variables, {"sum_two": sum_two}, variables.keys()
+        )
+        self.assertEqual(
+            parser.sort_variables_mapping(prepared_variables),
+            ["varC", "varB", "varA", "resp", "varD"],
+        )
+        parsed_variables = parser.parse_variables_mapping(prepared_variables)
+        self.assertEqual(parsed_variables["varA"], 2)
+        self.assertEqual(parsed_variables["varD"], "abc")
+
+    def test_parse_variables_mapping_with_order(self):
+        variables = {"varA": "$varB", "varB": "${sum_two($token, 1)}"}
+        prepared_variables = parser.prepare_lazy_data(
+            variables, {"sum_two": sum_two}, ["varA", "varB", "token"]
+        )
+        variables_order = parser.sort_variables_mapping(
+            prepared_variables, strict=False
+        )
+        self.assertEqual(variables_order, ["varB", "varA"])
+        with self.assertRaises(exceptions.VariableNotFound):
+            parser.sort_variables_mapping(prepared_variables)
+
+        # token is session variable added at runtime
+        prepared_variables["token"] = 1
+        parsed_variables = parser.parse_variables_mapping(
+            prepared_variables, variables_order
+        )
+        self.assertEqual(parsed_variables, {"varA": 2, "varB": 2, "token": 1})
+
     def test_parse_variables_mapping_not_found(self):
         variables = {
             "varA": "123$varB",
@@ -701,6 +819,62 @@ class TestParserBasic(unittest.TestCase):
         functions = {"sum_two": sum_two}
         parser.prepare_lazy_data(variables, functions, variables.keys())
 
+    def test_prepare_lazy_data_static_subtree(self):
+        content = {
+            "json": {
+                "items": [{"id": 1, "tags": ("a", "b")}, {"id": 2, "tags": []}],
+                "price": "$$10",
+            },
+            "headers": {"token": "$token"},
+        }
+        prepared_content = parser.prepare_lazy_data(content, {}, {"token"})
+        self.assertNotIsInstance(prepared_content, parser.StaticDict)
+        self.assertNotIsInstance(prepared_content["headers"], parser.StaticDict)
+        self.assertIsInstance(prepared_content["json"], parser.StaticDict)
+        self.assertIsInstance(prepared_content["json"]["items"], parser.StaticList)
+
+        parsed_content = parser.parse_lazy_data(prepared_content, {"token": "abc"})
+        self.assertEqual(
+            parsed_content,
+            {
+                "json": {
+                    "items": [{"id": 1, "tags": ["a", "b"]}, {"id": 2, "tags": []}],
+                    "price": "$10",
+                },
+                "headers": {"token": "abc"},
+            },
+        )
+        # static subtree is reused, while the outermost container is copied
+        self.assertNotIsInstance(parsed_content["json"], parser.StaticDict)
+        self.assertIsNot(parsed_content["json"], prepared_content["json"])
+        self.assertIs(
+            parsed_content["json"]["items"], prepared_content["json"]["items"]
+        )
+
+    def test_parse_lazy_data_static_subtree_modified_by_hook(self):
+        from tests.debugtalk import modify_request_json
+
+        content = {
+            "url": "/api/$uid",
+            "json": {"a": {"b": 1}, "k": 1, "items": [{"id": 1}]},
+        }
+        prepared_content = parser.prepare_lazy_data(content, {}, {"uid"})
+        request = parser.parse_lazy_data(prepared_content, {"uid": 1000})
+        modify_request_json(request, "ios")
+        request["json"]["k"] = 2
+
+        request = parser.parse_lazy_data(prepared_content, {"uid": 1001})
+        # nested constant nodes are not copied again for each evaluation
+        self.assertIs(request["json"]["a"], prepared_content["json"]["a"])
+        self.assertIs(request["json"]["items"], prepared_content["json"]["items"])
+        self.assertEqual(
+            request,
+            {
+                "url": "/api/1001",
+                "json": {"a": {"b": 1}, "k": 1, "items": [{"id": 1}]},
+            },
+        )
+
     def test_prepare_lazy_data_not_found(self):
         variables = {
             "host": "https://httprunner.org",
@@ -905,6 +1079,51 @@ class TestParser(unittest.TestCase):
         )
         self.assertEqual(len(cartesian_product_parameters), 3 * 2 * 3)
 
+    def test_iter_parameters_generator_function(self):
+        def gen_uids():
+            for uid in range(1000):
+                yield {"uid": uid}
+
+        parameters = [
+            {"uid": "${gen_uids()}"},
+            {"user_agent": ["iOS/10.1", "iOS/10.2"]},
+        ]
+        parameters_rows = parser.iter_parameters(
+            parameters, functions_mapping={"gen_uids": gen_uids}
+        )
+        self.assertEqual(next(parameters_rows), {"uid": 0, "user_agent": "iOS/10.1"})
+        self.assertEqual(next(parameters_rows), {"uid": 0, "user_agent": "iOS/10.2"})
+        self.assertEqual(next(parameters_rows), {"uid": 1, "user_agent": "iOS/10.1"})
+        self.assertEqual(len(list(parameters_rows)), 1000 * 2 - 3)
+
+    def test_iter_parameters_inner_function_called_once(self):
+        calls = []
+
+        def gen_user_agents():
+            calls.append(1)
+            return ["iOS/10.1", "iOS/10.2"]
+
+        parameters = [
+            {"uid": [1, 2, 3]},
+            {"user_agent": "${gen_user_agents()}"},
+        ]
+        parameters_rows = parser.iter_parameters(
+            parameters, functions_mapping={"gen_user_agents": gen_user_agents}
+        )
+        self.assertEqual(len(list(parameters_rows)), 3 * 2)
+        self.assertEqual(len(calls), 1)
+
+    def test_iter_parameters_parameterize(self):
+        loader.load_project_data(os.path.join(os.getcwd(), "tests"))
+        parameters = [
+            {"app_version": "${parameterize(data/app_version.csv)}"},
+            {"username-password": "${parameterize(data/account.csv)}"},
+        ]
+        self.assertEqual(
+            list(parser.iter_parameters(parameters)),
+            parser.parse_parameters(parameters),
+        )
+
     def test_parse_tests_testcase(self):
         testcase_file_path = os.path.join(os.getcwd(), "tests/data/demo_testcase.yml")
         tests_mapping = loader.load_cases(testcase_file_path)
@@ -926,6 +1145,50 @@ class TestParser(unittest.TestCase):
         )
         self.assertIsInstance(parsed_testcases[0]["config"]["name"], parser.LazyString)
 
+    def test_parse_tests_testsuite_parameters(self):
+        testcase_file_path = os.path.join(
+            os.getcwd(), "tests/testsuites/create_users_with_parameters.yml"
+        )
+        tests_mapping = loader.load_cases(testcase_file_path)
+        tests_mapping["project_mapping"]["variables"] = {"device_sn": "OVERRIDE"}
+        parsed_testcases = parser.parse_tests(tests_mapping)
+        self.assertEqual(len(parsed_testcases), 3 * 2)
+
+        # teststeps are parsed once and shared by all parameters
+        for parsed_testcase in parsed_testcases[1:]:
+            self.assertIs(
+                parsed_testcase["teststeps"], parsed_testcases[0]["teststeps"]
+            )
+
+        self.assertEqual(
+            parsed_testcases[0]["config"]["name"],
+            "create user 101 and check result for TESTSUITE_X1.",
+        )
+        self.assertEqual(
+            parsed_testcases[5]["config"]["name"],
+            "create user 103 and check result for TESTSUITE_X2.",
+        )
+        self.assertEqual(parsed_testcases[5]["config"]["variables"]["uid"], 103)
+        # project mapping variables have the highest priority
+        self.assertEqual(
+            parsed_testcases[5]["config"]["variables"]["device_sn"], "OVERRIDE"
+        )
+
+    def test_iter_parse_tests_shard(self):
+        testcase_file_path = os.path.join(
+            os.getcwd(), "tests/testsuites/create_users_with_parameters.yml"
+        )
+        tests_mapping = loader.load_cases(testcase_file_path)
+        parsed_testcases = parser.iter_parse_tests(tests_mapping, shard=(2, 4))
+        self.assertNotIsInstance(parsed_testcases, list)
+        self.assertEqual(
+            [testcase["config"]["name"] for testcase in parsed_testcases],
+            [
+                "create user 101 and check result for TESTSUITE_X2.",
+                "create user 103 and check result for TESTSUITE_X2.",
+            ],
+        )
+
     def test_parse_tests_override_variables(self):
         tests_mapping = {
             "testcases": [
@@ -954,6 +1217,10 @@ class TestParser(unittest.TestCase):
         test_dict1_variables = parsed_testcases[0]["teststeps"][0]["variables"]
         self.assertEqual(test_dict1_variables["creator"], "user_test_001")
         self.assertEqual(test_dict1_variables["username"].raw_string, "$creator")
+        variables_order = parsed_testcases[0]["teststeps"][0]["variables_order"]
+        self.assertLess(
+            variables_order.index("creator"), variables_order.index("username")
+        )
 
     def test_parse_tests_base_url_priority(self):
         """base_url & verify: priority test_dict > config"""
@@ -1225,6 +1492,37 @@ class TestParser(unittest.TestCase):
         test_dict = parsed_testcases[0]["teststeps"][0]
         self.assertEqual(test_dict["request"]["verify"], False)
 
+    def test_parse_tests_extraction_plan(self):
+        tests_mapping = {
+            "testcases": [
+                {
+                    "config": {"name": "extraction plan"},
+                    "teststeps": [
+                        {
+                            "name": "testcase1",
+                            "variables": {"field": "content.id"},
+                            "request": {"url": "/headers", "method": "GET"},
+                            "extract": [
+                                {"token": "content.token"},
+                                {"id": "$.data.id"},
+                            ],
+                            "validate": [
+                                {"eq": ["status_code", 200]},
+                                {"eq": ["content.token", "abc"]},
+                                {"len_eq": ["$..ids", 2]},
+                                {"eq": ["$field", 1]},
+                            ],
+                        }
+                    ],
+                }
+            ]
+        }
+        parsed_testcases = parser.parse_tests(tests_mapping)
+        test_dict = parsed_testcases[0]["teststeps"][0]
+        self.assertEqual(
+            test_dict["extraction_plan"].fields, ["content.token", "$.data.id", "$..ids"]
+        )
+
     def test_parse_tests_verify_nested_testcase_unset(self):
         tests_mapping = {
             "testcases": [
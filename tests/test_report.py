@@ -0,0 +1,73 @@
+import json
+import os
+import shutil
+import unittest
+
+from apimeter import report, utils
+
+
+class TestRecordStore(unittest.TestCase):
+    def setUp(self):
+        self.store_dir = os.path.join(os.getcwd(), "reports", "record_store")
+        self.record_store = report.RecordStore(
+            os.path.join(self.store_dir, "records.sqlite3"), buffer_size=2
+        )
+
+    def tearDown(self):
+        self.record_store.close()
+        shutil.rmtree(self.store_dir)
+
+    def make_record(self, name, status="success"):
+        meta_datas = {
+            "name": name,
+            "data": [
+                {
+                    "request": {"url": "/api/{}".format(name), "body": b"abc"},
+                    "response": {"status_code": 200, "body": {"name": name}},
+                }
+            ],
+            "stat": {"response_time_ms": 1.5},
+        }
+        return {"name": name, "status": status, "meta_datas": meta_datas}
+
+    def test_stored_records(self):
+        records = self.record_store.new_records()
+        other_records = self.record_store.new_records([self.make_record("other")])
+        for index in range(5):
+            status = "failure" if index == 3 else "success"
+            records.append(self.make_record("step{}".format(index), status))
+
+        # records are buffered at most buffer size
+        self.assertLess(len(self.record_store._buffer), 2)
+        self.assertEqual(len(records), 5)
+        self.assertEqual(len(other_records), 1)
+
+        loaded_records = list(records)
+        self.assertEqual(
+            [record["name"] for record in loaded_records],
+            ["step0", "step1", "step2", "step3", "step4"],
+        )
+        # records are stringified when stored
+        self.assertEqual(loaded_records[0]["response_time"], "1.50")
+        self.assertEqual(
+            loaded_records[0]["meta_datas"]["data"][0]["request"]["body"], "abc"
+        )
+        self.assertEqual(
+            loaded_records[0]["meta_datas_expanded"][0]["name"], "step0"
+        )
+
+        records.remove("success")
+        self.assertEqual([record["name"] for record in records], ["step3"])
+        self.assertEqual(len(other_records), 1)
+
+    def test_make_records(self):
+        self.assertEqual(report.make_records(), [])
+
+    def test_dump_stored_records(self):
+        records = self.record_store.new_records([self.make_record("step0")])
+        json_file = os.path.join(self.store_dir, "summary.json")
+        utils.dump_json_file({"records": records}, json_file)
+        with open(json_file, encoding="utf-8") as f:
+            dumped_records = json.load(f)["records"]
+
+        self.assertEqual([record["name"] for record in dumped_records], ["step0"])
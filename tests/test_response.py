@@ -1,3 +1,4 @@
+import jsonpath
 import requests
 
 from apimeter import exceptions, response
@@ -303,6 +304,134 @@ class TestResponse(ApiServerUnittest):
         with self.assertRaises(exceptions.ParamsError):
             resp_obj.extract_response(extract_binds_list)
 
+    def test_extract_response_jsonpath(self):
+        resp = requests.post(
+            url="{}/anything".format(HTTPBIN_SERVER),
+            json={"data": {"items": [{"id": 1}, {"id": 2}]}},
+        )
+        extract_binds_list = [
+            {"first_id": "$.json.data.items[0].id"},
+            {"ids": "$..items[*].id"},
+        ]
+        resp_obj = response.ResponseObject(resp)
+        extract_binds_dict = resp_obj.extract_response(extract_binds_list)
+        self.assertEqual(extract_binds_dict["first_id"], [1])
+        self.assertEqual(extract_binds_dict["ids"], [1, 2])
+
+        with self.assertRaises(exceptions.ExtractFailure):
+            resp_obj.extract_field("$.json.data.items[2].id")
+
+    def test_prefetch_fields(self):
+        resp = requests.post(
+            url="{}/anything".format(HTTPBIN_SERVER),
+            json={
+                "data": {"items": [{"id": 1, "name": "a"}, {"id": 2}]},
+                "token": "abcdef",
+            },
+        )
+        fields = [
+            "content.json.data.items.0.id",
+            "content.json.data.items.0.name",
+            "json.json.data.items.1.id",
+            "content.json.token.2",
+            "$.json.data.items[0].id",
+            "$.json.data.items[1]",
+            "$..id",
+            "$.json.data.items[2].id",
+            "content.json.data.items.2",
+            "status_code",
+        ]
+        plan = response.ExtractionPlan(fields)
+        self.assertEqual(len(plan), 9)
+        # body prefix json is stored once for delimiter fields and JSONPath
+        self.assertEqual(len(plan.root.children), 2)
+
+        resp_obj = response.ResponseObject(resp)
+        resp_obj.prefetch_fields(plan)
+        self.assertNotIn("$.json.data.items[2].id", resp_obj.field_cache)
+        self.assertNotIn("content.json.data.items.2", resp_obj.field_cache)
+
+        expected_resp_obj = response.ResponseObject(resp)
+        for field in fields[:7] + fields[9:]:
+            self.assertEqual(
+                resp_obj.extract_field(field), expected_resp_obj.extract_field(field)
+            )
+
+        with self.assertRaises(exceptions.ExtractFailure):
+            resp_obj.extract_field("$.json.data.items[2].id")
+
+        with self.assertRaises(exceptions.ExtractFailure):
+            resp_obj.extract_field("content.json.data.items.2")
+
+    def test_extract_field_cache(self):
+        resp = requests.post(
+            url="{}/anything".format(HTTPBIN_SERVER),
+            json={"data": {"list": [1, 2, 3]}},
+        )
+        resp_obj = response.ResponseObject(resp)
+        value = resp_obj.extract_field("content.json.data.list")
+        self.assertEqual(value, [1, 2, 3])
+        self.assertIn("content.json.data.list", resp_obj.field_cache)
+
+        # cached list or dict is copied, modifying extracted value affects nothing
+        value.append(4)
+        self.assertEqual(resp_obj.extract_field("content.json.data.list"), [1, 2, 3])
+        data = resp_obj.extract_field("content.json.data")
+        data["list"].append(4)
+        self.assertEqual(resp_obj.extract_field("content.json.data"), {"list": [1, 2, 3]})
+        self.assertEqual(resp_obj.extract_field("content.json.data.list"), [1, 2, 3])
+
+        with self.assertRaises(exceptions.ExtractFailure) as context:
+            resp_obj.extract_field("content.json.data.dict")
+        ex = context.exception
+        with self.assertRaises(exceptions.ExtractFailure) as context:
+            resp_obj.extract_field("content.json.data.dict")
+        self.assertIs(context.exception, ex)
+
+        # set attribute in teardown hooks
+        resp_obj.json = {"data": {"dict": {}}}
+        self.assertEqual(resp_obj.field_cache, {})
+        self.assertEqual(resp_obj.extract_field("content.data.dict"), {})
+        with self.assertRaises(exceptions.ExtractFailure):
+            resp_obj.extract_field("content.json.data.list")
+
+    def test_compile_jsonpath(self):
+        data = {
+            "code": 200,
+            "data": {
+                "items": [{"id": 1, "tags": []}, {"id": 2, "0": "zero", "name": None}],
+                "a b": 1,
+                "0": "key",
+            },
+            "list": [[1, 2], {"1": "one"}],
+        }
+        exprs = [
+            "$",
+            "$.code",
+            "$.data.items[0].id",
+            "$.data.items.1.name",
+            "$.data.items[1].0",
+            "$.data.items[5].id",
+            "$.data.items[-1].id",
+            "$.data.items[0].tags",
+            "$['data']['a b']",
+            "$.data.0",
+            "$.list[0][1]",
+            "$.list[1].1",
+            "$.code.x",
+            "data.items",
+            "$..id",
+            "$.data.items[*].id",
+            "$.data.items[0:1].id",
+            "$.data.items[0,1].id",
+            "$.data.items[?(@.id>1)].id",
+        ]
+        for expr in exprs:
+            for obj in [data, [data], {}, []]:
+                self.assertEqual(
+                    response.compile_jsonpath(expr)(obj), jsonpath.jsonpath(obj, expr)
+                )
+
     def test_extract_response_empty(self):
         resp = requests.post(url="{}/anything".format(HTTPBIN_SERVER), data="abc")
 
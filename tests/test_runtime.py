@@ -0,0 +1,87 @@
+import copy
+import os
+import tempfile
+import threading
+
+from apimeter import loader, parser, runtime
+from apimeter.api import HttpRunner
+from tests.base import ApiServerUnittest
+
+
+class TestRunContext(ApiServerUnittest):
+    def test_parse_failures_in_run_context(self):
+        tests_mapping = {
+            "testcases": [
+                {
+                    "config": {"name": "parse failure"},
+                    "teststeps": [
+                        {
+                            "name": "undefined variable",
+                            "request": {"url": "/api/$undefined", "method": "GET"},
+                        }
+                    ],
+                    "type": "testcase",
+                    "path": "undefined.yml",
+                }
+            ]
+        }
+        with runtime.RunContext().activate() as run_context:
+            parser.parse_tests(copy.deepcopy(tests_mapping))
+            self.assertEqual(
+                run_context.parse_failed_testfiles, {"testcase": ["undefined.yml"]}
+            )
+            self.assertIs(
+                parser.get_parse_failed_testfiles(),
+                run_context.parse_failed_testfiles,
+            )
+
+        with runtime.RunContext().activate():
+            self.assertEqual(parser.get_parse_failed_testfiles(), {})
+
+    def test_concurrent_runs(self):
+        default_run_context = runtime.get_run_context()
+        api_paths = set(default_run_context.tests_def_mapping["api"])
+        summaries = []
+
+        def run(device_sn):
+            summary = HttpRunner().run(
+                "tests/testcases/setup.yml", mapping={"device_sn": device_sn}
+            )
+            summaries.append(summary)
+
+        threads = [
+            threading.Thread(target=run, args=("DEVICE_SN_{}".format(index),))
+            for index in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(summaries), 4)
+        for summary in summaries:
+            self.assertTrue(summary["success"])
+            self.assertEqual(summary["stat"]["teststeps"]["total"], 2)
+
+        # states of runs are released with their own run contexts
+        self.assertIs(runtime.get_run_context(), default_run_context)
+        self.assertEqual(set(default_run_context.tests_def_mapping["api"]), api_paths)
+
+    def test_load_debugtalk_of_different_projects(self):
+        functions_list = []
+        for project in ["project_a", "project_b"]:
+            project_dir = tempfile.mkdtemp()
+            with open(os.path.join(project_dir, "debugtalk.py"), "w") as f:
+                f.write("PROJECT = '{}'\n\n\ndef get_project():\n".format(project))
+                f.write("    return PROJECT\n")
+
+            with runtime.RunContext().activate():
+                project_mapping = loader.load_project_data(project_dir)
+            functions_list.append(project_mapping["functions"])
+
+        # functions of former project are not changed by loading another project
+        self.assertEqual(functions_list[0]["get_project"](), "project_a")
+        self.assertEqual(functions_list[1]["get_project"](), "project_b")
+
+        # restore debugtalk module of tests
+        loader.load_project_data(os.path.join(os.getcwd(), "tests"))
@@ -0,0 +1,123 @@
+import copy
+import time
+from unittest.case import SkipTest
+
+from apimeter import exceptions, parser, runner, scheduler
+from apimeter.api import HttpRunner
+from tests.api_server import HTTPBIN_SERVER
+from tests.base import ApiServerUnittest
+
+
+class TestStepScheduler(ApiServerUnittest):
+    def setUp(self):
+        self.testcase = {
+            "config": {
+                "name": "run teststeps concurrently",
+                "base_url": HTTPBIN_SERVER,
+                "export": ["token"],
+            },
+            "teststeps": [
+                {
+                    "name": "get token",
+                    "request": {"url": "/get", "method": "GET", "params": {"v": "abc"}},
+                    "extract": {"token": "content.args.v"},
+                },
+                {
+                    "name": "delay with token",
+                    "request": {
+                        "url": "/delay/1",
+                        "method": "GET",
+                        "params": {"token": "$token"},
+                    },
+                    "validate": [{"eq": ["content.args.token", "abc"]}],
+                },
+                {
+                    "name": "delay 1",
+                    "request": {"url": "/delay/1", "method": "GET"},
+                    "validate": [{"eq": ["status_code", 200]}],
+                },
+                {
+                    "name": "delay 2",
+                    "request": {"url": "/delay/1", "method": "GET"},
+                    "validate": [{"eq": ["status_code", 200]}],
+                },
+                {
+                    "name": "update token",
+                    "request": {"url": "/get", "method": "GET", "params": {"v": "def"}},
+                    "extract": {"token": "content.args.v"},
+                },
+            ],
+        }
+
+    def test_get_step_variables(self):
+        testcases = parser.parse_tests({"testcases": [self.testcase]})
+        teststeps = testcases[0]["teststeps"]
+        self.assertEqual(
+            scheduler.get_step_variables(teststeps[0]), (set(), {"token"})
+        )
+        self.assertEqual(
+            scheduler.get_step_variables(teststeps[1]), ({"token"}, set())
+        )
+
+    def test_step_dependencies(self):
+        testcases = parser.parse_tests({"testcases": [self.testcase]})
+        test_runner = runner.Runner(testcases[0]["config"])
+        step_scheduler = scheduler.StepScheduler(test_runner, 4)
+        steps = [
+            step_scheduler.add_step(test_dict)
+            for test_dict in testcases[0]["teststeps"]
+        ]
+        self.assertEqual(
+            [step.dependencies for step in steps], [[], [0], [], [], [0, 1]]
+        )
+
+    def test_barrier_step_dependencies(self):
+        self.testcase["teststeps"][2]["setup_hooks"] = ["${hook_print(hello)}"]
+        self.testcase["teststeps"][2]["validate"] = []
+        tests_mapping = {
+            "project_mapping": {"functions": {"hook_print": print}},
+            "testcases": [self.testcase],
+        }
+        testcases = parser.parse_tests(tests_mapping)
+        test_runner = runner.Runner(testcases[0]["config"])
+        step_scheduler = scheduler.StepScheduler(test_runner, 4)
+        steps = [
+            step_scheduler.add_step(test_dict)
+            for test_dict in testcases[0]["teststeps"]
+        ]
+        self.assertEqual(
+            [step.dependencies for step in steps], [[], [0], [0, 1], [2], [2]]
+        )
+
+    def test_run_teststeps_concurrently(self):
+        start_time = time.time()
+        summary = HttpRunner(step_workers=4).run_tests(
+            {"testcases": [copy.deepcopy(self.testcase)]}
+        )
+        duration = time.time() - start_time
+
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["stat"]["teststeps"]["successes"], 5)
+        self.assertLess(duration, 2.5)
+        self.assertEqual(
+            [record["name"] for record in summary["details"][0]["records"]],
+            ["get token", "delay with token", "delay 1", "delay 2", "update token"],
+        )
+        self.assertEqual(summary["details"][0]["in_out"]["out"], {"token": "def"})
+
+    def test_failfast_cancel_pending_teststeps(self):
+        self.testcase["teststeps"][0]["validate"] = [{"eq": ["status_code", 500]}]
+        testcases = parser.parse_tests({"testcases": [self.testcase]})
+        teststeps = testcases[0]["teststeps"]
+        test_runner = runner.Runner(testcases[0]["config"])
+        step_scheduler = scheduler.StepScheduler(test_runner, 1, failfast=True)
+        steps = [step_scheduler.add_step(test_dict) for test_dict in teststeps]
+
+        with self.assertRaises(exceptions.ValidationFailure):
+            steps[0].run_test(teststeps[0])
+
+        # pending teststeps are not run after failure
+        for step, test_dict in zip(steps[1:], teststeps[1:]):
+            with self.assertRaises(SkipTest):
+                step.run_test(test_dict)
+            self.assertIsNone(step.meta_datas)
@@ -0,0 +1,138 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+
+import requests
+
+from apimeter import server
+from tests.base import ApiServerUnittest
+
+
+class TestRunServer(ApiServerUnittest):
+    @classmethod
+    def setUpClass(cls):
+        super(TestRunServer, cls).setUpClass()
+        cls.run_server = server.RunServer(("127.0.0.1", 0))
+        cls.server_url = "http://127.0.0.1:{}".format(cls.run_server.server_address[1])
+        cls.server_thread = threading.Thread(target=cls.run_server.serve_forever)
+        cls.server_thread.daemon = True
+        cls.server_thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.run_server.shutdown()
+        cls.run_server.server_close()
+        super(TestRunServer, cls).tearDownClass()
+
+    def test_run(self):
+        run_request = {"path": "tests/testcases/setup.yml"}
+        resp = requests.post("{}/run".format(self.server_url), json=run_request)
+        self.assertEqual(resp.status_code, 200)
+        summary = resp.json()
+        self.assertTrue(summary["success"])
+        self.assertEqual(summary["stat"]["teststeps"]["total"], 2)
+
+        # project data is reused in the second run
+        stat = self.run_server.project_data_cache.get_stat()
+        resp = requests.post("{}/run".format(self.server_url), json=run_request)
+        self.assertTrue(resp.json()["success"])
+        self.assertEqual(
+            self.run_server.project_data_cache.get_stat()["hits"], stat["hits"] + 1
+        )
+
+        resp = requests.get("{}/status".format(self.server_url))
+        self.assertGreaterEqual(resp.json()["runs"], 2)
+
+    def test_run_stream(self):
+        run_request = {"path": "tests/testcases/setup.yml", "stream": True}
+        resp = requests.post("{}/run".format(self.server_url), json=run_request)
+        self.assertEqual(resp.headers["Content-Type"], "application/x-ndjson")
+        lines = [json.loads(line) for line in resp.text.splitlines()]
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0]["name"], "setup and reset all.")
+        self.assertTrue(lines[0]["success"])
+        self.assertEqual(lines[1]["stat"]["testcases"]["total"], 1)
+
+    def test_project_data_cache_serialize_projects(self):
+        project_data_cache = server.ProjectDataCache()
+        project_data_cache.load("tests/testcases/setup.yml")
+        # runs of the same project are not blocked
+        project_data_cache.load("tests/testcases/setup.yml")
+        self.assertEqual(project_data_cache.get_stat(), {"hits": 1, "misses": 1})
+
+        loaded = threading.Event()
+
+        def load_other_project():
+            project_data_cache.load(tempfile.mkdtemp())
+            loaded.set()
+
+        load_thread = threading.Thread(target=load_other_project)
+        load_thread.daemon = True
+        load_thread.start()
+
+        # another project waits until all runs of loaded project are released
+        project_data_cache.release()
+        self.assertFalse(loaded.wait(0.5))
+        project_data_cache.release()
+        self.assertTrue(loaded.wait(5))
+        self.assertEqual(project_data_cache.get_stat(), {"hits": 1, "misses": 2})
+        project_data_cache.release()
+
+    def test_run_invalid_request(self):
+        resp = requests.post("{}/run".format(self.server_url), data="[1]")
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("path is required", resp.json()["error"])
+
+        run_request = {"path": "tests/testcases/setup.yml", "shard": "3/2"}
+        resp = requests.post("{}/run".format(self.server_url), json=run_request)
+        self.assertEqual(resp.status_code, 400)
+
+        resp = requests.post("{}/run".format(self.server_url), json={"path": "xxx"})
+        self.assertEqual(resp.status_code, 500)
+        self.assertEqual(resp.json()["exception_stage"], "load tests")
+
+    def test_unix_socket(self):
+        socket_path = os.path.join(tempfile.mkdtemp(), "apimeter.sock")
+        unix_server = server.UnixRunServer(socket_path)
+        server_thread = threading.Thread(target=unix_server.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+        try:
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            client.connect(socket_path)
+            client.sendall(b"GET /status HTTP/1.0\r\n\r\n")
+            response = b""
+            while True:
+                data = client.recv(4096)
+                if not data:
+                    break
+                response += data
+            client.close()
+        finally:
+            unix_server.shutdown()
+            unix_server.server_close()
+
+        headers, body = response.split(b"\r\n\r\n", 1)
+        self.assertIn(b"200 OK", headers)
+        self.assertEqual(json.loads(body)["runs"], 0)
+        self.assertFalse(os.path.exists(socket_path))
+
+    def test_count_runs_concurrently(self):
+        run_server = server.RunServer(("127.0.0.1", 0))
+        try:
+            threads = [
+                threading.Thread(
+                    target=lambda: [run_server.count_run() for _ in range(1000)]
+                )
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            run_server.server_close()
+
+        self.assertEqual(run_server.get_status()["runs"], 8000)
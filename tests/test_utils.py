@@ -1,6 +1,7 @@
 import io
 import os
 import shutil
+import threading
 
 from apimeter import exceptions, loader, utils
 from tests.base import ApiServerUnittest
@@ -233,6 +234,19 @@ class TestUtils(ApiServerUnittest):
         product_list = utils.gen_cartesian_product(*parameters_content_list)
         self.assertEqual(product_list, [])
 
+    def test_iter_cartesian_product(self):
+        parameters_content_list = [
+            [{"a": 1}, {"a": 2}],
+            [{"x": 111, "y": 112}, {"x": 121, "y": 122}],
+        ]
+        product_iter = utils.iter_cartesian_product(*parameters_content_list)
+        self.assertNotIsInstance(product_iter, list)
+        self.assertEqual(
+            list(product_iter),
+            utils.gen_cartesian_product(*parameters_content_list),
+        )
+        self.assertEqual(list(utils.iter_cartesian_product()), [])
+
     def test_print_info(self):
         info_mapping = {"a": 1, "t": (1, 2), "b": {"b1": 123}, "c": None, "d": [4, 5]}
         utils.print_info(info_mapping)
@@ -276,3 +290,34 @@ class TestUtils(ApiServerUnittest):
                 project_working_directory, "logs", "tests_mapping.loaded.json"
             ),
         )
+
+    def test_ga_client_telemetry(self):
+        sent_events = []
+        sending = threading.Event()
+
+        class SlowHttpClient(object):
+            def post(self, url, data, timeout):
+                sending.wait(timeout)
+                sent_events.append(data["ea"])
+
+        ga_client = utils.GAClient("UA-XXX")
+        ga_client._http_client = SlowHttpClient()
+
+        # telemetry is disabled by default
+        ga_client.track_event("RunAPITests", "disabled")
+        self.assertIsNone(ga_client._sender)
+
+        os.environ["APIMETER_TELEMETRY"] = "true"
+        try:
+            # tracking is not blocked by slow sending, and events beyond queue size
+            # are dropped
+            for index in range(utils.TELEMETRY_QUEUE_SIZE * 2):
+                ga_client.track_event("RunAPITests", index)
+
+            sending.set()
+            ga_client._queue.join()
+        finally:
+            del os.environ["APIMETER_TELEMETRY"]
+
+        self.assertEqual(sent_events[0], 0)
+        self.assertLessEqual(len(sent_events), utils.TELEMETRY_QUEUE_SIZE + 1)